@@ -0,0 +1,49 @@
+"""add like_count counter to tweets
+
+Revision ID: 3f9c1d2ab6e4
+Revises: 8202a59773b7
+Create Date: 2026-10-17 10:12:41.518204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c1d2ab6e4"
+down_revision: Union[str, Sequence[str], None] = "8202a59773b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "tweets",
+        sa.Column(
+            "like_count", sa.Integer(), server_default="0", nullable=False
+        ),
+    )
+    # Backfill counters from existing likes
+    backfill = """
+        UPDATE tweets
+        SET like_count = (
+            SELECT count(*) FROM likes WHERE likes.tweet_id = tweets.id
+        )
+        """
+    op.execute(backfill)
+    op.create_index(
+        "ix_tweets_like_count_id",
+        "tweets",
+        ["like_count", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tweets_like_count_id", table_name="tweets")
+    op.drop_column("tweets", "like_count")
@@ -0,0 +1,29 @@
+"""add media.variants for resized image copies
+
+Revision ID: a6c2e9f4b187
+Revises: f3a9d7b1c524
+Create Date: 2026-10-17 20:12:09.554318
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a6c2e9f4b187"
+down_revision: Union[str, Sequence[str], None] = "f3a9d7b1c524"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("media", sa.Column("variants", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("media", "variants")
@@ -0,0 +1,55 @@
+"""add materialized timeline_entries
+
+Revision ID: b7e2a94c0d15
+Revises: 3f9c1d2ab6e4
+Create Date: 2026-10-17 11:03:27.904615
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2a94c0d15"
+down_revision: Union[str, Sequence[str], None] = "3f9c1d2ab6e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "timeline_entries",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("tweet_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["tweet_id"], ["tweets.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "tweet_id"),
+    )
+    op.create_index(
+        "ix_timeline_entries_tweet_id",
+        "timeline_entries",
+        ["tweet_id"],
+        unique=False,
+    )
+    # Backfill timelines from the existing follow graph
+    backfill = """
+        INSERT INTO timeline_entries (user_id, tweet_id)
+        SELECT followers.follower_id, tweets.id
+        FROM followers
+        JOIN tweets ON tweets.author_id = followers.following_id
+        """
+    op.execute(backfill)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_timeline_entries_tweet_id", table_name="timeline_entries"
+    )
+    op.drop_table("timeline_entries")
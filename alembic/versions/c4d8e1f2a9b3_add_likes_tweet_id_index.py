@@ -0,0 +1,32 @@
+"""add likes (tweet_id, user_id) index
+
+Revision ID: c4d8e1f2a9b3
+Revises: b7e2a94c0d15
+Create Date: 2026-10-17 14:21:09.351702
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d8e1f2a9b3"
+down_revision: Union[str, Sequence[str], None] = "b7e2a94c0d15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_likes_tweet_id_user_id",
+        "likes",
+        ["tweet_id", "user_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_likes_tweet_id_user_id", table_name="likes")
@@ -0,0 +1,34 @@
+"""add followers (following_id, follower_id) index
+
+Revision ID: d1a7f3c5e802
+Revises: c4d8e1f2a9b3
+Create Date: 2026-10-17 15:02:44.118205
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d1a7f3c5e802"
+down_revision: Union[str, Sequence[str], None] = "c4d8e1f2a9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_followers_following_id_follower_id",
+        "followers",
+        ["following_id", "follower_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_followers_following_id_follower_id", table_name="followers"
+    )
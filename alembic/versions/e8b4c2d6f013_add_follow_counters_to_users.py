@@ -0,0 +1,60 @@
+"""add followers_count and following_count counters to users
+
+Revision ID: e8b4c2d6f013
+Revises: d1a7f3c5e802
+Create Date: 2026-10-17 16:40:12.905317
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b4c2d6f013"
+down_revision: Union[str, Sequence[str], None] = "d1a7f3c5e802"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column(
+            "followers_count",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "users",
+        sa.Column(
+            "following_count",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+    )
+    # Backfill counters from existing follow relationships
+    backfill = """
+        UPDATE users
+        SET followers_count = (
+                SELECT count(*) FROM followers
+                WHERE followers.following_id = users.id
+            ),
+            following_count = (
+                SELECT count(*) FROM followers
+                WHERE followers.follower_id = users.id
+            )
+        """
+    op.execute(backfill)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "following_count")
+    op.drop_column("users", "followers_count")
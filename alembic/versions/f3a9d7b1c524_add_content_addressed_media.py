@@ -0,0 +1,50 @@
+"""add media_blobs and media.content_hash for content-addressed storage
+
+Revision ID: f3a9d7b1c524
+Revises: e8b4c2d6f013
+Create Date: 2026-10-17 19:05:41.218734
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9d7b1c524"
+down_revision: Union[str, Sequence[str], None] = "e8b4c2d6f013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "media_blobs",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "ref_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("content_hash"),
+    )
+    # Existing uploads keep their file names and stay without a hash
+    op.add_column(
+        "media",
+        sa.Column("content_hash", sa.String(length=64), nullable=True),
+    )
+    op.create_index(
+        "ix_media_content_hash", "media", ["content_hash"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_media_content_hash", table_name="media")
+    op.drop_column("media", "content_hash")
+    op.drop_table("media_blobs")
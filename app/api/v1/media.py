@@ -7,11 +7,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
 from app.core.security import get_current_user
+from app.core.storage import storage
 from app.db.database import get_db_session
-from app.db.models import User
 from app.schemas.response import ApiResponse
+from app.schemas.user import CurrentUser
 from app.services.media_service import upload_media
-from app.utils.file_storage import save_upload_file
+from app.utils.file_storage import UploadTooLargeError, save_upload_file
 
 logger = get_logger("media_api")
 
@@ -23,11 +24,14 @@ async def post_medias(
     file: UploadFile,
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Загружает медиафайл на сервер и сохраняет его путь в базе данных.
 
+    Файлы хранятся по хэшу содержимого в хранилище медиа (локальная папка
+    или S3): повторная загрузка того же файла не занимает места.
+
     Args:
         file: Загружаемый файл (изображение)
         api_key: API-ключ пользователя (в заголовке)
@@ -51,22 +55,30 @@ async def post_medias(
     )
 
     try:
-        file_path = await save_upload_file(
-            upload_file=file, dest_folder="app/media"
+        upload = await save_upload_file(
+            upload_file=file, dest_folder=storage.staging_dir
         )
-        logger.debug(f"File saved at {file_path}")
 
-        if not file_path:
+        if not upload:
             logger.exception("File path is empty after saving the file.")
             raise ValueError("File path is empty after saving the file.")
 
-        media_id = await upload_media(session=session, file_path=file_path)
+        logger.debug(f"File received as {upload.url}")
+        media_id = await upload_media(session=session, upload=upload)
         logger.info(
             f"Media uploaded successfully: id={media_id}, \
             user={current_user.id}"
         )
 
         return ApiResponse(result=True, data={"media_id": media_id})
+    except UploadTooLargeError as e:
+        logger.warning(
+            f"Upload from user {current_user.id} rejected: {str(e)}"
+        )
+
+        return ApiResponse(
+            result=False, error_type="FileTooLarge", error_message=str(e)
+        )
     except Exception as e:
         logger.error(
             f"Failed to upload media for user {current_user.id}: {str(e)}"
@@ -0,0 +1,151 @@
+"""
+Маршруты для отдачи медиафайлов.
+
+Файлы, адресуемые по содержимому, никогда не меняются, поэтому отдаются
+с `Cache-Control: immutable` и ETag из хэша; остальные (загруженные до
+хранения по хэшу) — с ограниченным max-age. Поддерживаются условные
+запросы (If-None-Match → 304) и Range-запросы (перемотка видео).
+
+Файлы читаются через хранилище медиа (см. app.core.storage):
+
+- если хранилище выдаёт прямые ссылки (S3), клиент перенаправляется на
+  публичную или подписанную ссылку, и файл отдаёт S3 или CDN.
+  Перенаправление на постоянную публичную ссылку (S3_PUBLIC_URL)
+  кэшируется так же, как сам файл, на подписанную — браузером на половину
+  срока действия подписи, чтобы повторные запросы шли по той же ссылке и
+  попадали в кэш браузера;
+- в режиме MEDIA_SERVE_MODE=accel (локальное хранилище за nginx) бэкенд
+  не читает файл: ответ содержит только заголовки и `X-Accel-Redirect`, а
+  файл из внутреннего location отдаёт nginx (см. frontend/nginx.conf);
+- иначе файл отдаёт приложение.
+"""
+
+import mimetypes
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import (
+    FileResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
+
+from app.core.config import (
+    MEDIA_ACCEL_PREFIX,
+    MEDIA_CACHE_MAX_AGE,
+    MEDIA_SERVE_MODE,
+)
+from app.core.logging import get_logger
+from app.core.storage import storage
+from app.utils.file_storage import (
+    MEDIA_URL_PREFIX,
+    is_content_addressed,
+    media_key,
+)
+
+logger = get_logger("media_files_api")
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+# Cache-Control файлов, адресуемых по содержимому: год, без ревалидации
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{file_path:path}")
+# HEAD отдаёт те же заголовки; в схеме OpenAPI описан только GET
+@router.head("/{file_path:path}", include_in_schema=False)
+async def get_media_file(file_path: str, request: Request) -> Response:
+    """
+    Отдаёт медиафайл с заголовками кэширования.
+
+    Args:
+        file_path: Путь файла внутри папки медиа (например, `ab/cd/….jpg`)
+        request: Запрос (заголовки If-None-Match и Range)
+
+    Returns:
+        Файл (200 или 206 для Range), 304 — если ETag совпал, 404 — если
+        файла нет; 307 на прямую ссылку хранилища; в режиме accel — пустой
+        ответ с X-Accel-Redirect
+
+    Example:
+        >>> GET /media/9f/86/9f86d081….jpg
+        >>> Headers: {"If-None-Match": "\"9f86d081…\""}
+        >>> Response: 304 Not Modified
+    """
+    url = f"{MEDIA_URL_PREFIX}{file_path}"
+
+    try:
+        key = media_key(url)
+    except ValueError:
+        return Response(status_code=404)
+
+    immutable = is_content_addressed(url)
+    headers = {
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL
+            if immutable
+            else f"public, max-age={MEDIA_CACHE_MAX_AGE}"
+        )
+    }
+
+    direct_url = await storage.url(key)
+
+    if direct_url is not None:
+        if storage.url_expires is not None:
+            # Подписанная ссылка истекает: кэш перенаправления живёт
+            # вдвое меньше неё
+            headers["Cache-Control"] = (
+                f"private, max-age={storage.url_expires // 2}"
+            )
+
+        return RedirectResponse(direct_url, headers=headers)
+
+    if MEDIA_SERVE_MODE == "accel":
+        # ETag, 304 и Range для внутреннего location обрабатывает nginx
+        headers["X-Accel-Redirect"] = f"{MEDIA_ACCEL_PREFIX}{file_path}"
+        return Response(headers=headers)
+
+    stored = await storage.stat(key)
+
+    if stored is None:
+        logger.debug(f"Media file not found: {url}")
+        return Response(status_code=404)
+
+    if immutable:
+        etag = f'"{os.path.basename(key).split(".")[0]}"'
+    else:
+        etag = f'"{stored.etag}"'
+
+    headers["ETag"] = etag
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    path = storage.local_path(key)
+
+    if path is not None:
+        return FileResponse(path, headers=headers)
+
+    headers["Content-Length"] = str(stored.size)
+
+    return StreamingResponse(
+        storage.get(key),
+        media_type=mimetypes.guess_type(key)[0],
+        headers=headers,
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверяет заголовок If-None-Match (слабое сравнение, RFC 9110).
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return etag in (
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    )
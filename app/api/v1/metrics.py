@@ -0,0 +1,78 @@
+"""
+Маршруты для получения внутренних метрик сервиса.
+"""
+
+from fastapi import APIRouter, Depends, Header
+
+from app.core.cache import cache
+from app.core.logging import get_logger
+from app.core.security import get_current_user
+from app.core.storage import storage
+from app.db.database import session_usage
+from app.schemas.response import ApiResponse
+from app.schemas.user import CurrentUser
+from app.services.follow_graph import follow_graph
+from app.services.like_buffer import like_buffer
+from app.services.media_pipeline import media_pipeline
+from app.utils.file_storage import upload_stats
+
+logger = get_logger("metrics_api")
+
+router = APIRouter(prefix="/api", tags=["Metrics"])
+
+
+@router.get("/metrics", response_model=ApiResponse)
+async def get_metrics(
+    api_key: str = Header(...),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Возвращает счётчики общего кэша, использования сессий БД, буфера
+    записи лайков, размер индекса графа подписок (null, если буфер или
+    индекс выключены), объём сохранённых загрузок, счётчики хранилища
+    медиа и состояние очереди построения копий изображений (null, если
+    она выключена).
+
+    Args:
+        api_key: API-ключ пользователя
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ с метриками
+
+    Example:
+        >>> GET /api/metrics
+        >>> Response: {"result": true, "data": {"cache":
+        >>>     {"backend": "InMemoryCacheBackend", "hits": 42,
+        >>>      "misses": 7, "errors": 0, ...},
+        >>>     "db": {"sessions": 50, "used": 12, "unused": 38},
+        >>>     "like_buffer": null,
+        >>>     "follow_graph": {"ready": true, "users": 1200,
+        >>>                      "edges": 45000, "bytes": 612480},
+        >>>     "uploads": {"uploads": 10, "rejected": 1,
+        >>>                 "bytes_written": 52428800, "seconds": 0.4,
+        >>>                 "throughput_mib_s": 125.0},
+        >>>     "storage": {"backend": "LocalStorageBackend", "puts": 9,
+        >>>                 "bytes_put": 47185920, "deletes": 2},
+        >>>     "media_pipeline": {"queued": 3, "running": 2,
+        >>>                        "processed": 40, "failed": 0,
+        >>>                        "dropped": 0, "wait_ms_avg": 12.5,
+        >>>                        "render_ms_avg": 85.0,
+        >>>                        "render_ms_max": 410.2}}}
+    """
+    logger.debug(f"GET /metrics by user {current_user.id}")
+
+    return ApiResponse(
+        result=True,
+        data={
+            "cache": cache.stats(),
+            "db": session_usage.stats(),
+            "like_buffer": like_buffer.stats() if like_buffer else None,
+            "follow_graph": follow_graph.stats() if follow_graph else None,
+            "uploads": upload_stats.stats(),
+            "storage": storage.stats(),
+            "media_pipeline": (
+                media_pipeline.stats() if media_pipeline else None
+            ),
+        },
+    )
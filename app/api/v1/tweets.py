@@ -2,20 +2,43 @@
 Маршруты для работы с твитами: создание, удаление, лайки, получение ленты.
 """
 
-from fastapi import APIRouter, Depends, Header
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import (
+    FEED_DEFAULT_LIMIT,
+    FEED_MAX_LIMIT,
+    LIST_DEFAULT_LIMIT,
+    LIST_MAX_LIMIT,
+)
 from app.core.logging import get_logger
+from app.core.responses import api_response
 from app.core.security import get_current_user
 from app.db.database import get_db_session
-from app.db.models import User
-from app.schemas import ApiResponse, CreateTweetRequest
-from app.services.like_service import add_like, remove_like
+from app.schemas import (
+    ApiResponse,
+    CreateTweetRequest,
+    CurrentUser,
+    FeedApiResponse,
+    LikesApiResponse,
+    LookupApiResponse,
+    LookupRequest,
+)
+from app.services.like_buffer import like_buffer
+from app.services.like_service import (
+    add_like,
+    get_liked_tweet_ids,
+    get_tweet_likers,
+    remove_like,
+)
 from app.services.tweet_service import (
     create_tweet,
     delete_tweet,
     get_user_feed,
 )
+from app.utils.bitset import membership_bitset
 
 logger = get_logger("tweets_api")
 
@@ -27,7 +50,7 @@ async def post_tweets(
     request: CreateTweetRequest,
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Создаёт новый твит от имени авторизованного пользователя.
@@ -69,29 +92,42 @@ async def post_tweets(
         )
 
 
-@router.get("/tweets")
+@router.get("/tweets", response_model=FeedApiResponse)
 async def get_tweets(
+    limit: int = Query(FEED_DEFAULT_LIMIT, ge=1, le=FEED_MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    likes_mode: Literal["full", "summary"] = Query("full"),
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Возвращает ленту твитов от пользователей, на которых подписан текущий
     пользователь.
 
-    Лента отсортирована по популярности (количеству лайков).
+    Лента отсортирована по популярности (количеству лайков) и отдаётся
+    страницами. Для получения следующей страницы нужно передать
+    `next_cursor` из предыдущего ответа в параметре `cursor`.
+
+    В режиме `likes_mode=summary` вместо полного списка лайкнувших
+    возвращаются like_count, liked_by_me и первые несколько лайкнувших;
+    полный список отдаёт `GET /api/tweets/{tweet_id}/likes`.
 
     Args:
+        limit: Размер страницы
+        cursor: Курсор следующей страницы (опционально)
+        likes_mode: Режим отображения лайков: `full` или `summary`
         api_key: API-ключ пользователя
         session: Асинхронная сессия БД
         current_user: Авторизованный пользователь
 
     Returns:
-        JSON-ответ со списком твитов
+        JSON-ответ со списком твитов и курсором следующей страницы
 
     Example:
-        >>> GET /api/tweets
-        >>> Response: {"result": true, "data": {"tweets": [...]}}
+        >>> GET /api/tweets?limit=20
+        >>> Response: {"result": true,
+        >>>            "data": {"tweets": [...], "next_cursor": "WzMsNDJd"}}
 
     Raises:
         Exception: При ошибках получения данных
@@ -99,26 +135,87 @@ async def get_tweets(
     logger.info(f" GET /tweets for user {current_user.id}")
 
     try:
-        tweets = await get_user_feed(session=session, user_id=current_user.id)
+        page = await get_user_feed(
+            session=session,
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            likes_mode=likes_mode,
+        )
         logger.debug(
-            f"Feed loaded: {len(tweets)} tweets for user {current_user.id}"
+            f"Feed loaded: {len(page['tweets'])} tweets \
+            for user {current_user.id}"
         )
 
-        return ApiResponse(result=True, data={"tweets": tweets})
+        return api_response(result=True, data=page)
+    except ValueError as e:
+        logger.warning(f"Invalid feed cursor from user {current_user.id}")
+
+        return api_response(
+            result=False, error_type="InvalidCursor", error_message=str(e)
+        )
     except Exception as e:
         logger.exception(f"Error loading feed for user {current_user.id}")
 
-        return ApiResponse(
+        return api_response(
+            result=False, error_type="ServerError", error_message=str(e)
+        )
+
+
+@router.post("/tweets/likes/lookup", response_model=LookupApiResponse)
+async def lookup_likes(
+    request: LookupRequest,
+    api_key: str = Header(...),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Проверяет, какие из переданных твитов лайкнул текущий пользователь.
+
+    Выполняется одним запросом по первичному ключу likes (user_id,
+    tweet_id), поэтому клиенту не нужно получать списки лайкнувших.
+
+    Args:
+        request: ID твитов (не более LOOKUP_MAX_IDS)
+        api_key: API-ключ пользователя
+        session: Асинхронная сессия БД
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ с битовой строкой в порядке переданных ID
+
+    Example:
+        >>> POST /api/tweets/likes/lookup
+        >>> {"ids": [5, 6, 7]}
+        >>> Response: {"result": true, "data": {"bitset": "101"}}
+    """
+    logger.info(
+        f"POST /tweets/likes/lookup for {len(request.ids)} tweets "
+        f"by user {current_user.id}"
+    )
+
+    try:
+        liked = await get_liked_tweet_ids(
+            session=session, user_id=current_user.id, tweet_ids=request.ids
+        )
+    except Exception as e:
+        logger.exception(f"Failed to look up likes of user {current_user.id}")
+
+        return api_response(
             result=False, error_type="ServerError", error_message=str(e)
         )
 
+    return api_response(
+        result=True, data={"bitset": membership_bitset(request.ids, liked)}
+    )
+
 
 @router.delete("/tweets/{tweet_id}", response_model=ApiResponse)
 async def delete_tweets(
     tweet_id: int,
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Удаляет твит, если он принадлежит текущему пользователю.
@@ -162,16 +259,82 @@ async def delete_tweets(
     return ApiResponse(result=True)
 
 
+@router.get("/tweets/{tweet_id}/likes", response_model=LikesApiResponse)
+async def get_likes(
+    tweet_id: int,
+    limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    api_key: str = Header(...),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Возвращает постраничный список пользователей, лайкнувших твит.
+
+    Args:
+        tweet_id: ID твита
+        limit: Размер страницы
+        cursor: Курсор следующей страницы (опционально)
+        api_key: API-ключ пользователя
+        session: Асинхронная сессия БД
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ со списком лайкнувших и курсором следующей страницы
+
+    Example:
+        >>> GET /api/tweets/5/likes?limit=2
+        >>> Response: {"result": true,
+        >>>            "data": {"likes": [{"user_id": 1, "name": "Alice"},
+        >>>                               {"user_id": 3, "name": "Bob"}],
+        >>>                     "next_cursor": "WzNd"}}
+
+    Raises:
+        NotFound: Если твит не найден
+    """
+    logger.info(f"GET /tweets/{tweet_id}/likes by user {current_user.id}")
+
+    try:
+        page = await get_tweet_likers(
+            session=session, tweet_id=tweet_id, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid likes cursor from user {current_user.id}")
+
+        return api_response(
+            result=False, error_type="InvalidCursor", error_message=str(e)
+        )
+    except Exception as e:
+        logger.exception(f"Failed to load likes of tweet {tweet_id}")
+
+        return api_response(
+            result=False, error_type="ServerError", error_message=str(e)
+        )
+
+    if page is None:
+        return api_response(
+            result=False,
+            error_type="NotFound",
+            error_message="Tweet not found",
+        )
+
+    return api_response(result=True, data=page)
+
+
 @router.post("/tweets/{tweet_id}/likes", response_model=ApiResponse)
 async def post_likes(
     tweet_id: int,
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Ставит лайк на указанный твит.
 
+    Повторный лайк не считается ошибкой: поле `changed` в ответе
+    показывает, изменилось ли состояние. При LIKE_BUFFER_ENABLED=1 запись
+    идёт через буфер пакетной записи (см. like_buffer).
+
     Args:
         tweet_id: ID твита
         api_key: API-ключ пользователя
@@ -183,16 +346,24 @@ async def post_likes(
 
     Example:
         >>> POST /api/tweets/5/likes
-        >>> Response: {"result": true}
+        >>> Response: {"result": true, "data": {"changed": true}}
     """
     logger.info(f"POST /tweets/{tweet_id}/likes by user {current_user.id}")
     try:
-        await add_like(
-            session=session, tweet_id=tweet_id, user_id=current_user.id
+        if like_buffer is not None:
+            changed = await like_buffer.submit(
+                user_id=current_user.id, tweet_id=tweet_id, liked=True
+            )
+        else:
+            changed = await add_like(
+                session=session, tweet_id=tweet_id, user_id=current_user.id
+            )
+        logger.info(
+            f"Like added: tweet={tweet_id}, user={current_user.id}, "
+            f"changed={changed}"
         )
-        logger.info(f"Like added: tweet={tweet_id}, user={current_user.id}")
 
-        return ApiResponse(result=True)
+        return ApiResponse(result=True, data={"changed": changed})
     except Exception as e:
         logger.exception(f"Failed to add like to tweet {tweet_id}")
 
@@ -206,11 +377,13 @@ async def delete_likes(
     tweet_id: int,
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Убирает лайк с указанного твита.
 
+    Поле `changed` в ответе показывает, был ли лайк.
+
     Args:
         tweet_id: ID твита
         api_key: API-ключ пользователя
@@ -222,17 +395,25 @@ async def delete_likes(
 
     Example:
         >>> DELETE /api/tweets/5/likes
-        >>> Response: {"result": true}
+        >>> Response: {"result": true, "data": {"changed": true}}
     """
     logger.info(f"DELETE /tweets/{tweet_id}/likes by user {current_user.id}")
 
     try:
-        await remove_like(
-            session=session, tweet_id=tweet_id, user_id=current_user.id
+        if like_buffer is not None:
+            changed = await like_buffer.submit(
+                user_id=current_user.id, tweet_id=tweet_id, liked=False
+            )
+        else:
+            changed = await remove_like(
+                session=session, tweet_id=tweet_id, user_id=current_user.id
+            )
+        logger.info(
+            f"Like removed: tweet={tweet_id}, user={current_user.id}, "
+            f"changed={changed}"
         )
-        logger.info(f"Like removed: tweet={tweet_id}, user={current_user.id}")
 
-        return ApiResponse(result=True)
+        return ApiResponse(result=True, data={"changed": changed})
     except Exception as e:
         logger.exception(f"Failed to remove like from tweet {tweet_id}")
 
@@ -2,32 +2,66 @@
 Маршруты для работы с профилями пользователей и подписками.
 """
 
-from fastapi import APIRouter, Depends, Header
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import (
+    LIST_DEFAULT_LIMIT,
+    LIST_MAX_LIMIT,
+    SUGGESTIONS_MAX_LIMIT,
+)
 from app.core.logging import get_logger
+from app.core.responses import api_response
 from app.core.security import get_current_user
 from app.db.database import get_db_session
-from app.db.models import User
-from app.schemas.response import ApiResponse
-from app.services.follower_service import follow_user, unfollow_user
-from app.services.user_service import get_user_profile
+from app.schemas.follower import BulkFollowRequest
+from app.schemas.lookup import LookupRequest
+from app.schemas.response import (
+    ApiResponse,
+    BulkFollowApiResponse,
+    LookupApiResponse,
+    RelationshipApiResponse,
+    SuggestionsApiResponse,
+    UserProfileApiResponse,
+    UsersApiResponse,
+)
+from app.schemas.user import CurrentUser
+from app.services.follower_service import (
+    FollowOutcome,
+    follow_user,
+    follow_users,
+    get_followed_user_ids,
+    unfollow_user,
+    unfollow_users,
+)
+from app.services.suggestion_service import get_suggestions
+from app.services.user_service import (
+    FollowDirection,
+    get_follow_list,
+    get_relationship,
+    get_user_profile,
+)
+from app.utils.bitset import membership_bitset
 
 logger = get_logger("users_api")
 
 router = APIRouter(prefix="/api", tags=["Users"])
 
 
-@router.get("/users/me", response_model=ApiResponse)
+@router.get("/users/me", response_model=UserProfileApiResponse)
 async def get_my_user_profile(
+    full: bool = Query(False),
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Возвращает профиль текущего авторизованного пользователя.
 
     Args:
+        full: Включить полные списки подписчиков и подписок
         api_key: API-ключ пользователя
         session: Асинхронная сессия БД
         current_user: Авторизованный пользователь
@@ -37,18 +71,21 @@ async def get_my_user_profile(
 
     Example:
         >>> GET /api/users/me
-        >>> Response: {"result": true, "data": {"user": {...}}}
+        >>> Response: {"result": true,
+        >>>            "data": {"user": {"id": 1, "name": "Alice",
+        >>>                              "followers_count": 2,
+        >>>                              "following_count": 1}}}
     """
     logger.info(f"GET /users/me from user {current_user.id}")
 
     profile = await get_user_profile(
-        session=session, target_user_id=current_user.id
+        session=session, target_user_id=current_user.id, full=full
     )
 
     if profile is None:
         logger.warning(f"User {current_user.id} profile not found")
 
-        return ApiResponse(
+        return api_response(
             result=False,
             error_type="UserNotFound",
             error_message="User not found",
@@ -56,21 +93,235 @@ async def get_my_user_profile(
 
     logger.debug(f"Profile retrieved for user {current_user.id}")
 
-    return ApiResponse(result=True, data={"user": profile})
+    return api_response(result=True, data={"user": profile})
+
+
+@router.get("/users/me/suggestions", response_model=SuggestionsApiResponse)
+async def get_my_suggestions(
+    limit: int = Query(10, ge=1, le=SUGGESTIONS_MAX_LIMIT),
+    api_key: str = Header(...),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Возвращает рекомендации «кого читать» для текущего пользователя.
+
+    Кандидаты — друзья друзей, ранжированные по количеству подписок
+    текущего пользователя, которые на них подписаны.
+
+    Args:
+        limit: Количество рекомендаций
+        api_key: API-ключ пользователя
+        session: Асинхронная сессия БД
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ со списком рекомендованных пользователей
+
+    Example:
+        >>> GET /api/users/me/suggestions?limit=1
+        >>> Response: {"result": true,
+        >>>            "data": {"users": [{"id": 7, "name": "Carol",
+        >>>                                "mutual_count": 3}]}}
+    """
+    logger.info(f"GET /users/me/suggestions by user {current_user.id}")
+
+    try:
+        users = await get_suggestions(
+            session=session, user_id=current_user.id, limit=limit
+        )
+    except Exception as e:
+        logger.exception(
+            f"Failed to build suggestions for user {current_user.id}"
+        )
+
+        return api_response(
+            result=False, error_type="ServerError", error_message=str(e)
+        )
+
+    return api_response(result=True, data={"users": users})
+
+
+@router.post("/users/following/lookup", response_model=LookupApiResponse)
+async def lookup_following(
+    request: LookupRequest,
+    api_key: str = Header(...),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Проверяет, на каких из переданных пользователей подписан текущий.
+
+    Выполняется одним запросом по первичному ключу followers
+    (follower_id, following_id), поэтому клиенту не нужно получать
+    списки подписок.
 
+    Args:
+        request: ID пользователей (не более LOOKUP_MAX_IDS)
+        api_key: API-ключ текущего пользователя
+        session: Асинхронная сессия БД
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ с битовой строкой в порядке переданных ID
+
+    Example:
+        >>> POST /api/users/following/lookup
+        >>> {"ids": [2, 3, 4]}
+        >>> Response: {"result": true, "data": {"bitset": "101"}}
+    """
+    logger.info(
+        f"POST /users/following/lookup for {len(request.ids)} users "
+        f"by user {current_user.id}"
+    )
+
+    try:
+        followed = await get_followed_user_ids(
+            session=session, follower_id=current_user.id, user_ids=request.ids
+        )
+    except Exception as e:
+        logger.exception(
+            f"Failed to look up following of user {current_user.id}"
+        )
+
+        return api_response(
+            result=False, error_type="ServerError", error_message=str(e)
+        )
+
+    return api_response(
+        result=True, data={"bitset": membership_bitset(request.ids, followed)}
+    )
 
-@router.get("/users/{user_id}", response_model=ApiResponse)
+
+@router.post("/users/follow/bulk", response_model=BulkFollowApiResponse)
+async def post_follow_users(
+    request: BulkFollowRequest,
+    api_key: str = Header(...),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Подписывает текущего пользователя на нескольких пользователей сразу.
+
+    Все подписки создаются одним запросом и одной транзакцией; подписка на
+    себя и несуществующие ID не ломают запрос, а получают свой результат.
+
+    Args:
+        request: ID пользователей (не более BULK_FOLLOW_MAX_IDS)
+        api_key: API-ключ текущего пользователя
+        session: Асинхронная сессия БД
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ с результатом для каждого ID
+
+    Example:
+        >>> POST /api/users/follow/bulk
+        >>> {"ids": [2, 3, 999]}
+        >>> Response: {"result": true,
+        >>>            "data": {"results": [
+        >>>                {"id": 2, "outcome": "followed"},
+        >>>                {"id": 3, "outcome": "already_following"},
+        >>>                {"id": 999, "outcome": "not_found"}]}}
+    """
+    logger.info(
+        f"POST /users/follow/bulk for {len(request.ids)} users "
+        f"by user {current_user.id}"
+    )
+
+    try:
+        outcomes = await follow_users(
+            session=session, follower_id=current_user.id, user_ids=request.ids
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to bulk follow by user {current_user.id}: {str(e)}"
+        )
+
+        return api_response(
+            result=False, error_type="FollowError", error_message=str(e)
+        )
+
+    return api_response(result=True, data=_bulk_result(outcomes))
+
+
+@router.post("/users/unfollow/bulk", response_model=BulkFollowApiResponse)
+async def post_unfollow_users(
+    request: BulkFollowRequest,
+    api_key: str = Header(...),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Отписывает текущего пользователя от нескольких пользователей сразу.
+
+    Args:
+        request: ID пользователей (не более BULK_FOLLOW_MAX_IDS)
+        api_key: API-ключ текущего пользователя
+        session: Асинхронная сессия БД
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ с результатом для каждого ID
+
+    Example:
+        >>> POST /api/users/unfollow/bulk
+        >>> {"ids": [2, 3]}
+        >>> Response: {"result": true,
+        >>>            "data": {"results": [
+        >>>                {"id": 2, "outcome": "unfollowed"},
+        >>>                {"id": 3, "outcome": "not_following"}]}}
+    """
+    logger.info(
+        f"POST /users/unfollow/bulk for {len(request.ids)} users "
+        f"by user {current_user.id}"
+    )
+
+    try:
+        outcomes = await unfollow_users(
+            session=session, follower_id=current_user.id, user_ids=request.ids
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to bulk unfollow by user {current_user.id}: {str(e)}"
+        )
+
+        return api_response(
+            result=False, error_type="UnfollowError", error_message=str(e)
+        )
+
+    return api_response(result=True, data=_bulk_result(outcomes))
+
+
+def _bulk_result(outcomes: Dict[int, FollowOutcome]) -> Dict[str, Any]:
+    """
+    Преобразует результаты массовой операции в данные ответа.
+    """
+    return {
+        "results": [
+            {"id": user_id, "outcome": outcome}
+            for user_id, outcome in outcomes.items()
+        ]
+    }
+
+
+@router.get("/users/{user_id}", response_model=UserProfileApiResponse)
 async def get_user_profile_by_id(
     user_id: int,
+    full: bool = Query(False),
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Возвращает профиль пользователя по его ID.
 
+    По умолчанию содержит количество подписчиков и подписок; полные
+    списки — только с `?full=true`.
+
     Args:
         user_id: ID запрашиваемого пользователя
+        full: Включить полные списки подписчиков и подписок
         api_key: API-ключ текущего пользователя
         session: Асинхронная сессия БД
         current_user: Авторизованный пользователь
@@ -84,12 +335,14 @@ async def get_user_profile_by_id(
     """
     logger.info(f"GET /users/{user_id} by user {current_user.id}")
 
-    profile = await get_user_profile(session=session, target_user_id=user_id)
+    profile = await get_user_profile(
+        session=session, target_user_id=user_id, full=full
+    )
 
     if profile is None:
         logger.warning(f"Profile not found for user {user_id}")
 
-        return ApiResponse(
+        return api_response(
             result=False,
             error_type="UserNotFound",
             error_message="User not found",
@@ -97,7 +350,208 @@ async def get_user_profile_by_id(
 
     logger.debug(f"Profile retrieved: user_id={user_id}")
 
-    return ApiResponse(result=True, data={"user": profile})
+    return api_response(result=True, data={"user": profile})
+
+
+@router.get("/users/{user_id}/followers", response_model=UsersApiResponse)
+async def get_user_followers(
+    user_id: int,
+    limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    api_key: str = Header(...),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Возвращает постраничный список подписчиков пользователя.
+
+    Args:
+        user_id: ID пользователя
+        limit: Размер страницы
+        cursor: Курсор следующей страницы (опционально)
+        api_key: API-ключ текущего пользователя
+        session: Асинхронная сессия БД
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ со списком подписчиков и курсором следующей страницы
+
+    Example:
+        >>> GET /api/users/1/followers?limit=2
+        >>> Response: {"result": true,
+        >>>            "data": {"users": [{"id": 2, "name": "Bob"},
+        >>>                               {"id": 5, "name": "Eve"}],
+        >>>                     "next_cursor": "WzVd"}}
+    """
+    logger.info(f"GET /users/{user_id}/followers by user {current_user.id}")
+
+    return await _follow_list_response(
+        session=session,
+        user_id=user_id,
+        direction="followers",
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+@router.get("/users/{user_id}/following", response_model=UsersApiResponse)
+async def get_user_following(
+    user_id: int,
+    limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    api_key: str = Header(...),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Возвращает постраничный список подписок пользователя.
+
+    Args:
+        user_id: ID пользователя
+        limit: Размер страницы
+        cursor: Курсор следующей страницы (опционально)
+        api_key: API-ключ текущего пользователя
+        session: Асинхронная сессия БД
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ со списком подписок и курсором следующей страницы
+
+    Example:
+        >>> GET /api/users/2/following
+        >>> Response: {"result": true,
+        >>>            "data": {"users": [{"id": 1, "name": "Alice"}],
+        >>>                     "next_cursor": null}}
+    """
+    logger.info(f"GET /users/{user_id}/following by user {current_user.id}")
+
+    return await _follow_list_response(
+        session=session,
+        user_id=user_id,
+        direction="following",
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+@router.get(
+    "/users/{user_id}/relationship", response_model=RelationshipApiResponse
+)
+async def get_user_relationship(
+    user_id: int,
+    limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None),
+    api_key: str = Header(...),
+    session: AsyncSession = Depends(get_db_session),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Возвращает отношения текущего пользователя с другим.
+
+    Отвечает, подписаны ли пользователи друг на друга, и возвращает
+    страницу общих подписчиков одним запросом — без загрузки двух
+    профилей целиком.
+
+    Args:
+        user_id: ID другого пользователя
+        limit: Размер страницы общих подписчиков
+        cursor: Курсор следующей страницы (опционально)
+        api_key: API-ключ текущего пользователя
+        session: Асинхронная сессия БД
+        current_user: Авторизованный пользователь
+
+    Returns:
+        JSON-ответ с отношениями и страницей общих подписчиков
+
+    Example:
+        >>> GET /api/users/2/relationship
+        >>> Response: {"result": true,
+        >>>            "data": {"user_id": 2, "you_follow": true,
+        >>>                     "follows_you": false,
+        >>>                     "mutual_followers": [{"id": 5,
+        >>>                                           "name": "Eve"}],
+        >>>                     "next_cursor": null}}
+
+    Raises:
+        InvalidCursor: Если курсор повреждён
+        UserNotFound: Если пользователь не найден
+    """
+    logger.info(f"GET /users/{user_id}/relationship by user {current_user.id}")
+
+    try:
+        relationship = await get_relationship(
+            session=session,
+            user_id=current_user.id,
+            other_id=user_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid relationship cursor for user {user_id}")
+
+        return api_response(
+            result=False, error_type="InvalidCursor", error_message=str(e)
+        )
+    except Exception as e:
+        logger.exception(f"Failed to load relationship with user {user_id}")
+
+        return api_response(
+            result=False, error_type="ServerError", error_message=str(e)
+        )
+
+    if relationship is None:
+        return api_response(
+            result=False,
+            error_type="UserNotFound",
+            error_message="User not found",
+        )
+
+    return api_response(result=True, data=relationship)
+
+
+async def _follow_list_response(
+    session: AsyncSession,
+    user_id: int,
+    direction: FollowDirection,
+    limit: int,
+    cursor: Optional[str],
+):
+    """
+    Загружает страницу подписчиков или подписок и формирует ответ API.
+
+    Raises:
+        InvalidCursor: Если курсор повреждён
+        UserNotFound: Если пользователь не найден
+    """
+    try:
+        page = await get_follow_list(
+            session=session,
+            user_id=user_id,
+            direction=direction,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid {direction} cursor for user {user_id}")
+
+        return api_response(
+            result=False, error_type="InvalidCursor", error_message=str(e)
+        )
+    except Exception as e:
+        logger.exception(f"Failed to load {direction} of user {user_id}")
+
+        return api_response(
+            result=False, error_type="ServerError", error_message=str(e)
+        )
+
+    if page is None:
+        return api_response(
+            result=False,
+            error_type="UserNotFound",
+            error_message="User not found",
+        )
+
+    return api_response(result=True, data=page)
 
 
 @router.post("/users/{user_id}/follow", response_model=ApiResponse)
@@ -105,11 +559,13 @@ async def post_follow_user(
     user_id: int,
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Подписывает текущего пользователя на другого.
 
+    Поле `changed` в ответе показывает, была ли создана новая подписка.
+
     Args:
         user_id: ID пользователя, на которого подписываются
         api_key: API-ключ текущего пользователя
@@ -134,13 +590,16 @@ async def post_follow_user(
         )
 
     try:
-        await follow_user(
+        changed = await follow_user(
             session=session, follower_id=current_user.id, following_id=user_id
         )
 
-        logger.info(f"User {current_user.id} followed user {user_id}")
+        logger.info(
+            f"User {current_user.id} followed user {user_id}, "
+            f"changed={changed}"
+        )
 
-        return ApiResponse(result=True)
+        return ApiResponse(result=True, data={"changed": changed})
 
     except Exception as e:
         logger.error(
@@ -157,11 +616,13 @@ async def delete_unfollow_user(
     user_id: int,
     api_key: str = Header(...),
     session: AsyncSession = Depends(get_db_session),
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Отписывает текущего пользователя от другого.
 
+    Поле `changed` в ответе показывает, была ли подписка.
+
     Args:
         user_id: ID пользователя, от которого отписываются
         api_key: API-ключ текущего пользователя
@@ -174,13 +635,16 @@ async def delete_unfollow_user(
     logger.info(f"DELETE /users/{user_id}/follow by user {current_user.id}")
 
     try:
-        await unfollow_user(
+        changed = await unfollow_user(
             session=session, follower_id=current_user.id, following_id=user_id
         )
 
-        logger.info(f"User {current_user.id} unfollowed user {user_id}")
+        logger.info(
+            f"User {current_user.id} unfollowed user {user_id}, "
+            f"changed={changed}"
+        )
 
-        return ApiResponse(result=True)
+        return ApiResponse(result=True, data={"changed": changed})
 
     except Exception as e:
         logger.error(f"Failed to unfollow user {user_id}: {str(e)}")
@@ -0,0 +1,67 @@
+"""
+Команда проверки и исправления денормализованных счётчиков.
+
+Запуск:
+    python -m app.commands.check_counters             # только проверка
+    python -m app.commands.check_counters --repair
+
+Без --repair завершается с кодом 1, если найдены расхождения, поэтому её
+можно запускать по расписанию как проверку целостности.
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Dict
+
+from app.core.logging import get_logger, setup_logging
+from app.db.database import async_session_maker, engine
+from app.services.counter_service import check_counters
+
+logger = get_logger("check_counters")
+
+
+async def run(repair: bool = False) -> Dict[str, int]:
+    """
+    Проверяет счётчики в отдельной сессии и закрывает пул соединений.
+
+    Args:
+        repair: Пересчитать разошедшиеся счётчики
+
+    Returns:
+        Словарь {имя счётчика: количество разошедшихся строк}
+    """
+    try:
+        async with async_session_maker() as session:
+            return await check_counters(session=session, repair=repair)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Check denormalized counters against source tables."
+    )
+    parser.add_argument(
+        "--repair",
+        action="store_true",
+        help="Recompute drifted counters (default: report only).",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    drift = asyncio.run(run(repair=args.repair))
+    total = sum(drift.values())
+
+    if args.repair:
+        logger.info(f"Done: {total} counters repaired")
+    elif total:
+        logger.error(f"Found {total} drifted counters, run with --repair")
+        sys.exit(1)
+    else:
+        logger.info("Done: all counters are consistent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Команда пересборки материализованных лент.
+
+Запуск:
+    python -m app.commands.rebuild_timelines            # все пользователи
+    python -m app.commands.rebuild_timelines --user-id 1
+"""
+
+import argparse
+import asyncio
+from typing import Optional
+
+from app.core.logging import get_logger, setup_logging
+from app.db.database import async_session_maker, engine
+from app.services.timeline_service import rebuild_timelines
+
+logger = get_logger("rebuild_timelines")
+
+
+async def run(user_id: Optional[int] = None) -> int:
+    """
+    Пересобирает ленты в отдельной сессии и закрывает пул соединений.
+
+    Args:
+        user_id: ID пользователя; если не указан — пересобираются все ленты
+
+    Returns:
+        Количество записей в пересобранных лентах
+    """
+    try:
+        async with async_session_maker() as session:
+            return await rebuild_timelines(session=session, user_id=user_id)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Rebuild materialized home timelines."
+    )
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        default=None,
+        help="Rebuild only this user's timeline (default: all users).",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    count = asyncio.run(run(user_id=args.user_id))
+    logger.info(f"Done: {count} timeline entries written")
+
+
+if __name__ == "__main__":
+    main()
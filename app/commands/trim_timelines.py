@@ -0,0 +1,58 @@
+"""
+Команда обрезки материализованных лент до TIMELINE_MAX_ENTRIES записей.
+
+Fan-out не обрезает ленты подписчиков, поэтому команду нужно запускать по
+расписанию (например, раз в час из cron):
+    python -m app.commands.trim_timelines
+    python -m app.commands.trim_timelines --batch-size 200
+"""
+
+import argparse
+import asyncio
+
+from app.core.logging import get_logger, setup_logging
+from app.db.database import async_session_maker, engine
+from app.services.timeline_service import trim_oversized_timelines
+
+logger = get_logger("trim_timelines")
+
+
+async def run(batch_size: int) -> int:
+    """
+    Обрезает ленты в отдельной сессии и закрывает пул соединений.
+
+    Args:
+        batch_size: Количество лент в одной транзакции
+
+    Returns:
+        Количество удалённых записей
+    """
+    try:
+        async with async_session_maker() as session:
+            return await trim_oversized_timelines(
+                session=session, batch_size=batch_size
+            )
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Trim materialized home timelines to the size cap."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Timelines trimmed per transaction (default: 500).",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    count = asyncio.run(run(batch_size=args.batch_size))
+    logger.info(f"Done: {count} timeline entries removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Общий кэш приложения с подключаемыми бэкендами.
+
+Сервисы работают только с интерфейсом CacheBackend, а конкретная
+реализация выбирается переменной окружения CACHE_URL:
+
+- `memory://` — кэш в памяти процесса (по умолчанию);
+- `redis://[:password@]host:port/db` — любой сервер, говорящий на
+  протоколе Redis (клиент redis.asyncio), общий для всех воркеров uvicorn.
+
+Все ключи версионируются префиксом `{CACHE_KEY_PREFIX}:v{CACHE_KEY_VERSION}`,
+поэтому смена формата значений при деплое не читает старые записи.
+Значения должны быть JSON-сериализуемыми.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Sequence
+from urllib.parse import urlparse
+
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.exceptions import ConnectionError
+
+from app.core.config import (
+    CACHE_KEY_PREFIX,
+    CACHE_KEY_VERSION,
+    CACHE_MEMORY_SIZE,
+    CACHE_POOL_SIZE,
+    CACHE_TIMEOUT,
+    CACHE_URL,
+)
+from app.core.logging import get_logger
+from app.utils.cache import TTLCache
+
+logger = get_logger("cache")
+
+
+class CacheBackend(ABC):
+    """
+    Интерфейс бэкенда кэша.
+
+    Ошибки бэкенда не должны ломать запрос: реализации логируют их и
+    ведут себя как при промахе.
+
+    Attributes:
+        hits: Количество попаданий
+        misses: Количество промахов
+        errors: Количество ошибок обращения к бэкенду
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(key: str) -> str:
+        """
+        Добавляет к ключу префикс приложения и версию формата.
+
+        Args:
+            key: Ключ сервиса (например, `feed:1`)
+
+        Returns:
+            Полный ключ (например, `microblog:v1:feed:1`)
+        """
+        return f"{CACHE_KEY_PREFIX}:v{CACHE_KEY_VERSION}:{key}"
+
+    async def get(self, key: str) -> Any:
+        """
+        Возвращает значение по ключу.
+
+        Args:
+            key: Ключ сервиса
+
+        Returns:
+            Значение или None при промахе
+        """
+        return (await self.get_many([key]))[key]
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """
+        Возвращает значения нескольких ключей за одно обращение.
+
+        Args:
+            keys: Ключи сервиса
+
+        Returns:
+            Словарь {ключ: значение или None}
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Сохраняет значение с временем жизни.
+
+        Args:
+            key: Ключ сервиса
+            value: JSON-сериализуемое значение
+            ttl: Время жизни в секундах
+        """
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """
+        Удаляет ключи.
+
+        Args:
+            keys: Ключи сервиса
+        """
+
+    async def close(self) -> None:
+        """Освобождает ресурсы бэкенда (соединения)."""
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Возвращает счётчики бэкенда.
+
+        Returns:
+            Словарь с полями: backend, hits, misses, errors
+        """
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+    def _count(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        for value in values.values():
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return values
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Бэкенд в памяти процесса поверх TTLCache (LRU + TTL).
+
+    Значения хранятся без сериализации, поэтому вызывающий код не должен
+    изменять полученные объекты. Попадания и промахи считает сам TTLCache.
+
+    Attributes:
+        store: Хранилище записей
+    """
+
+    def __init__(self, maxsize: int = CACHE_MEMORY_SIZE) -> None:
+        super().__init__()
+        self.store = TTLCache(maxsize=maxsize, ttl=0)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        return {key: self.store.get(self.make_key(key)) for key in keys}
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.store.set(self.make_key(key), value, ttl=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.store.delete(self.make_key(key))
+
+    def stats(self) -> Dict[str, Any]:
+        store = self.store.stats()
+
+        return {
+            **super().stats(),
+            "hits": store["hits"],
+            "misses": store["misses"],
+            "size": store["size"],
+            "maxsize": store["maxsize"],
+            "evictions": store["evictions"],
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Бэкенд для серверов с протоколом Redis на клиенте redis.asyncio.
+
+    Соединения берутся из ограниченного пула (BlockingConnectionPool):
+    при исчерпании пула запрос ждёт свободное соединение не дольше
+    timeout, оборванное соединение клиент переоткрывает. Значения хранятся
+    в JSON.
+
+    Example:
+        >>> backend = RedisCacheBackend("redis://localhost:6379/0")
+        >>> await backend.set("feed:1", {"tweets": []}, ttl=30)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = CACHE_POOL_SIZE,
+        timeout: float = CACHE_TIMEOUT,
+    ) -> None:
+        super().__init__()
+        self.pool = BlockingConnectionPool.from_url(
+            url,
+            max_connections=pool_size,
+            timeout=timeout,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+            # Соединение, закрытое сервером (перезапуск Redis), заменяется
+            # новым, и команда повторяется один раз
+            retry=Retry(NoBackoff(), 1),
+            retry_on_error=[ConnectionError],
+            decode_responses=True,
+        )
+        self.client = Redis(connection_pool=self.pool)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        if not keys:
+            return {}
+
+        reply = await self._call("MGET", *(self.make_key(k) for k in keys))
+        values = reply if isinstance(reply, list) else [None] * len(keys)
+
+        return self._count(
+            {
+                key: json.loads(raw) if raw is not None else None
+                for key, raw in zip(keys, values)
+            }
+        )
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._call(
+            "SET",
+            self.make_key(key),
+            json.dumps(value, separators=(",", ":")),
+            "PX",
+            max(int(ttl * 1000), 1),
+        )
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._call("DEL", *(self.make_key(key) for key in keys))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+        await self.pool.aclose()
+
+    async def _call(self, *args: Any) -> Any:
+        """
+        Выполняет команду; при ошибке логирует её и возвращает None.
+        """
+        try:
+            return await self.client.execute_command(*args)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache command {args[0]} failed: {e!r}")
+
+            return None
+
+
+def create_cache_backend(url: Optional[str] = CACHE_URL) -> CacheBackend:
+    """
+    Создаёт бэкенд кэша по URL.
+
+    Args:
+        url: `memory://` или `redis://[:password@]host:port/db`
+
+    Returns:
+        Экземпляр бэкенда
+
+    Raises:
+        ValueError: Если схема URL не поддерживается
+    """
+    scheme = urlparse(url or "memory://").scheme
+
+    if scheme == "memory":
+        return InMemoryCacheBackend()
+    if scheme == "redis":
+        return RedisCacheBackend(str(url))
+
+    raise ValueError(f"Unsupported cache backend: {scheme}")
+
+
+cache = create_cache_backend()
+
+logger.info(f"Cache backend: {type(cache).__name__}")
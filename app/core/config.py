@@ -0,0 +1,115 @@
+"""
+Настройки приложения, читаемые из переменных окружения.
+"""
+
+from os import getenv
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# Количество воркеров приложения; эту же переменную читают uvicorn и
+# gunicorn как значение --workers по умолчанию
+WEB_CONCURRENCY = int(getenv("WEB_CONCURRENCY", "1"))
+
+# Пагинация ленты
+FEED_DEFAULT_LIMIT = int(getenv("FEED_DEFAULT_LIMIT", "50"))
+FEED_MAX_LIMIT = int(getenv("FEED_MAX_LIMIT", "200"))
+# Сколько лайкнувших показывать в твите в режиме likes_mode=summary
+FEED_LIKERS_SAMPLE = int(getenv("FEED_LIKERS_SAMPLE", "3"))
+# Движок ленты: json (один запрос с агрегацией JSON в СУБД) или orm
+FEED_ENGINE = getenv("FEED_ENGINE", "json")
+
+# Пагинация списков пользователей (лайкнувшие, подписчики)
+LIST_DEFAULT_LIMIT = int(getenv("LIST_DEFAULT_LIMIT", "50"))
+LIST_MAX_LIMIT = int(getenv("LIST_MAX_LIMIT", "200"))
+
+# Максимум ID в одном запросе пакетной проверки (лайки, подписки)
+LOOKUP_MAX_IDS = int(getenv("LOOKUP_MAX_IDS", "500"))
+# Максимум пользователей в одном запросе массовой (от)подписки
+BULK_FOLLOW_MAX_IDS = int(getenv("BULK_FOLLOW_MAX_IDS", "200"))
+
+# Общий кэш: memory:// или redis://[:password@]host:port/db
+CACHE_URL = getenv("CACHE_URL", "memory://")
+CACHE_KEY_PREFIX = getenv("CACHE_KEY_PREFIX", "microblog")
+CACHE_KEY_VERSION = int(getenv("CACHE_KEY_VERSION", "1"))
+CACHE_MEMORY_SIZE = int(getenv("CACHE_MEMORY_SIZE", "10000"))
+CACHE_POOL_SIZE = int(getenv("CACHE_POOL_SIZE", "10"))
+CACHE_TIMEOUT = float(getenv("CACHE_TIMEOUT", "0.2"))
+
+# Кэш аутентификации по API-ключу (секунды): валидные и невалидные ключи;
+# невалидные хранятся в отдельном кэше процесса ограниченного размера
+AUTH_CACHE_TTL = float(getenv("AUTH_CACHE_TTL", "60"))
+AUTH_NEGATIVE_TTL = float(getenv("AUTH_NEGATIVE_TTL", "5"))
+AUTH_NEGATIVE_CACHE_SIZE = int(getenv("AUTH_NEGATIVE_CACHE_SIZE", "1024"))
+
+# Буфер записи лайков (см. app.services.like_buffer)
+LIKE_BUFFER_ENABLED = getenv("LIKE_BUFFER_ENABLED", "0") == "1"
+LIKE_BUFFER_INTERVAL_MS = float(getenv("LIKE_BUFFER_INTERVAL_MS", "5"))
+LIKE_BUFFER_MAX_BATCH = int(getenv("LIKE_BUFFER_MAX_BATCH", "500"))
+
+# Индекс графа подписок в памяти процесса (см. app.services.follow_graph)
+FOLLOW_GRAPH_ENABLED = getenv("FOLLOW_GRAPH_ENABLED", "0") == "1"
+FOLLOW_GRAPH_BATCH_SIZE = int(getenv("FOLLOW_GRAPH_BATCH_SIZE", "10000"))
+# Период перезагрузки индекса (секунды): подхватывает изменения, сделанные
+# в обход сервисов
+FOLLOW_GRAPH_REFRESH_SECONDS = float(
+    getenv("FOLLOW_GRAPH_REFRESH_SECONDS", "60")
+)
+
+# Рекомендации «кого читать» (см. app.services.suggestion_service)
+SUGGESTIONS_MAX_LIMIT = int(getenv("SUGGESTIONS_MAX_LIMIT", "50"))
+SUGGESTIONS_MAX_SOURCES = int(getenv("SUGGESTIONS_MAX_SOURCES", "1000"))
+SUGGESTIONS_TIME_BUDGET_MS = float(getenv("SUGGESTIONS_TIME_BUDGET_MS", "30"))
+SUGGESTIONS_CACHE_TTL = float(getenv("SUGGESTIONS_CACHE_TTL", "300"))
+
+# Загрузка медиа: папка файлов, размер порции чтения и лимиты по типам
+MEDIA_ROOT = getenv("MEDIA_ROOT", "app/media")
+UPLOAD_CHUNK_SIZE = int(getenv("UPLOAD_CHUNK_SIZE", str(2**20)))
+MEDIA_MAX_IMAGE_BYTES = int(getenv("MEDIA_MAX_IMAGE_BYTES", str(10 * 2**20)))
+MEDIA_MAX_VIDEO_BYTES = int(getenv("MEDIA_MAX_VIDEO_BYTES", str(500 * 2**20)))
+MEDIA_MAX_OTHER_BYTES = int(getenv("MEDIA_MAX_OTHER_BYTES", str(10 * 2**20)))
+
+# Хранилище медиа (см. app.core.storage): local:// или s3://bucket[/prefix]
+MEDIA_STORAGE_URL = getenv("MEDIA_STORAGE_URL", "local://")
+S3_ENDPOINT_URL = getenv("S3_ENDPOINT_URL")
+S3_REGION = getenv("S3_REGION", "us-east-1")
+S3_ACCESS_KEY_ID = getenv("S3_ACCESS_KEY_ID", "")
+S3_SECRET_ACCESS_KEY = getenv("S3_SECRET_ACCESS_KEY", "")
+# Публичный адрес бакета (CDN); без него клиенты получают подписанные ссылки
+S3_PUBLIC_URL = getenv("S3_PUBLIC_URL")
+S3_PRESIGN_EXPIRES = int(getenv("S3_PRESIGN_EXPIRES", "3600"))
+# Размер части multipart upload (S3 требует не меньше 5 МиБ)
+S3_PART_SIZE = int(getenv("S3_PART_SIZE", str(8 * 2**20)))
+
+# Отдача медиа: python (FileResponse) или accel (X-Accel-Redirect в nginx,
+# внутренний location MEDIA_ACCEL_PREFIX)
+MEDIA_SERVE_MODE = getenv("MEDIA_SERVE_MODE", "python")
+MEDIA_ACCEL_PREFIX = getenv("MEDIA_ACCEL_PREFIX", "/_media/")
+# Cache-Control для файлов, не адресуемых по содержимому (секунды)
+MEDIA_CACHE_MAX_AGE = int(getenv("MEDIA_CACHE_MAX_AGE", "86400"))
+
+# Уменьшенные копии изображений (см. app.services.media_pipeline)
+MEDIA_VARIANTS_ENABLED = getenv("MEDIA_VARIANTS_ENABLED", "0") == "1"
+MEDIA_VARIANT_WIDTHS = tuple(
+    int(width)
+    for width in getenv("MEDIA_VARIANT_WIDTHS", "320,1080").split(",")
+)
+MEDIA_VARIANT_QUALITY = int(getenv("MEDIA_VARIANT_QUALITY", "80"))
+MEDIA_VARIANTS_WORKERS = int(getenv("MEDIA_VARIANTS_WORKERS", "2"))
+MEDIA_VARIANTS_QUEUE_SIZE = int(getenv("MEDIA_VARIANTS_QUEUE_SIZE", "100"))
+
+# Кэш первых страниц ленты
+FEED_CACHE_TTL = float(getenv("FEED_CACHE_TTL", "30"))
+# Время жизни снимка порядка ленты, на который ссылается курсор (секунды);
+# должно быть больше FEED_CACHE_TTL: курсор кэшированной страницы ссылается
+# на снимок, сделанный при её построении
+FEED_SNAPSHOT_TTL = float(getenv("FEED_SNAPSHOT_TTL", "600"))
+# Сколько страниц ленты покрывает снимок; дальше листание идёт по ключу
+FEED_SNAPSHOT_PAGES = int(getenv("FEED_SNAPSHOT_PAGES", "10"))
+
+# Материализованные ленты (см. app.services.timeline_service): сколько
+# последних твитов ленты ранжируется по популярности и хранится после
+# обрезки командой app.commands.trim_timelines
+TIMELINE_MAX_ENTRIES = int(getenv("TIMELINE_MAX_ENTRIES", "800"))
@@ -0,0 +1,58 @@
+"""
+Быстрая JSON-сериализация ответов API.
+
+FastAPI по умолчанию валидирует возвращаемый объект по response_model и
+прогоняет его через jsonable_encoder, а затем через json.dumps. Для
+больших лент это основная нагрузка на CPU после БД. Эндпоинты чтения
+возвращают готовые словари сервисов через `api_response`: они
+сериализуются orjson напрямую в байты, а response_model остаётся только
+источником схемы OpenAPI.
+"""
+
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ, сериализуемый orjson.
+
+    Принимает только встроенные типы (dict, list, str, int, ...), поэтому
+    содержимое должно быть уже приведено к виду ответа.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def api_response(
+    result: bool,
+    data: Optional[Dict[str, Any]] = None,
+    error_type: Optional[str] = None,
+    error_message: Optional[str] = None,
+) -> FastJSONResponse:
+    """
+    Формирует ответ в формате ApiResponse без валидации Pydantic.
+
+    Args:
+        result: true — успех, false — ошибка
+        data: Данные ответа (опционально)
+        error_type: Тип ошибки (если result == false)
+        error_message: Подробное сообщение об ошибке
+
+    Returns:
+        Готовый HTTP-ответ
+
+    Example:
+        >>> api_response(True, data={"tweets": [], "next_cursor": None})
+    """
+    return FastJSONResponse(
+        {
+            "result": result,
+            "data": data,
+            "error_type": error_type,
+            "error_message": error_message,
+        }
+    )
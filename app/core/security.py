@@ -1,24 +1,113 @@
 """
 Модуль аутентификации через API-ключ.
+
+Валидный ключ кэшируется в общем кэше (см. app.core.cache) на
+AUTH_CACHE_TTL секунд. Невалидный — в отдельном маленьком кэше процесса
+(AUTH_NEGATIVE_CACHE_SIZE записей) на AUTH_NEGATIVE_TTL секунд, чтобы
+клиенты с неверным ключом не нагружали БД: перебор случайных ключей
+вытесняет только отрицательные записи и не трогает кэш валидных ключей.
+В ключах кэша используется хэш API-ключа, а не сам ключ.
+
+При удалении пользователя или смене его ключа нужно вызвать
+`invalidate_api_keys` со старым ключом.
 """
 
+from hashlib import sha256
 from typing import Optional
 
 from fastapi import Depends, Header, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache
+from app.core.config import (
+    AUTH_CACHE_TTL,
+    AUTH_NEGATIVE_CACHE_SIZE,
+    AUTH_NEGATIVE_TTL,
+)
 from app.db.database import get_db_session
 from app.db.models import User
+from app.schemas.user import CurrentUser
+from app.utils.cache import TTLCache
 
 from .logging import get_logger
 
 logger = get_logger("security")
 
+# Невалидные ключи: локально для процесса, вытеснение не затрагивает кэш
+# валидных ключей
+negative_auth_cache = TTLCache(
+    maxsize=AUTH_NEGATIVE_CACHE_SIZE, ttl=AUTH_NEGATIVE_TTL
+)
+
+
+def auth_key(api_key: str) -> str:
+    """
+    Возвращает ключ кэша аутентификации для API-ключа.
+
+    Args:
+        api_key: API-ключ
+
+    Returns:
+        Ключ вида `auth:{sha256(api_key)}`
+    """
+    return f"auth:{sha256(api_key.encode()).hexdigest()}"
+
+
+async def invalidate_api_keys(*api_keys: str) -> None:
+    """
+    Удаляет результаты проверки API-ключей из кэша.
+
+    Вызывается при удалении пользователя, смене его ключа и создании
+    пользователя (чтобы сбросить отрицательный результат). Отрицательный
+    результат сбрасывается только в текущем процессе, в остальных он
+    истекает через AUTH_NEGATIVE_TTL секунд.
+
+    Args:
+        api_keys: API-ключи
+
+    Example:
+        >>> await invalidate_api_keys(old_key)
+    """
+    if api_keys:
+        keys = [auth_key(api_key) for api_key in api_keys]
+
+        for key in keys:
+            negative_auth_cache.delete(key)
+
+        await cache.delete(*keys)
+        logger.debug(f"Invalidated {len(api_keys)} cached api-keys")
+
+
+async def _load_user(
+    session: AsyncSession, api_key: str
+) -> Optional[CurrentUser]:
+    """
+    Проверяет API-ключ по БД и кэширует результат (отрицательный — в
+    кэше процесса).
+    """
+    result = await session.execute(
+        select(User.id, User.name).where(User.api_key == api_key)
+    )
+    row = result.one_or_none()
+
+    if row is None:
+        negative_auth_cache.set(auth_key(api_key), True)
+        return None
+
+    user = CurrentUser(id=row.id, name=row.name, api_key=api_key)
+    await cache.set(
+        auth_key(api_key),
+        {"user": {"id": user.id, "name": user.name}},
+        AUTH_CACHE_TTL,
+    )
+
+    return user
+
 
 async def get_current_user(
     api_key: str = Header(...), session: AsyncSession = Depends(get_db_session)
-) -> Optional[User]:
+) -> CurrentUser:
     """
     Получает текущего пользователя по API-ключу.
 
@@ -29,19 +118,27 @@ async def get_current_user(
         session: Асинхронная сессия БД
 
     Returns:
-        Объект пользователя, если ключ валиден
+        Идентичность пользователя (id, name, api_key), если ключ валиден
 
     Raises:
         HTTPException(403): Если ключ недействителен
 
     Example:
         >>> @router.get("/users/me")
-        >>> async def me(user: User = Depends(get_current_user)):
+        >>> async def me(user: CurrentUser = Depends(get_current_user)):
         >>>     return user
     """
     logger.debug(f"Authenticating user with api-key: {api_key[:1]}...")
-    result = await session.execute(select(User).where(User.api_key == api_key))
-    user = result.scalar_one_or_none()
+    key = auth_key(api_key)
+    user = None
+
+    if not negative_auth_cache.get(key, False):
+        cached = await cache.get(key)
+
+        if cached is not None:
+            user = CurrentUser(**cached["user"], api_key=api_key)
+        else:
+            user = await _load_user(session=session, api_key=api_key)
 
     if user is None:
         logger.warning(
@@ -49,6 +146,6 @@ async def get_current_user(
         )
         raise HTTPException(status_code=403, detail="Invalid API key")
 
-    logger.info(f"Authenticated user: {user.name} (ID: {user.id})")
+    logger.debug(f"Authenticated user: {user.name} (ID: {user.id})")
 
     return user
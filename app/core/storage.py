@@ -0,0 +1,601 @@
+"""
+Хранилище медиафайлов с подключаемыми бэкендами.
+
+Сервисы работают только с интерфейсом StorageBackend: ключ объекта — путь
+файла внутри хранилища (например, `ab/cd/abcd….jpg`). Реализация
+выбирается переменной окружения MEDIA_STORAGE_URL:
+
+- `local://` — папка MEDIA_ROOT на диске узла (по умолчанию);
+- `s3://bucket[/prefix]` — любое S3-совместимое хранилище (AWS S3, MinIO,
+  Ceph RGW), общее для всех контейнеров бэкенда. Адрес и ключи доступа
+  задаются переменными S3_*. Большие файлы загружаются по частям
+  (multipart upload), клиентам отдаются публичные (S3_PUBLIC_URL) или
+  подписанные ссылки.
+
+Клиент S3 — aiobotocore (подпись запросов, повторы, multipart upload и
+подписанные ссылки делает botocore); адресация path-style
+(`{endpoint}/{bucket}/{key}`).
+"""
+
+import asyncio
+import os
+import stat
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import quote, urlparse
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.core.config import (
+    MEDIA_ROOT,
+    MEDIA_STORAGE_URL,
+    S3_ACCESS_KEY_ID,
+    S3_ENDPOINT_URL,
+    S3_PART_SIZE,
+    S3_PRESIGN_EXPIRES,
+    S3_PUBLIC_URL,
+    S3_REGION,
+    S3_SECRET_ACCESS_KEY,
+    UPLOAD_CHUNK_SIZE,
+)
+from app.core.logging import get_logger
+
+logger = get_logger("storage")
+
+
+class StorageError(Exception):
+    """Ошибка обращения к хранилищу."""
+
+
+class StoredObject:
+    """
+    Метаданные объекта хранилища.
+
+    Attributes:
+        size: Размер в байтах
+        etag: Версия объекта (ETag S3 или mtime и размер файла)
+    """
+
+    def __init__(self, size: int, etag: str) -> None:
+        self.size = size
+        self.etag = etag
+
+
+class StorageBackend(ABC):
+    """
+    Интерфейс бэкенда хранилища медиафайлов.
+
+    Attributes:
+        staging_dir: Папка для временных файлов загрузок, из которой
+            `put_file` забирает файлы
+        puts: Количество записанных объектов
+        bytes_put: Сколько байт записано
+        deletes: Количество удалённых объектов
+        url_expires: Срок действия ссылок `url` в секундах; None — ссылки
+            постоянные (или бэкенд их не выдаёт)
+    """
+
+    def __init__(self, staging_dir: str) -> None:
+        self.staging_dir = staging_dir
+        self.url_expires: Optional[int] = None
+        self.puts = 0
+        self.bytes_put = 0
+        self.deletes = 0
+
+    @abstractmethod
+    async def put(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Записывает объект из потока порций.
+
+        Объект становится виден под ключом только после записи целиком.
+
+        Args:
+            key: Ключ объекта
+            chunks: Асинхронный поток байтов
+
+        Returns:
+            Размер записанного объекта
+
+        Raises:
+            StorageError: При ошибке хранилища
+        """
+
+    async def put_file(self, key: str, path: str) -> int:
+        """
+        Переносит локальный файл в хранилище; файл-источник удаляется.
+
+        Args:
+            key: Ключ объекта
+            path: Путь к файлу (обычно в staging_dir)
+
+        Returns:
+            Размер записанного объекта
+        """
+        size = await self.put(key, read_file_chunks(path))
+        await asyncio.to_thread(os.unlink, path)
+
+        return size
+
+    @abstractmethod
+    def get(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Читает объект (или диапазон байтов) потоком порций.
+
+        Args:
+            key: Ключ объекта
+            start: Первый байт
+            end: Последний байт включительно (None — до конца)
+
+        Returns:
+            Асинхронный поток байтов
+
+        Raises:
+            FileNotFoundError: Если объекта нет
+        """
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        """
+        Возвращает метаданные объекта.
+
+        Returns:
+            Метаданные или None, если объекта нет
+        """
+
+    async def exists(self, key: str) -> bool:
+        """Проверяет, есть ли объект в хранилище."""
+        return await self.stat(key) is not None
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """
+        Удаляет объект.
+
+        Returns:
+            False, если объекта точно не было (S3 этого не сообщает и
+            всегда возвращает True)
+        """
+
+    async def url(self, key: str) -> Optional[str]:
+        """
+        Возвращает ссылку, по которой клиент скачает объект напрямую.
+
+        Returns:
+            Публичная или подписанная ссылка; None — объект отдаёт
+            приложение
+        """
+        return None
+
+    def local_path(self, key: str) -> Optional[str]:
+        """
+        Возвращает путь к объекту на диске, если хранилище локальное.
+        """
+        return None
+
+    async def close(self) -> None:
+        """Освобождает ресурсы бэкенда (соединения)."""
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Возвращает счётчики бэкенда.
+
+        Returns:
+            Словарь с полями: backend, puts, bytes_put, deletes
+        """
+        return {
+            "backend": type(self).__name__,
+            "puts": self.puts,
+            "bytes_put": self.bytes_put,
+            "deletes": self.deletes,
+        }
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Хранилище в папке на диске.
+
+    Временные файлы загрузок создаются в той же папке, поэтому
+    `put_file` — атомарное переименование без копирования.
+
+    Example:
+        >>> backend = LocalStorageBackend("app/media")
+        >>> await backend.exists("ab/cd/abcd.jpg")
+        False
+    """
+
+    def __init__(self, root: str = MEDIA_ROOT) -> None:
+        super().__init__(staging_dir=root)
+        self.root = root
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    async def put(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        path = self.local_path(key)
+        await asyncio.to_thread(
+            os.makedirs, os.path.dirname(path), exist_ok=True
+        )
+        fd, temp_path = tempfile.mkstemp(
+            prefix=".put-", suffix=".part", dir=os.path.dirname(path)
+        )
+        size = 0
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+
+            await asyncio.to_thread(os.replace, temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        self._count_put(size)
+
+        return size
+
+    async def put_file(self, key: str, path: str) -> int:
+        target = self.local_path(key)
+        await asyncio.to_thread(
+            os.makedirs, os.path.dirname(target), exist_ok=True
+        )
+        size = (await asyncio.to_thread(os.stat, path)).st_size
+        await asyncio.to_thread(os.replace, path, target)
+        self._count_put(size)
+
+        return size
+
+    async def get(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self.local_path(key), "rb")
+
+        try:
+            await asyncio.to_thread(f.seek, start)
+            left = None if end is None else end - start + 1
+
+            while left is None or left > 0:
+                size = UPLOAD_CHUNK_SIZE if left is None else left
+                chunk = await asyncio.to_thread(
+                    f.read, min(size, UPLOAD_CHUNK_SIZE)
+                )
+
+                if not chunk:
+                    break
+
+                if left is not None:
+                    left -= len(chunk)
+
+                yield chunk
+        finally:
+            await asyncio.to_thread(f.close)
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            result = await asyncio.to_thread(os.stat, self.local_path(key))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+        if not stat.S_ISREG(result.st_mode):
+            return None
+
+        return StoredObject(
+            size=result.st_size,
+            etag=f"{result.st_mtime_ns:x}-{result.st_size:x}",
+        )
+
+    async def delete(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(os.unlink, self.local_path(key))
+        except FileNotFoundError:
+            return False
+
+        self.deletes += 1
+
+        return True
+
+    def _count_put(self, size: int) -> None:
+        self.puts += 1
+        self.bytes_put += size
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Хранилище в бакете S3-совместимого сервиса (клиент aiobotocore).
+
+    Файлы меньше part_size загружаются одним PutObject, остальные —
+    multipart upload частями по part_size байт (не меньше 5 МиБ по
+    требованию S3); при любой ошибке, в том числе при обрыве потока
+    порций, незавершённая загрузка отменяется. Клиент создаётся при первом
+    обращении; пустые ключи доступа означают стандартную цепочку
+    учётных данных botocore (переменные AWS_*, роль IAM).
+
+    Example:
+        >>> backend = S3StorageBackend("s3://media/prod")
+        >>> await backend.url("ab/cd/abcd.jpg")
+        'https://s3.us-east-1.amazonaws.com/media/prod/ab/cd/abcd.jpg?…'
+    """
+
+    def __init__(
+        self,
+        url: str,
+        endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+        region: str = S3_REGION,
+        access_key_id: str = S3_ACCESS_KEY_ID,
+        secret_access_key: str = S3_SECRET_ACCESS_KEY,
+        public_url: Optional[str] = S3_PUBLIC_URL,
+        presign_expires: int = S3_PRESIGN_EXPIRES,
+        part_size: int = S3_PART_SIZE,
+    ) -> None:
+        super().__init__(staging_dir=tempfile.gettempdir())
+        parsed = urlparse(url)
+        self.bucket = parsed.netloc
+        self.prefix = parsed.path.strip("/")
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.access_key_id = access_key_id or None
+        self.secret_access_key = secret_access_key or None
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.presign_expires = presign_expires
+        self.part_size = part_size
+
+        if self.public_url is None:
+            self.url_expires = presign_expires
+        self._client: Optional[Any] = None
+        self._exit_stack = AsyncExitStack()
+        self._client_lock = asyncio.Lock()
+
+    def object_key(self, key: str) -> str:
+        """Возвращает ключ объекта в бакете: `{prefix}/{key}`."""
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    async def client(self) -> Any:
+        """Возвращает клиент S3, создавая его при первом вызове."""
+        async with self._client_lock:
+            if self._client is None:
+                self._client = await self._exit_stack.enter_async_context(
+                    get_session().create_client(
+                        "s3",
+                        endpoint_url=self.endpoint_url,
+                        region_name=self.region,
+                        aws_access_key_id=self.access_key_id,
+                        aws_secret_access_key=self.secret_access_key,
+                        config=AioConfig(
+                            # path-style поддерживают все S3-совместимые
+                            # сервисы (MinIO, Ceph RGW)
+                            s3={"addressing_style": "path"},
+                            signature_version="s3v4",
+                            request_checksum_calculation="when_required",
+                            response_checksum_validation="when_required",
+                        ),
+                    )
+                )
+
+        return self._client
+
+    async def put(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        client = await self.client()
+        params = {"Bucket": self.bucket, "Key": self.object_key(key)}
+        buffer = bytearray()
+        upload_id: Optional[str] = None
+        parts: List[Dict[str, Any]] = []
+        size = 0
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+
+                while len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        response = await client.create_multipart_upload(
+                            **params
+                        )
+                        upload_id = response["UploadId"]
+
+                    part = bytes(buffer[: self.part_size])
+                    del buffer[: self.part_size]
+                    parts.append(
+                        await self._upload_part(
+                            client, params, upload_id, parts, part
+                        )
+                    )
+
+            if upload_id is None:
+                await client.put_object(**params, Body=bytes(buffer))
+            else:
+                if buffer:
+                    parts.append(
+                        await self._upload_part(
+                            client, params, upload_id, parts, bytes(buffer)
+                        )
+                    )
+                await client.complete_multipart_upload(
+                    **params,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException as e:
+            if upload_id is not None:
+                await self._abort_multipart(client, params, upload_id)
+
+            if isinstance(e, (BotoCoreError, ClientError)):
+                raise StorageError(f"S3 upload of {key} failed: {e}") from e
+
+            raise
+
+        self.puts += 1
+        self.bytes_put += size
+        logger.debug(
+            f"Stored s3 object {key}: {size} bytes, {len(parts)} parts"
+        )
+
+        return size
+
+    async def get(
+        self, key: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        client = await self.client()
+        params = {"Bucket": self.bucket, "Key": self.object_key(key)}
+
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+
+        try:
+            response = await client.get_object(**params)
+        except ClientError as e:
+            if _error_code(e) in ("NoSuchKey", "404"):
+                raise FileNotFoundError(key) from e
+
+            raise StorageError(f"S3 GET {key} failed: {e}") from e
+        except BotoCoreError as e:
+            raise StorageError(f"S3 GET {key} failed: {e}") from e
+
+        async with response["Body"] as body:
+            async for chunk in body.iter_chunks(UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        client = await self.client()
+
+        try:
+            response = await client.head_object(
+                Bucket=self.bucket, Key=self.object_key(key)
+            )
+        except ClientError as e:
+            if _error_code(e) in ("NoSuchKey", "404"):
+                return None
+
+            raise StorageError(f"S3 HEAD {key} failed: {e}") from e
+        except BotoCoreError as e:
+            raise StorageError(f"S3 HEAD {key} failed: {e}") from e
+
+        return StoredObject(
+            size=response["ContentLength"],
+            etag=response.get("ETag", "").strip('"'),
+        )
+
+    async def delete(self, key: str) -> bool:
+        client = await self.client()
+
+        try:
+            await client.delete_object(
+                Bucket=self.bucket, Key=self.object_key(key)
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise StorageError(f"S3 DELETE {key} failed: {e}") from e
+
+        self.deletes += 1
+
+        return True
+
+    async def url(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url}/{quote(key, safe='/~')}"
+
+        return await self.presign(key)
+
+    async def presign(self, key: str, expires: Optional[int] = None) -> str:
+        """
+        Строит подписанную ссылку GET на объект.
+
+        Args:
+            key: Ключ объекта
+            expires: Срок действия в секундах (по умолчанию
+                S3_PRESIGN_EXPIRES)
+
+        Returns:
+            Ссылка на объект
+        """
+        client = await self.client()
+
+        return await client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self.object_key(key)},
+            ExpiresIn=expires or self.presign_expires,
+        )
+
+    async def close(self) -> None:
+        await self._exit_stack.aclose()
+        self._client = None
+
+    @staticmethod
+    async def _upload_part(
+        client: Any,
+        params: Dict[str, str],
+        upload_id: str,
+        parts: List[Dict[str, Any]],
+        data: bytes,
+    ) -> Dict[str, Any]:
+        number = len(parts) + 1
+        response = await client.upload_part(
+            **params, UploadId=upload_id, PartNumber=number, Body=data
+        )
+
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    @staticmethod
+    async def _abort_multipart(
+        client: Any, params: Dict[str, str], upload_id: str
+    ) -> None:
+        try:
+            await client.abort_multipart_upload(**params, UploadId=upload_id)
+        except Exception as e:
+            logger.warning(
+                f"Failed to abort multipart upload of {params['Key']}: {e}"
+            )
+
+
+async def read_file_chunks(path: str) -> AsyncIterator[bytes]:
+    """
+    Читает локальный файл порциями по UPLOAD_CHUNK_SIZE в пуле потоков.
+    """
+    f = await asyncio.to_thread(open, path, "rb")
+
+    try:
+        while chunk := await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+def _error_code(error: ClientError) -> str:
+    """Возвращает код ошибки S3 из ответа botocore."""
+    return str(error.response.get("Error", {}).get("Code", ""))
+
+
+def create_storage_backend(
+    url: Optional[str] = MEDIA_STORAGE_URL,
+) -> StorageBackend:
+    """
+    Создаёт бэкенд хранилища по URL.
+
+    Args:
+        url: `local://` или `s3://bucket[/prefix]`
+
+    Returns:
+        Экземпляр бэкенда
+
+    Raises:
+        ValueError: Если схема URL не поддерживается
+    """
+    scheme = urlparse(url or "local://").scheme
+
+    if scheme == "local":
+        return LocalStorageBackend()
+    if scheme == "s3":
+        return S3StorageBackend(str(url))
+
+    raise ValueError(f"Unsupported storage backend: {scheme}")
+
+
+storage = create_storage_backend()
+
+logger.info(f"Storage backend: {type(storage).__name__}")
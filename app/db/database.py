@@ -4,16 +4,17 @@
 
 from datetime import datetime
 from os import getenv
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
 from dotenv import load_dotenv
-from sqlalchemy import Column, DateTime
+from fastapi import Request
+from sqlalchemy import Column, DateTime, event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 
 from app.core.logging import get_logger
 
@@ -40,12 +41,59 @@ async_session_maker = async_sessionmaker(
 )
 
 
-async def get_db_session() -> AsyncGenerator[AsyncSession]:
+class SessionUsage:
+    """
+    Счётчики использования сессий БД запросами.
+
+    Сессия создаётся для каждого запроса, но соединение из пула берётся
+    только при первом обращении к БД, поэтому запросы, обслуженные из
+    кэша, не нагружают пул. Счётчики показывают, сколько сессий
+    действительно использовали соединение.
+
+    Attributes:
+        opened: Количество открытых сессий
+        used: Количество сессий, взявших соединение из пула
+    """
+
+    def __init__(self) -> None:
+        self.opened = 0
+        self.used = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Возвращает счётчики.
+
+        Returns:
+            Словарь с полями: sessions, used, unused
+        """
+        return {
+            "sessions": self.opened,
+            "used": self.used,
+            "unused": self.opened - self.used,
+        }
+
+
+session_usage = SessionUsage()
+
+
+def _mark_connection_used(session: Session, *args: Any) -> None:
+    """Обработчик after_begin: сессия взяла соединение из пула."""
+    session.info["connection_used"] = True
+
+
+async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession]:
     """
     Генератор сессии для использования в FastAPI (Depends).
 
+    AsyncSession ленива: соединение из пула берётся только при первом
+    запросе к БД. Использовалось ли соединение, записывается в
+    `request.state.db_connection_used` и в счётчики `session_usage`.
+
     Контекстный менеджер автоматически закрывает сессию.
 
+    Args:
+        request: Текущий HTTP-запрос
+
     Yields:
         Асинхронная сессия SQLAlchemy
 
@@ -54,9 +102,19 @@ async def get_db_session() -> AsyncGenerator[AsyncSession]:
         >>>     ...
     """
     async with async_session_maker() as session:
+        event.listen(
+            session.sync_session, "after_begin", _mark_connection_used
+        )
+        session_usage.opened += 1
         logger.debug("DB session opened")
-        yield session
-        logger.debug("DB session closed")
+
+        try:
+            yield session
+        finally:
+            used = session.info.get("connection_used", False)
+            session_usage.used += used
+            request.state.db_connection_used = used
+            logger.debug(f"DB session closed (connection used: {used})")
 
 
 class Base(DeclarativeBase):
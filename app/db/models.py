@@ -1,8 +1,18 @@
 """
-ORM-модели приложения: User, Tweet, Media, Like, Follower.
+ORM-модели приложения: User, Tweet, Media, MediaBlob, Like, Follower,
+TimelineEntry.
 """
 
-from sqlalchemy import Column, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.orm import relationship
 
 from app.core.logging import get_logger
@@ -12,7 +22,10 @@ from .database import Base, TimestampMixin
 logger = get_logger("models")
 
 
-logger.debug("ORM models loaded: User, Tweet, Media, Like, Follower")
+logger.debug(
+    "ORM models loaded: User, Tweet, Media, MediaBlob, Like, Follower, "
+    "TimelineEntry"
+)
 
 
 class User(Base):
@@ -20,6 +33,11 @@ class User(Base):
     Модель пользователя.
 
     Пользователь может создавать твиты, ставить лайки, иметь подписчиков.
+
+    Поля followers_count и following_count — денормализованные счётчики
+    подписок, которые поддерживаются сервисом подписок и удалением
+    пользователя. Расхождения с таблицей followers находит и исправляет
+    команда app.commands.check_counters.
     """
 
     __tablename__ = "users"
@@ -27,6 +45,12 @@ class User(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String, nullable=False)
     api_key = Column(String, nullable=False, unique=True)
+    followers_count = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    following_count = Column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     tweets = relationship(
         "Tweet", backref="author", cascade="all, delete-orphan"
@@ -51,15 +75,21 @@ class Tweet(Base, TimestampMixin):
     Модель твита.
 
     Твит содержит текст, ссылку на автора, медиа и лайки.
+
+    Поле like_count — денормализованный счётчик лайков, который
+    поддерживается сервисом лайков. Индекс по (like_count, id) позволяет
+    сортировать ленту "популярные сверху" без агрегации по таблице likes.
     """
 
     __tablename__ = "tweets"
+    __table_args__ = (Index("ix_tweets_like_count_id", "like_count", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     content = Column(Text, nullable=False)
     author_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     media = relationship(
         "Media", backref="tweet", cascade="all, delete-orphan"
@@ -71,16 +101,41 @@ class Media(Base):
     """
     Модель медиафайла (например, изображения).
 
-    Связана с твитом через внешний ключ.
+    Связана с твитом через внешний ключ. content_hash — SHA-256 содержимого
+    файла (MediaBlob); у записей, загруженных до хранения по хэшу, он пуст.
+    variants — уменьшенные копии изображения {ширина: URL}, которые
+    заполняет media_pipeline.
     """
 
     __tablename__ = "media"
+    __table_args__ = (Index("ix_media_content_hash", "content_hash"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     file_path = Column(String, nullable=False)
     tweet_id = Column(
         Integer, ForeignKey("tweets.id", ondelete="CASCADE"), nullable=True
     )
+    content_hash = Column(String(64), nullable=True)
+    variants = Column(JSON, nullable=True)
+
+
+class MediaBlob(Base):
+    """
+    Файл медиа, адресуемый по хэшу содержимого.
+
+    Один файл может использоваться несколькими записями media с тем же
+    content_hash; ref_count — денормализованное число таких записей.
+    Файл удаляется с диска, когда счётчик доходит до нуля. Расхождения
+    счётчика находит команда app.commands.check_counters.
+    """
+
+    __tablename__ = "media_blobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_hash = Column(String(64), nullable=False, unique=True)
+    file_path = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
 
 
 class Like(Base):
@@ -88,9 +143,14 @@ class Like(Base):
     Модель лайка.
 
     Составной первичный ключ: (user_id, tweet_id).
+    Индекс (tweet_id, user_id) обслуживает выборки лайкнувших твит
+    (список лайкнувших, лента) в порядке ID пользователя.
     """
 
     __tablename__ = "likes"
+    __table_args__ = (
+        Index("ix_likes_tweet_id_user_id", "tweet_id", "user_id"),
+    )
 
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
@@ -104,10 +164,20 @@ class Follower(Base):
     """
     Модель подписки.
 
-    Составной первичный ключ: (follower_id, following_id).
+    Составной первичный ключ: (follower_id, following_id) — обслуживает
+    список подписок пользователя. Индекс (following_id, follower_id)
+    обслуживает список его подписчиков.
     """
 
     __tablename__ = "followers"
+    __table_args__ = (
+        Index(
+            "ix_followers_following_id_follower_id",
+            "following_id",
+            "follower_id",
+        ),
+    )
+
     # Пользователь, который подписывается
     follower_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
@@ -116,3 +186,26 @@ class Follower(Base):
     following_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
     )
+
+
+class TimelineEntry(Base):
+    """
+    Модель записи материализованной ленты.
+
+    Связывает пользователя с твитом автора, на которого он подписан.
+    Заполняется при создании твита (fan-out on write) и при подписке,
+    очищается при удалении твита и при отписке.
+
+    Составной первичный ключ: (user_id, tweet_id).
+    """
+
+    __tablename__ = "timeline_entries"
+    __table_args__ = (Index("ix_timeline_entries_tweet_id", "tweet_id"),)
+
+    # Владелец ленты
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    tweet_id = Column(
+        Integer, ForeignKey("tweets.id", ondelete="CASCADE"), primary_key=True
+    )
@@ -0,0 +1,64 @@
+"""
+Диалектно-зависимые конструкции SQL.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.dml import Insert
+
+from app.db.database import Base
+
+
+def insert_ignore(
+    session: AsyncSession,
+    model: type[Base],
+    rows: Optional[List[Dict[str, Any]]] = None,
+    **values: Any,
+) -> Insert:
+    """
+    Строит `INSERT ... ON CONFLICT DO NOTHING` для диалекта сессии.
+
+    Вместе с `.returning(...)` позволяет за один запрос и вставить строку,
+    и узнать, была ли она вставлена: при конфликте RETURNING не вернёт
+    строк. Конкурентные повторные вставки не приводят к IntegrityError.
+
+    Без rows и values возвращает запрос для вставки через
+    `.from_select(...)`.
+
+    Args:
+        session: Асинхронная сессия БД
+        model: ORM-модель таблицы
+        rows: Строки для многострочной вставки (вместо values)
+        values: Значения колонок одной строки
+
+    Returns:
+        Объект запроса INSERT
+
+    Raises:
+        NotImplementedError: Если диалект СУБД не поддерживается
+
+    Example:
+        >>> stmt = insert_ignore(session, Like, user_id=1, tweet_id=5)
+        >>> result = await session.execute(stmt.returning(Like.tweet_id))
+        >>> inserted = result.first() is not None
+    """
+    dialect = session.bind.dialect.name
+    stmt: Insert
+
+    if dialect == "postgresql":
+        stmt = postgresql.insert(model).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(model).on_conflict_do_nothing()
+    else:
+        raise NotImplementedError(
+            f"INSERT ... ON CONFLICT is not supported for {dialect}"
+        )
+
+    if rows is not None:
+        return stmt.values(rows)
+    if values:
+        return stmt.values(**values)
+
+    return stmt
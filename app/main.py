@@ -5,12 +5,17 @@
 import asyncio
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 
-from app.api.v1 import media, tweets, users
+from app.api.v1 import media, media_files, metrics, tweets, users
+from app.core.cache import cache
 from app.core.logging import logger, setup_logging
-from app.db.database import engine
+from app.core.responses import FastJSONResponse
+from app.core.storage import storage
+from app.db.database import async_session_maker, engine
+from app.services.follow_graph import follow_graph
+from app.services.like_buffer import like_buffer
+from app.services.media_pipeline import media_pipeline
 
 setup_logging()
 
@@ -21,6 +26,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
 )
 
 
@@ -28,10 +34,8 @@ app = FastAPI(
 app.include_router(tweets.router)
 app.include_router(media.router)
 app.include_router(users.router)
-
-
-# Serving static files (for demo frontend)
-app.mount("/media", StaticFiles(directory="./app/media"), name="media")
+app.include_router(metrics.router)
+app.include_router(media_files.router)
 
 
 # adding tables on startup
@@ -41,6 +45,9 @@ async def startup_event():
     Выполняется при старте приложения.
 
     - Ждёт готовности PostgreSQL
+    - Загружает индекс графа подписок и запускает его перезагрузку
+      (если включён)
+    - Запускает пул построения копий изображений (если включён)
 
     Raises:
         Exception: Если не удалось подключиться к БД за 15 попыток
@@ -64,3 +71,37 @@ async def startup_event():
         raise Exception(
             f"Unable to connect to db after {max_retries} attempts."
         )
+
+    if follow_graph is not None:
+        async with async_session_maker() as session:
+            await follow_graph.load(session)
+
+        follow_graph.start(async_session_maker)
+
+    if media_pipeline is not None:
+        media_pipeline.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Выполняется при остановке приложения.
+
+    - Записывает накопленные в буфере лайки
+    - Останавливает перезагрузку индекса графа подписок
+    - Останавливает пул построения копий изображений
+    - Закрывает соединения с бэкендами кэша и хранилища медиа
+    """
+    logger.info("Shutting down application...")
+
+    if like_buffer is not None:
+        await like_buffer.close()
+
+    if follow_graph is not None:
+        await follow_graph.close()
+
+    if media_pipeline is not None:
+        await media_pipeline.close()
+
+    await cache.close()
+    await storage.close()
@@ -1,7 +1,34 @@
 from .base import BaseSchema
-from .follower import FollowRequest
-from .like import LikeOut
+from .follower import (
+    BulkFollowRequest,
+    BulkFollowResult,
+    FollowOutcomeOut,
+    FollowRequest,
+)
+from .like import LikeOut, LikesPage
+from .lookup import LookupRequest, LookupResult
 from .media import MediaOut
-from .response import ApiResponse, FeedResponse, UserProfileResponse
-from .tweet import CreateTweetRequest, TweetOut
-from .user import UserProfile, UserShort
+from .response import (
+    ApiResponse,
+    BulkFollowApiResponse,
+    FeedApiResponse,
+    FeedResponse,
+    LikesApiResponse,
+    LookupApiResponse,
+    RelationshipApiResponse,
+    SuggestionsApiResponse,
+    UserProfileApiResponse,
+    UserProfileResponse,
+    UsersApiResponse,
+)
+from .tweet import CreateTweetRequest, FeedPage, TweetOut
+from .user import (
+    CurrentUser,
+    Relationship,
+    SuggestionOut,
+    SuggestionsData,
+    UserProfile,
+    UserProfileData,
+    UserShort,
+    UsersPage,
+)
@@ -2,6 +2,12 @@
 Схемы, связанные с подписками.
 """
 
+from typing import List, Literal
+
+from pydantic import Field
+
+from app.core.config import BULK_FOLLOW_MAX_IDS
+
 from .base import BaseSchema
 
 
@@ -13,3 +19,46 @@ class FollowRequest(BaseSchema):
     """
 
     pass
+
+
+class BulkFollowRequest(BaseSchema):
+    """
+    Запрос массовой подписки или отписки.
+
+    Attributes:
+        ids: ID пользователей (не более BULK_FOLLOW_MAX_IDS)
+    """
+
+    ids: List[int] = Field(min_length=1, max_length=BULK_FOLLOW_MAX_IDS)
+
+
+class FollowOutcomeOut(BaseSchema):
+    """
+    Результат массовой операции для одного пользователя.
+
+    Attributes:
+        id: ID пользователя из запроса
+        outcome: `followed`, `unfollowed`, `already_following`,
+            `not_following`, `self` или `not_found`
+    """
+
+    id: int
+    outcome: Literal[
+        "followed",
+        "unfollowed",
+        "already_following",
+        "not_following",
+        "self",
+        "not_found",
+    ]
+
+
+class BulkFollowResult(BaseSchema):
+    """
+    Результаты массовой подписки или отписки.
+
+    Attributes:
+        results: Результаты в порядке запроса (повторные ID схлопываются)
+    """
+
+    results: List[FollowOutcomeOut]
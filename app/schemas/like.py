@@ -2,18 +2,35 @@
 Схемы, связанные с лайками.
 """
 
+from typing import List, Optional
+
 from .base import BaseSchema
-from .user import UserShort
 
 
-class LikeOut(UserShort):
+class LikeOut(BaseSchema):
     """
     Информация о пользователе, поставившем лайк.
 
-    Наследуется от UserShort — содержит id и имя.
+    Attributes:
+        user_id: ID пользователя
+        name: Имя пользователя
     """
 
-    pass
+    user_id: int
+    name: str
+
+
+class LikesPage(BaseSchema):
+    """
+    Страница списка лайкнувших твит.
+
+    Attributes:
+        likes: Лайкнувшие пользователи
+        next_cursor: Курсор следующей страницы (None на последней)
+    """
+
+    likes: List[LikeOut]
+    next_cursor: Optional[str] = None
 
 
 class LikeRequest(BaseSchema):
@@ -0,0 +1,33 @@
+"""
+Схемы пакетной проверки состояния (лайки, подписки).
+"""
+
+from typing import List
+
+from pydantic import Field
+
+from app.core.config import LOOKUP_MAX_IDS
+
+from .base import BaseSchema
+
+
+class LookupRequest(BaseSchema):
+    """
+    Запрос пакетной проверки.
+
+    Attributes:
+        ids: ID проверяемых объектов (твитов или пользователей)
+    """
+
+    ids: List[int] = Field(max_length=LOOKUP_MAX_IDS)
+
+
+class LookupResult(BaseSchema):
+    """
+    Результат пакетной проверки.
+
+    Attributes:
+        bitset: Строка из `0` и `1`; i-й символ относится к i-му ID запроса
+    """
+
+    bitset: str
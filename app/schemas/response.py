@@ -5,8 +5,17 @@
 from typing import Dict, List
 
 from .base import BaseSchema
-from .tweet import TweetOut
-from .user import UserProfile
+from .follower import BulkFollowResult
+from .like import LikesPage
+from .lookup import LookupResult
+from .tweet import FeedPage, TweetOut
+from .user import (
+    Relationship,
+    SuggestionsData,
+    UserProfile,
+    UserProfileData,
+    UsersPage,
+)
 
 
 class FeedResponse(BaseSchema):
@@ -52,3 +61,67 @@ class ApiResponse(BaseSchema):
     data: Dict | None = None
     error_type: str | None = None
     error_message: str | None = None
+
+
+class FeedApiResponse(ApiResponse):
+    """
+    Ответ со страницей ленты (для схемы OpenAPI).
+    """
+
+    data: FeedPage | None = None  # type: ignore[assignment]
+
+
+class LikesApiResponse(ApiResponse):
+    """
+    Ответ со страницей лайкнувших твит (для схемы OpenAPI).
+    """
+
+    data: LikesPage | None = None  # type: ignore[assignment]
+
+
+class UserProfileApiResponse(ApiResponse):
+    """
+    Ответ с профилем пользователя (для схемы OpenAPI).
+    """
+
+    data: UserProfileData | None = None  # type: ignore[assignment]
+
+
+class UsersApiResponse(ApiResponse):
+    """
+    Ответ со страницей пользователей (для схемы OpenAPI).
+    """
+
+    data: UsersPage | None = None  # type: ignore[assignment]
+
+
+class SuggestionsApiResponse(ApiResponse):
+    """
+    Ответ с рекомендациями «кого читать» (для схемы OpenAPI).
+    """
+
+    data: SuggestionsData | None = None  # type: ignore[assignment]
+
+
+class RelationshipApiResponse(ApiResponse):
+    """
+    Ответ с отношениями между пользователями (для схемы OpenAPI).
+    """
+
+    data: Relationship | None = None  # type: ignore[assignment]
+
+
+class LookupApiResponse(ApiResponse):
+    """
+    Ответ пакетной проверки (для схемы OpenAPI).
+    """
+
+    data: LookupResult | None = None  # type: ignore[assignment]
+
+
+class BulkFollowApiResponse(ApiResponse):
+    """
+    Ответ массовой подписки или отписки (для схемы OpenAPI).
+    """
+
+    data: BulkFollowResult | None = None  # type: ignore[assignment]
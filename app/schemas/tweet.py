@@ -2,7 +2,7 @@
 Схемы, связанные с твитами.
 """
 
-from typing import List
+from typing import Dict, List, Optional
 
 from .base import BaseSchema
 from .like import LikeOut
@@ -30,12 +30,34 @@ class TweetOut(BaseSchema):
         id: Уникальный идентификатор твита
         content: Текст твита
         attachments: Список ссылок на медиа (`/media/...`)
+        attachment_variants: Уменьшенные копии вложений в том же порядке:
+            {ширина: ссылка на WebP}, пустой словарь — копий нет
         author: Автор твита (UserShort)
-        likes: Список пользователей, поставивших лайк
+        likes: Список пользователей, поставивших лайк (в режиме `summary` —
+            только первые из них)
+        like_count: Количество лайков (только в режиме `summary`)
+        liked_by_me: Лайкнул ли твит текущий пользователь (только в режиме
+            `summary`)
     """
 
     id: int
     content: str
     attachments: List[str]
+    attachment_variants: List[Dict[str, str]] = []
     author: UserShort
     likes: List[LikeOut]
+    like_count: Optional[int] = None
+    liked_by_me: Optional[bool] = None
+
+
+class FeedPage(BaseSchema):
+    """
+    Страница ленты твитов.
+
+    Attributes:
+        tweets: Твиты страницы
+        next_cursor: Курсор следующей страницы (None на последней)
+    """
+
+    tweets: List[TweetOut]
+    next_cursor: Optional[str] = None
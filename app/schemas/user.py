@@ -2,7 +2,7 @@
 Схемы, связанные с пользователями.
 """
 
-from typing import List
+from typing import List, Optional
 
 from .base import BaseSchema
 
@@ -22,18 +22,109 @@ class UserShort(BaseSchema):
     name: str
 
 
+class CurrentUser(BaseSchema):
+    """
+    Облегчённая идентичность авторизованного пользователя.
+
+    Возвращается зависимостью get_current_user вместо ORM-объекта, чтобы её
+    можно было хранить в кэше аутентификации.
+
+    Attributes:
+        id: Уникальный идентификатор
+        name: Имя пользователя
+        api_key: API-ключ, с которым пришёл запрос
+    """
+
+    id: int
+    name: str
+    api_key: str
+
+
 class UserProfile(BaseSchema):
     """
-    Полная информация о профиле пользователя.
+    Информация о профиле пользователя.
+
+    Списки подписчиков и подписок заполняются только по запросу
+    `?full=true`; постранично они доступны через отдельные эндпоинты.
 
     Attributes:
         id: Уникальный идентификатор
         name: Имя пользователя
+        followers_count: Количество подписчиков
+        following_count: Количество подписок
         followers: Список подписчиков (UserShort)
         following: Список пользователей, на которых подписан
     """
 
     id: int
     name: str
-    followers: List[UserShort]
-    following: List[UserShort]
+    followers_count: int
+    following_count: int
+    followers: Optional[List[UserShort]] = None
+    following: Optional[List[UserShort]] = None
+
+
+class UserProfileData(BaseSchema):
+    """
+    Данные ответа с профилем пользователя.
+
+    Attributes:
+        user: Профиль пользователя
+    """
+
+    user: UserProfile
+
+
+class UsersPage(BaseSchema):
+    """
+    Страница списка пользователей (подписчики, подписки).
+
+    Attributes:
+        users: Пользователи страницы
+        next_cursor: Курсор следующей страницы (None на последней)
+    """
+
+    users: List[UserShort]
+    next_cursor: Optional[str] = None
+
+
+class SuggestionOut(UserShort):
+    """
+    Рекомендованный пользователь.
+
+    Attributes:
+        mutual_count: Сколько пользователей из подписок текущего
+            подписаны на рекомендованного
+    """
+
+    mutual_count: int
+
+
+class SuggestionsData(BaseSchema):
+    """
+    Данные ответа с рекомендациями «кого читать».
+
+    Attributes:
+        users: Рекомендованные пользователи по убыванию mutual_count
+    """
+
+    users: List[SuggestionOut]
+
+
+class Relationship(BaseSchema):
+    """
+    Отношения текущего пользователя с другим.
+
+    Attributes:
+        user_id: ID другого пользователя
+        you_follow: Текущий пользователь подписан на него
+        follows_you: Он подписан на текущего пользователя
+        mutual_followers: Страница пользователей, подписанных на обоих
+        next_cursor: Курсор следующей страницы общих подписчиков
+    """
+
+    user_id: int
+    you_follow: bool
+    follows_you: bool
+    mutual_followers: List[UserShort]
+    next_cursor: Optional[str] = None
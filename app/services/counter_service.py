@@ -0,0 +1,134 @@
+"""
+Проверка и исправление денормализованных счётчиков.
+
+Счётчики (`tweets.like_count`, `users.followers_count`,
+`users.following_count`, `media_blobs.ref_count`) обновляются сервисами в
+тех же транзакциях, что и исходные строки, но могут разойтись с ними после
+ручных правок данных, каскадного удаления в обход сервисов или ошибок.
+Проверка сравнивает каждый счётчик с агрегатом по исходной таблице,
+исправление пересчитывает только разошедшиеся строки.
+"""
+
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import get_logger
+from app.db.models import Follower, Like, Media, MediaBlob, Tweet, User
+
+logger = get_logger("counter_service")
+
+# Сколько ID разошедшихся строк показывать в логе для каждого счётчика
+DRIFT_SAMPLE_SIZE = 10
+
+
+def _counters() -> Dict[str, Tuple[Any, Any, Any]]:
+    """
+    Описывает проверяемые счётчики.
+
+    Returns:
+        Словарь {имя: (модель, колонка счётчика, фактическое значение)},
+        где фактическое значение — коррелированный подзапрос COUNT(*)
+    """
+    return {
+        "tweets.like_count": (
+            Tweet,
+            Tweet.like_count,
+            select(func.count())
+            .select_from(Like)
+            .where(Like.tweet_id == Tweet.id)
+            .correlate(Tweet)
+            .scalar_subquery(),
+        ),
+        "users.followers_count": (
+            User,
+            User.followers_count,
+            select(func.count())
+            .select_from(Follower)
+            .where(Follower.following_id == User.id)
+            .correlate(User)
+            .scalar_subquery(),
+        ),
+        "users.following_count": (
+            User,
+            User.following_count,
+            select(func.count())
+            .select_from(Follower)
+            .where(Follower.follower_id == User.id)
+            .correlate(User)
+            .scalar_subquery(),
+        ),
+        "media_blobs.ref_count": (
+            MediaBlob,
+            MediaBlob.ref_count,
+            select(func.count())
+            .select_from(Media)
+            .where(Media.content_hash == MediaBlob.content_hash)
+            .correlate(MediaBlob)
+            .scalar_subquery(),
+        ),
+    }
+
+
+async def check_counters(
+    session: AsyncSession, repair: bool = False
+) -> Dict[str, int]:
+    """
+    Находит (и при repair=True исправляет) расхождения счётчиков.
+
+    Args:
+        session: Асинхронная сессия БД
+        repair: Пересчитать разошедшиеся счётчики
+
+    Returns:
+        Словарь {имя счётчика: количество разошедшихся строк}
+
+    Raises:
+        SQLAlchemyError: При ошибке БД (исправление откатывается)
+
+    Example:
+        >>> await check_counters(session)
+        {"tweets.like_count": 0, "users.followers_count": 2,
+         "users.following_count": 0, "media_blobs.ref_count": 0}
+    """
+    logger.info(f"Checking denormalized counters, repair={repair}")
+
+    drift: Dict[str, int] = {}
+
+    try:
+        for name, (model, counter, actual) in _counters().items():
+            result = await session.execute(
+                select(model.id, counter, actual)
+                .where(counter != actual)
+                .order_by(model.id)
+            )
+            rows = result.all()
+            drift[name] = len(rows)
+
+            if not rows:
+                continue
+
+            sample = ", ".join(
+                f"{row_id}: {stored} != {real}"
+                for row_id, stored, real in rows[:DRIFT_SAMPLE_SIZE]
+            )
+            logger.warning(f"{name} drifted in {len(rows)} rows ({sample})")
+
+            if repair:
+                await session.execute(
+                    update(model)
+                    .where(counter != actual)
+                    .values({counter.key: actual})
+                )
+
+        if repair:
+            await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Failed to check counters: {e}")
+        raise
+
+    logger.info(f"Counter check finished: {drift}")
+
+    return drift
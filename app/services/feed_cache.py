@@ -0,0 +1,220 @@
+"""
+Кэш первых страниц ленты и его инвалидация по событиям записи.
+
+Хранится в общем кэше приложения (см. app.core.cache): каждая страница —
+под своим ключом `feed:{user_id}:{likes_mode}:{limit}` вместе с поколением
+ленты, на котором она построена. Текущее поколение пользователя — случайная
+строка под ключом `feed_gen:{user_id}`; инвалидация удаляет её, и все
+страницы старого поколения перестают совпадать.
+
+Поколение читается до запроса к БД и перепроверяется перед записью
+страницы, поэтому страница, построенная до инвалидации, не попадает в кэш
+после неё, а параллельные запросы разных страниц не затирают друг друга.
+Кэшируется только первая страница (без курсора): именно её запрашивает
+клиент при каждом обновлении ленты.
+
+Твиты и подписки сбрасывают кэш затронутых лент, а лайк — только ленту
+лайкнувшего: сброс лент всех подписчиков автора на каждый лайк стоил бы
+O(подписчиков) и обнулял бы кэш как раз самых читаемых лент. Счётчики и
+списки лайков в чужих закэшированных страницах отстают не больше чем на
+FEED_CACHE_TTL.
+
+Здесь же хранится снимок порядка ленты (`feed_snapshot:{user_id}`), по
+которому листают следующие страницы (см. tweet_service.get_user_feed). Он
+один на пользователя и перезаписывается при каждой загрузке первой
+страницы, поэтому число снимков в кэше не превышает числа активных
+пользователей.
+"""
+
+import secrets
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Column
+
+from app.core.cache import cache
+from app.core.config import FEED_CACHE_TTL, FEED_SNAPSHOT_TTL
+from app.core.logging import get_logger
+
+logger = get_logger("feed_cache")
+
+FeedKey = Tuple[int, int]
+
+# Поколение должно переживать страницы, записанные на нём
+GENERATION_TTL = FEED_CACHE_TTL * 10
+
+
+def feed_key(user_id: Column[int] | int, limit: int, likes_mode: str) -> str:
+    """
+    Возвращает ключ кэша страницы ленты пользователя.
+
+    Args:
+        user_id: ID владельца ленты
+        limit: Размер страницы
+        likes_mode: Режим отображения лайков (`full` или `summary`)
+
+    Returns:
+        Ключ вида `feed:{user_id}:{likes_mode}:{limit}`
+    """
+    return f"feed:{user_id}:{likes_mode}:{limit}"
+
+
+def generation_key(user_id: Column[int] | int) -> str:
+    """
+    Возвращает ключ текущего поколения ленты пользователя.
+
+    Args:
+        user_id: ID владельца ленты
+
+    Returns:
+        Ключ вида `feed_gen:{user_id}`
+    """
+    return f"feed_gen:{user_id}"
+
+
+async def get_cached_feed(
+    user_id: Column[int] | int, limit: int, likes_mode: str
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Возвращает закэшированную первую страницу ленты и поколение ленты.
+
+    Поколение читается одним обращением вместе со страницей; если его нет,
+    создаётся новое. Его нужно передать в `cache_feed` после загрузки
+    страницы из БД.
+
+    Args:
+        user_id: ID владельца ленты
+        limit: Размер страницы
+        likes_mode: Режим отображения лайков (`full` или `summary`)
+
+    Returns:
+        Пара (страница ленты или None при промахе, поколение ленты)
+    """
+    gen_key = generation_key(user_id)
+    page_key = feed_key(user_id, limit, likes_mode)
+    values = await cache.get_many([gen_key, page_key])
+    generation, entry = values[gen_key], values[page_key]
+
+    if generation is None:
+        generation = secrets.token_hex(8)
+        await cache.set(gen_key, generation, ttl=GENERATION_TTL)
+        return None, generation
+
+    if entry is None or entry["generation"] != generation:
+        return None, generation
+
+    return entry["page"], generation
+
+
+async def cache_feed(
+    user_id: Column[int] | int,
+    limit: int,
+    likes_mode: str,
+    page: Dict[str, Any],
+    generation: str,
+) -> None:
+    """
+    Сохраняет первую страницу ленты в кэш, если лента не менялась.
+
+    Страница не сохраняется, если после `get_cached_feed` ленту
+    инвалидировали: она могла быть прочитана из БД до изменения.
+
+    Args:
+        user_id: ID владельца ленты
+        limit: Размер страницы
+        likes_mode: Режим отображения лайков (`full` или `summary`)
+        page: Страница ленты
+        generation: Поколение ленты из `get_cached_feed`
+    """
+    if await cache.get(generation_key(user_id)) != generation:
+        logger.debug(f"Feed of user {user_id} changed, page not cached")
+        return
+
+    await cache.set(
+        feed_key(user_id, limit, likes_mode),
+        {"generation": generation, "page": page},
+        ttl=FEED_CACHE_TTL,
+    )
+
+
+def snapshot_key(user_id: Column[int] | int) -> str:
+    """
+    Возвращает ключ снимка порядка ленты пользователя.
+
+    Args:
+        user_id: ID владельца ленты
+
+    Returns:
+        Ключ вида `feed_snapshot:{user_id}`
+    """
+    return f"feed_snapshot:{user_id}"
+
+
+async def save_feed_snapshot(
+    user_id: Column[int] | int, keys: Sequence[FeedKey], more: bool
+) -> int:
+    """
+    Сохраняет снимок порядка ленты вместо предыдущего снимка пользователя.
+
+    Args:
+        user_id: ID владельца ленты
+        keys: Ключи сортировки (like_count, tweet_id) в порядке ленты
+        more: Есть ли в ленте твиты после последнего ключа снимка
+
+    Returns:
+        Версия снимка (положительное число) для курсора
+    """
+    version = secrets.randbits(62) + 1
+    await cache.set(
+        snapshot_key(user_id),
+        {
+            "version": version,
+            "keys": [list(key) for key in keys],
+            "more": more,
+        },
+        ttl=FEED_SNAPSHOT_TTL,
+    )
+
+    return version
+
+
+async def load_feed_snapshot(
+    user_id: Column[int] | int, version: int
+) -> Optional[Tuple[List[FeedKey], bool]]:
+    """
+    Возвращает снимок порядка ленты, если он не истёк и не перезаписан.
+
+    Args:
+        user_id: ID владельца ленты
+        version: Версия снимка из курсора
+
+    Returns:
+        Пара (ключи сортировки в порядке ленты, есть ли твиты после
+        последнего ключа) или None
+    """
+    snapshot = await cache.get(snapshot_key(user_id))
+
+    if snapshot is None or snapshot["version"] != version:
+        return None
+
+    keys = [
+        (like_count, tweet_id) for like_count, tweet_id in snapshot["keys"]
+    ]
+
+    return keys, snapshot["more"]
+
+
+async def invalidate_feeds(user_ids: Iterable[Column[int] | int]) -> None:
+    """
+    Сбрасывает кэш лент указанных пользователей.
+
+    Удаляет текущие поколения лент: страницы старых поколений больше не
+    отдаются и истекают по TTL.
+
+    Args:
+        user_ids: ID владельцев лент
+    """
+    keys = [generation_key(user_id) for user_id in user_ids]
+
+    if keys:
+        await cache.delete(*keys)
+        logger.debug(f"Invalidated {len(keys)} cached feeds")
@@ -0,0 +1,316 @@
+"""
+Движок ленты на агрегации JSON в SQL.
+
+Вся страница ленты (твиты, авторы, вложения и лайки) строится одним
+SQL-запросом: каждый твит возвращается как готовый JSON-документ, поэтому
+не нужны дополнительные запросы selectinload и создание ORM-объектов.
+
+Используются функции JSON целевой СУБД:
+
+- PostgreSQL — `json_build_object` и `json_agg`;
+- SQLite (тесты) — `json_object` и `json_group_array`.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Select,
+    case,
+    exists,
+    func,
+    literal_column,
+    select,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import TIMELINE_MAX_ENTRIES
+from app.core.logging import get_logger
+from app.db.models import Like, Media, TimelineEntry, Tweet, User
+
+logger = get_logger("feed_query")
+
+
+class JsonFunctions:
+    """
+    Построитель выражений JSON для конкретного диалекта СУБД.
+
+    Attributes:
+        dialect: Имя диалекта SQLAlchemy (`postgresql` или `sqlite`)
+    """
+
+    def __init__(self, dialect: str) -> None:
+        self.dialect = dialect
+
+    @property
+    def is_postgres(self) -> bool:
+        return self.dialect == "postgresql"
+
+    def object(self, **fields: Any) -> ColumnElement[Any]:
+        """
+        Строит JSON-объект из пар имя/выражение.
+
+        Args:
+            fields: Поля объекта
+
+        Returns:
+            Выражение JSON-объекта
+        """
+        args: List[Any] = []
+
+        for name, value in fields.items():
+            args.extend((literal_column(f"'{name}'"), value))
+
+        if self.is_postgres:
+            return func.json_build_object(*args)
+
+        return func.json_object(*args)
+
+    def array(self, value: Any, order_by: Any) -> ColumnElement[Any]:
+        """
+        Агрегирует значения в JSON-массив; пустой набор даёт `[]`.
+
+        Args:
+            value: Агрегируемое выражение
+            order_by: Порядок элементов массива
+
+        Returns:
+            Агрегатное выражение JSON-массива
+        """
+        if self.is_postgres:
+            return func.coalesce(
+                func.json_agg(aggregate_order_by(value, order_by)),
+                literal_column("'[]'::json"),
+            )
+
+        # SQLite агрегирует в порядке строк упорядоченного подзапроса
+        return func.json_group_array(value)
+
+    def embed(self, subquery: Any) -> ColumnElement[Any]:
+        """
+        Встраивает JSON, возвращённый скалярным подзапросом.
+
+        SQLite теряет признак JSON на границе подзапроса, поэтому без
+        `json()` вложенный документ попал бы в ответ строкой.
+        """
+        if self.is_postgres:
+            return subquery
+
+        return func.json(subquery)
+
+    def document(self, column: Any) -> ColumnElement[Any]:
+        """
+        Возвращает значение JSON-колонки; NULL заменяется на `{}`.
+
+        SQLite хранит JSON текстом, поэтому значение оборачивается в
+        `json()`, чтобы попасть в массив объектом, а не строкой.
+        """
+        if self.is_postgres:
+            return func.coalesce(column, literal_column("'{}'::json"))
+
+        return func.json(func.coalesce(column, "{}"))
+
+    def boolean(self, condition: Any) -> ColumnElement[Any]:
+        """
+        Преобразует SQL-условие в JSON-значение true/false.
+        """
+        if self.is_postgres:
+            return condition
+
+        return case((condition, func.json("true")), else_=func.json("false"))
+
+
+def build_page_query(
+    user_id: Column[int] | int,
+    limit: int,
+    after: Optional[Sequence[int]] = None,
+) -> Select:
+    """
+    Строит запрос ключей сортировки ленты в порядке «популярные сверху».
+
+    Ранжируются только TIMELINE_MAX_ENTRIES последних записей ленты: они
+    читаются по первичному ключу (user_id, tweet_id), соединяются с tweets
+    и сортируются по актуальному tweets.like_count. Поэтому стоимость
+    запроса ограничена размером этого окна, а не размером ленты, и лайк
+    не обновляет записи лент. Более старые твиты в ленту «популярное» не
+    попадают, даже если набрали много лайков.
+
+    Args:
+        user_id: ID владельца ленты
+        limit: Количество строк
+        after: Ключ сортировки (like_count, id), после которого начинается
+            выборка
+
+    Returns:
+        Запрос строк (id, like_count)
+    """
+    candidates = (
+        select(TimelineEntry.tweet_id)
+        .where(TimelineEntry.user_id == user_id)
+        .order_by(TimelineEntry.tweet_id.desc())
+        .limit(TIMELINE_MAX_ENTRIES)
+        .subquery("candidates")
+    )
+    query = (
+        select(Tweet.id, Tweet.like_count)
+        .join(candidates, candidates.c.tweet_id == Tweet.id)
+        .order_by(Tweet.like_count.desc(), Tweet.id.desc())
+        .limit(limit)
+    )
+
+    if after is not None:
+        query = query.where(
+            tuple_(Tweet.like_count, Tweet.id)
+            < tuple_(*after)  # type: ignore[arg-type]
+        )
+
+    return query
+
+
+def build_feed_query(
+    dialect: str,
+    user_id: Column[int] | int,
+    tweet_ids: Sequence[int],
+    likers_limit: Optional[int] = None,
+    with_liked_by_me: bool = False,
+) -> Select:
+    """
+    Строит запрос страницы ленты, возвращающий готовые JSON-документы.
+
+    Каждая строка результата — (id, document), где document совпадает по
+    форме с `format_tweet_for_response` (или `format_tweet_summary`, если
+    заданы likers_limit и with_liked_by_me). Твиты, которых уже нет в ленте
+    пользователя (удалены или автор отписан), не возвращаются.
+
+    Args:
+        dialect: Имя диалекта СУБД
+        user_id: ID владельца ленты
+        tweet_ids: ID твитов страницы
+        likers_limit: Сколько лайкнувших включать (None — всех)
+        with_liked_by_me: Добавлять ли поля like_count и liked_by_me
+
+    Returns:
+        Объект запроса SQLAlchemy
+    """
+    js = JsonFunctions(dialect)
+
+    media = (
+        select(Media.id, Media.file_path, Media.variants)
+        .where(Media.tweet_id == Tweet.id)
+        .order_by(Media.id)
+        .correlate(Tweet)
+        .subquery()
+    )
+    attachments = (
+        select(js.array(media.c.file_path, media.c.id))
+        .select_from(media)
+        .scalar_subquery()
+    )
+    variants = (
+        select(js.array(js.document(media.c.variants), media.c.id))
+        .select_from(media)
+        .scalar_subquery()
+    )
+
+    likers_query = (
+        select(User.id, User.name)
+        .join(Like, Like.user_id == User.id)
+        .where(Like.tweet_id == Tweet.id)
+        .order_by(Like.user_id)
+        .correlate(Tweet)
+    )
+
+    if likers_limit is not None:
+        likers_query = likers_query.limit(likers_limit)
+
+    likers = likers_query.subquery()
+    likes = (
+        select(
+            js.array(
+                js.object(user_id=likers.c.id, name=likers.c.name),
+                likers.c.id,
+            )
+        )
+        .select_from(likers)
+        .scalar_subquery()
+    )
+
+    fields: Dict[str, Any] = {
+        "id": Tweet.id,
+        "content": Tweet.content,
+        "attachments": js.embed(attachments),
+        "attachment_variants": js.embed(variants),
+        "author": js.object(id=User.id, name=User.name),
+    }
+
+    if with_liked_by_me:
+        liked = exists().where(
+            Like.tweet_id == Tweet.id, Like.user_id == user_id
+        )
+        fields["like_count"] = Tweet.like_count
+        fields["liked_by_me"] = js.boolean(liked)
+
+    fields["likes"] = js.embed(likes)
+
+    return (
+        select(
+            Tweet.id,
+            type_coerce(js.object(**fields), JSON).label("document"),
+        )
+        .join(
+            TimelineEntry,
+            (TimelineEntry.tweet_id == Tweet.id)
+            & (TimelineEntry.user_id == user_id),
+        )
+        .join(User, User.id == Tweet.author_id)
+        .where(Tweet.id.in_(tweet_ids))
+    )
+
+
+async def fetch_feed_rows(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    tweet_ids: Sequence[int],
+    likers_limit: Optional[int] = None,
+    with_liked_by_me: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Загружает страницу ленты одним запросом без создания ORM-объектов.
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID владельца ленты
+        tweet_ids: ID твитов страницы в порядке ленты
+        likers_limit: Сколько лайкнувших включать (None — всех)
+        with_liked_by_me: Добавлять ли поля like_count и liked_by_me
+
+    Returns:
+        Документы твитов в порядке tweet_ids (без твитов, которых уже нет
+        в ленте)
+
+    Example:
+        >>> docs = await fetch_feed_rows(session, 1, [42, 7])
+        >>> docs[0]
+        {"id": 42, "content": "Hello", ...}
+    """
+    if not tweet_ids:
+        return []
+
+    query = build_feed_query(
+        dialect=session.bind.dialect.name,
+        user_id=user_id,
+        tweet_ids=tweet_ids,
+        likers_limit=likers_limit,
+        with_liked_by_me=with_liked_by_me,
+    )
+    result = await session.execute(query)
+    documents: Dict[int, Dict[str, Any]] = {
+        tweet_id: document for tweet_id, document in result.all()
+    }
+
+    return [documents[i] for i in tweet_ids if i in documents]
@@ -0,0 +1,392 @@
+"""
+Компактный индекс графа подписок в памяти процесса.
+
+Для каждого пользователя хранятся два отсортированных массива целых чисел
+(модуль array, 4 байта на ID): на кого он подписан и кто подписан на него.
+Это позволяет отвечать на вопросы «подписан ли A на B», «список подписок»
+и строить пересечения множеств без запросов к таблице followers.
+
+Индекс загружается при старте приложения потоково, пакетами по
+FOLLOW_GRAPH_BATCH_SIZE строк, и поддерживается сервисом подписок после
+каждого commit. Индекс включается явно переменной окружения
+FOLLOW_GRAPH_ENABLED=1.
+
+Индекс локален для процесса и видит только подписки, сделанные в нём
+самом. При нескольких воркерах (WEB_CONCURRENCY > 1) соседний воркер
+отдавал бы устаревшие списки и проверки подписок, поэтому индекс не
+создаётся, и сервисы читают таблицу followers. В одном воркере фоновая
+задача раз в FOLLOW_GRAPH_REFRESH_SECONDS секунд подхватывает изменения,
+сделанные в обход сервисов (командами, ручными правками).
+"""
+
+import asyncio
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import (
+    FOLLOW_GRAPH_BATCH_SIZE,
+    FOLLOW_GRAPH_ENABLED,
+    FOLLOW_GRAPH_REFRESH_SECONDS,
+    WEB_CONCURRENCY,
+)
+from app.core.logging import get_logger
+from app.db.models import Follower
+
+logger = get_logger("follow_graph")
+
+# Тип элементов массивов: знаковое 32-битное целое, как колонка Integer
+ID_TYPECODE = "i"
+
+Edge = Tuple[int, int]
+
+
+class FollowGraph:
+    """
+    Индекс подписок: отсортированные массивы ID по пользователям.
+
+    Attributes:
+        ready: Загружен ли индекс; пока False, сервисы идут в БД
+        edges: Количество подписок в индексе
+
+    Example:
+        >>> graph = FollowGraph()
+        >>> graph.add(1, 2)
+        >>> graph.is_following(1, 2)
+        True
+        >>> list(graph.following(1))
+        [2]
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.edges = 0
+        self._following: Dict[int, array] = {}
+        self._followers: Dict[int, array] = {}
+        # Изменения, пришедшие во время загрузки: применяются после неё
+        self._journal: Optional[List[Tuple[Any, ...]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(
+        self, session: AsyncSession, batch_size: int = FOLLOW_GRAPH_BATCH_SIZE
+    ) -> int:
+        """
+        Загружает граф из таблицы followers.
+
+        Строки читаются курсором на стороне сервера пакетами по batch_size,
+        упорядоченными по первичному ключу, поэтому массивы подписок
+        заполняются уже отсортированными; массивы подписчиков сортируются
+        в конце. После каждого пакета строк и каждых batch_size
+        отсортированных ID загрузка отдаёт управление циклу событий, чтобы
+        не задерживать запросы. Подписки, изменённые во время загрузки,
+        применяются к новому индексу после неё.
+
+        Args:
+            session: Асинхронная сессия БД
+            batch_size: Размер пакета строк
+
+        Returns:
+            Количество загруженных подписок
+        """
+        logger.info("Loading follow graph")
+
+        following: Dict[int, array] = {}
+        followers: Dict[int, array] = {}
+        edges = 0
+        self._journal = []
+
+        result = await session.stream(
+            select(Follower.follower_id, Follower.following_id)
+            .order_by(Follower.follower_id, Follower.following_id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        try:
+            async for batch in result.partitions(batch_size):
+                for follower_id, following_id in batch:
+                    _append(following, follower_id, following_id)
+                    _append(followers, following_id, follower_id)
+
+                edges += len(batch)
+                await asyncio.sleep(0)
+
+            unyielded = 0
+
+            for user_id, ids in followers.items():
+                followers[user_id] = array(ID_TYPECODE, sorted(ids))
+                unyielded += len(ids)
+
+                if unyielded >= batch_size:
+                    unyielded = 0
+                    await asyncio.sleep(0)
+        finally:
+            journal, self._journal = self._journal, None
+
+        self._following, self._followers = following, followers
+        self.edges = edges
+        self.ready = True
+
+        for method, *args in journal:
+            method(*args)
+
+        logger.info(f"Follow graph loaded: {self.stats()}")
+
+        return edges
+
+    def start(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        interval: float = FOLLOW_GRAPH_REFRESH_SECONDS,
+    ) -> None:
+        """
+        Запускает фоновую перезагрузку индекса.
+
+        Подписки, изменённые другими воркерами, попадают в индекс не
+        позже чем через interval секунд плюс время загрузки.
+
+        Args:
+            session_maker: Фабрика сессий БД
+            interval: Период перезагрузки в секундах; 0 отключает её
+        """
+        if interval > 0 and self._task is None:
+            self._task = asyncio.create_task(
+                self._refresh(session_maker, interval)
+            )
+
+    async def close(self) -> None:
+        """Останавливает фоновую перезагрузку индекса."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _refresh(
+        self, session_maker: async_sessionmaker[AsyncSession], interval: float
+    ) -> None:
+        """Фоновая задача: перезагружает индекс раз в interval секунд."""
+        while True:
+            await asyncio.sleep(interval)
+
+            # При ошибке остаётся прежний индекс до следующей попытки
+            try:
+                async with session_maker() as session:
+                    await self.load(session)
+            except Exception as e:
+                logger.exception(f"Failed to reload follow graph: {e}")
+
+    def add(self, follower_id: int, following_id: int) -> bool:
+        """
+        Добавляет подписку в индекс.
+
+        Args:
+            follower_id: ID подписчика
+            following_id: ID автора
+
+        Returns:
+            True, если подписки в индексе ещё не было
+        """
+        if self._journal is not None:
+            self._journal.append((self.add, follower_id, following_id))
+
+        added = _insert(self._following, int(follower_id), int(following_id))
+        _insert(self._followers, int(following_id), int(follower_id))
+        self.edges += added
+
+        return added
+
+    def remove(self, follower_id: int, following_id: int) -> bool:
+        """
+        Удаляет подписку из индекса.
+
+        Args:
+            follower_id: ID подписчика
+            following_id: ID автора
+
+        Returns:
+            True, если подписка в индексе была
+        """
+        if self._journal is not None:
+            self._journal.append((self.remove, follower_id, following_id))
+
+        removed = _discard(
+            self._following, int(follower_id), int(following_id)
+        )
+        _discard(self._followers, int(following_id), int(follower_id))
+        self.edges -= removed
+
+        return removed
+
+    def add_many(self, edges: Iterable[Edge]) -> None:
+        """Добавляет несколько подписок (пары подписчик, автор)."""
+        for follower_id, following_id in edges:
+            self.add(follower_id, following_id)
+
+    def remove_many(self, edges: Iterable[Edge]) -> None:
+        """Удаляет несколько подписок (пары подписчик, автор)."""
+        for follower_id, following_id in edges:
+            self.remove(follower_id, following_id)
+
+    def remove_user(self, user_id: int) -> None:
+        """
+        Удаляет все подписки пользователя в обе стороны.
+
+        Args:
+            user_id: ID удалённого пользователя
+        """
+        user_id = int(user_id)
+
+        if self._journal is not None:
+            self._journal.append((self.remove_user, user_id))
+
+        for following_id in self._following.pop(user_id, array(ID_TYPECODE)):
+            _discard(self._followers, following_id, user_id)
+            self.edges -= 1
+
+        for follower_id in self._followers.pop(user_id, array(ID_TYPECODE)):
+            _discard(self._following, follower_id, user_id)
+            self.edges -= 1
+
+    def following(self, user_id: int) -> array:
+        """
+        Возвращает отсортированный массив ID, на которых подписан user_id.
+
+        Массив принадлежит индексу: вызывающий код не должен его менять.
+        """
+        return self._following.get(int(user_id), _EMPTY)
+
+    def followers(self, user_id: int) -> array:
+        """
+        Возвращает отсортированный массив ID подписчиков user_id.
+
+        Массив принадлежит индексу: вызывающий код не должен его менять.
+        """
+        return self._followers.get(int(user_id), _EMPTY)
+
+    def is_following(self, follower_id: int, following_id: int) -> bool:
+        """Проверяет подписку двоичным поиском."""
+        return _contains(self.following(follower_id), int(following_id))
+
+    def page(self, ids: array, after: Optional[int], limit: int) -> array:
+        """
+        Возвращает срез отсортированного массива после ID курсора.
+
+        Args:
+            ids: Массив из `following` или `followers`
+            after: ID последнего элемента предыдущей страницы
+            limit: Размер среза
+
+        Returns:
+            Не более limit ID, больших after
+        """
+        start = 0 if after is None else bisect_right(ids, after)
+
+        end = start + limit
+
+        return ids[start:end]
+
+    def stats(self) -> Dict[str, int | bool]:
+        """
+        Возвращает размер индекса.
+
+        Поле bytes — оценка занимаемой памяти: массивы вместе с буферами
+        и словари, которые на них ссылаются.
+
+        Returns:
+            Словарь с полями: ready, users, edges, bytes
+        """
+        size = sys.getsizeof(self._following) + sys.getsizeof(self._followers)
+
+        for index in (self._following, self._followers):
+            size += sum(sys.getsizeof(ids) for ids in index.values())
+
+        users = len(self._following.keys() | self._followers.keys())
+
+        return {
+            "ready": self.ready,
+            "users": users,
+            "edges": self.edges,
+            "bytes": size,
+        }
+
+
+_EMPTY = array(ID_TYPECODE)
+
+
+def _append(index: Dict[int, array], key: int, value: int) -> None:
+    """Добавляет значение в конец массива ключа (при загрузке)."""
+    ids = index.get(key)
+
+    if ids is None:
+        index[key] = array(ID_TYPECODE, (value,))
+    else:
+        ids.append(value)
+
+
+def _contains(ids: array, value: int) -> bool:
+    """Проверяет наличие значения в отсортированном массиве."""
+    position = bisect_left(ids, value)
+
+    return position < len(ids) and ids[position] == value
+
+
+def _insert(index: Dict[int, array], key: int, value: int) -> bool:
+    """Вставляет значение в отсортированный массив ключа."""
+    ids = index.setdefault(key, array(ID_TYPECODE))
+    position = bisect_left(ids, value)
+
+    if position < len(ids) and ids[position] == value:
+        return False
+
+    ids.insert(position, value)
+
+    return True
+
+
+def _discard(index: Dict[int, array], key: int, value: int) -> bool:
+    """Удаляет значение из отсортированного массива ключа."""
+    ids = index.get(key)
+
+    if ids is None or not _contains(ids, value):
+        return False
+
+    del ids[bisect_left(ids, value)]
+
+    if not ids:
+        del index[key]
+
+    return True
+
+
+def create_follow_graph(
+    enabled: bool = FOLLOW_GRAPH_ENABLED, workers: int = WEB_CONCURRENCY
+) -> Optional[FollowGraph]:
+    """
+    Создаёт индекс, если он включён и приложение работает в одном воркере.
+
+    Args:
+        enabled: Включён ли индекс (FOLLOW_GRAPH_ENABLED)
+        workers: Количество воркеров приложения (WEB_CONCURRENCY)
+
+    Returns:
+        Пустой индекс или None, если сервисы должны читать БД
+    """
+    if not enabled:
+        return None
+
+    if workers > 1:
+        logger.warning(
+            f"Follow graph disabled: {workers} workers would serve stale "
+            "follow data, reading the followers table instead"
+        )
+        return None
+
+    return FollowGraph()
+
+
+follow_graph: Optional[FollowGraph] = create_follow_graph()
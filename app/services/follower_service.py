@@ -2,24 +2,49 @@
 Сервис для работы с подписками между пользователями.
 """
 
-from sqlalchemy import Column, delete, select
+from typing import Dict, List, Literal, Sequence, Set
+
+from sqlalchemy import Column, case, delete, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
-from app.db.models import Follower
+from app.db.models import Follower, User
+from app.db.statements import insert_ignore
+from app.services.feed_cache import invalidate_feeds
+from app.services.follow_graph import follow_graph
+from app.services.suggestion_service import invalidate_suggestions
+from app.services.timeline_service import (
+    add_author_to_timeline,
+    add_authors_to_timeline,
+    remove_author_from_timeline,
+    remove_authors_from_timeline,
+)
 
 logger = get_logger("follower_service")
 
+FollowOutcome = Literal[
+    "followed",
+    "unfollowed",
+    "already_following",
+    "not_following",
+    "self",
+    "not_found",
+]
+
 
 async def follow_user(
     session: AsyncSession,
-    follower_id: Column[int],
+    follower_id: Column[int] | int,
     following_id: Column[int] | int,
 ) -> bool:
     """
     Подписывает одного пользователя на другого.
 
-    Если подписка уже существует — ничего не делает (идемпотентность).
+    Вставка выполняется одним запросом `INSERT ... ON CONFLICT DO NOTHING
+    RETURNING`; если подписка уже существует — ничего не делает
+    (идемпотентность). Новая подписка добавляет твиты автора в ленту
+    подписчика и увеличивает счётчики подписок обоих пользователей в той
+    же транзакции.
 
     Args:
         session: Асинхронная сессия БД
@@ -27,7 +52,10 @@ async def follow_user(
         following_id: ID пользователя, на которого подписываются
 
     Returns:
-        True в случае успеха
+        True, если подписка создана; False, если она уже была
+
+    Raises:
+        SQLAlchemyError: При ошибке БД (транзакция откатывается)
 
     Example:
         >>> await follow_user(session, 1, 2)
@@ -35,42 +63,62 @@ async def follow_user(
     """
     logger.info(f"User {follower_id} is trying to follow user {following_id}")
 
-    result = await session.execute(
-        select(Follower).where(
-            Follower.follower_id == follower_id,
-            Follower.following_id == following_id,
+    try:
+        result = await session.execute(
+            insert_ignore(
+                session,
+                Follower,
+                follower_id=follower_id,
+                following_id=following_id,
+            ).returning(Follower.following_id)
         )
-    )
-
-    if result.scalar_one_or_none():
-        logger.debug(f"User {follower_id} already follows user {following_id}")
-        return True
+        changed = result.first() is not None
 
-    new_follow = Follower(follower_id=follower_id, following_id=following_id)
+        if changed:
+            await _shift_follow_counters(
+                session=session,
+                follower_id=follower_id,
+                following_ids=[following_id],
+                delta=1,
+            )
+            await add_author_to_timeline(
+                session=session, user_id=follower_id, author_id=following_id
+            )
 
-    try:
-        session.add(new_follow)
         await session.commit()
-        logger.info(
-            f"User {follower_id} successfully followed user {following_id}"
-        )
-
-        return True
     except Exception as e:
+        await session.rollback()
         logger.exception(f"Failed to create follow relationship: {e}")
+        raise
 
+    if not changed:
+        logger.debug(f"User {follower_id} already follows user {following_id}")
         return False
 
+    if follow_graph is not None:
+        follow_graph.add(int(follower_id), int(following_id))
+
+    await invalidate_feeds([follower_id])
+    await invalidate_suggestions(follower_id)
+    logger.info(
+        f"User {follower_id} successfully followed user {following_id}"
+    )
+
+    return True
+
 
 async def unfollow_user(
     session: AsyncSession,
-    follower_id: Column[int],
+    follower_id: Column[int] | int,
     following_id: Column[int] | int,
 ) -> bool:
     """
     Отписывает пользователя от другого.
 
-    Если подписки не было — ничего не делает (идемпотентность).
+    Удаление выполняется одним запросом `DELETE ... RETURNING`; если
+    подписки не было — ничего не делает (идемпотентность). Твиты автора
+    удаляются из ленты подписчика, счётчики подписок обоих пользователей
+    уменьшаются в той же транзакции.
 
     Args:
         session: Асинхронная сессия БД
@@ -78,7 +126,10 @@ async def unfollow_user(
         following_id: ID пользователя, от которого отписываются
 
     Returns:
-        True в случае успеха
+        True, если подписка удалена; False, если её не было
+
+    Raises:
+        SQLAlchemyError: При ошибке БД (транзакция откатывается)
 
     Example:
         >>> await unfollow_user(session, 1, 2)
@@ -88,18 +139,321 @@ async def unfollow_user(
         f"User {follower_id} is trying to unfollow user {following_id}"
     )
 
-    await session.execute(
-        delete(Follower).where(
-            Follower.follower_id == follower_id,
-            Follower.following_id == following_id,
-        )
-    )
     try:
-        await session.commit()
-        logger.info(f"User {follower_id} unfollowed user {following_id}")
+        result = await session.execute(
+            delete(Follower)
+            .where(
+                Follower.follower_id == follower_id,
+                Follower.following_id == following_id,
+            )
+            .returning(Follower.following_id)
+        )
+        changed = result.first() is not None
+
+        if changed:
+            await _shift_follow_counters(
+                session=session,
+                follower_id=follower_id,
+                following_ids=[following_id],
+                delta=-1,
+            )
+            await remove_author_from_timeline(
+                session=session, user_id=follower_id, author_id=following_id
+            )
 
-        return True
+        await session.commit()
     except Exception as e:
+        await session.rollback()
         logger.exception(f"Failed to remove follow relationship: {e}")
+        raise
 
+    if not changed:
+        logger.debug(f"User {follower_id} does not follow user {following_id}")
         return False
+
+    if follow_graph is not None:
+        follow_graph.remove(int(follower_id), int(following_id))
+
+    await invalidate_feeds([follower_id])
+    await invalidate_suggestions(follower_id)
+    logger.info(f"User {follower_id} unfollowed user {following_id}")
+
+    return True
+
+
+async def follow_users(
+    session: AsyncSession,
+    follower_id: Column[int] | int,
+    user_ids: Sequence[int],
+) -> Dict[int, FollowOutcome]:
+    """
+    Подписывает пользователя сразу на несколько других.
+
+    Все подписки создаются одним `INSERT ... SELECT ... ON CONFLICT DO
+    NOTHING RETURNING`: SELECT по таблице users в том же запросе
+    отбрасывает несуществующие ID и подписку на себя. Ленты и счётчики
+    обновляются в той же транзакции, что и подписки.
+
+    Args:
+        session: Асинхронная сессия БД
+        follower_id: ID пользователя, который подписывается
+        user_ids: ID пользователей, на которых подписываются
+
+    Returns:
+        Словарь {ID: результат} в порядке запроса (повторы схлопываются):
+        `followed`, `already_following`, `self` или `not_found`
+
+    Raises:
+        SQLAlchemyError: При ошибке БД (транзакция откатывается)
+
+    Example:
+        >>> await follow_users(session, 1, [2, 1, 3, 999])
+        {2: "followed", 1: "self", 3: "already_following",
+         999: "not_found"}
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    logger.info(f"User {follower_id} is following {len(user_ids)} users")
+
+    try:
+        result = await session.execute(
+            insert_ignore(session, Follower)
+            .from_select(
+                ["follower_id", "following_id"],
+                select(literal(follower_id), User.id).where(
+                    User.id.in_(user_ids), User.id != follower_id
+                ),
+            )
+            .returning(Follower.following_id)
+        )
+        followed = list(result.scalars().all())
+
+        if followed:
+            await _shift_follow_counters(
+                session=session,
+                follower_id=follower_id,
+                following_ids=followed,
+                delta=1,
+            )
+            await add_authors_to_timeline(
+                session=session, user_id=follower_id, author_ids=followed
+            )
+
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Failed to create follow relationships: {e}")
+        raise
+
+    if followed and follow_graph is not None:
+        follow_graph.add_many((int(follower_id), uid) for uid in followed)
+    if followed:
+        await invalidate_feeds([follower_id])
+        await invalidate_suggestions(follower_id)
+
+    outcomes = await _bulk_outcomes(
+        session=session,
+        follower_id=follower_id,
+        user_ids=user_ids,
+        changed=set(followed),
+        changed_outcome="followed",
+        unchanged_outcome="already_following",
+    )
+    logger.info(f"User {follower_id} followed {len(followed)} users")
+
+    return outcomes
+
+
+async def unfollow_users(
+    session: AsyncSession,
+    follower_id: Column[int] | int,
+    user_ids: Sequence[int],
+) -> Dict[int, FollowOutcome]:
+    """
+    Отписывает пользователя сразу от нескольких других.
+
+    Все подписки удаляются одним `DELETE ... RETURNING`; ленты и счётчики
+    обновляются в той же транзакции.
+
+    Args:
+        session: Асинхронная сессия БД
+        follower_id: ID пользователя, который отписывается
+        user_ids: ID пользователей, от которых отписываются
+
+    Returns:
+        Словарь {ID: результат} в порядке запроса (повторы схлопываются):
+        `unfollowed`, `not_following`, `self` или `not_found`
+
+    Raises:
+        SQLAlchemyError: При ошибке БД (транзакция откатывается)
+
+    Example:
+        >>> await unfollow_users(session, 1, [2, 3])
+        {2: "unfollowed", 3: "not_following"}
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    logger.info(f"User {follower_id} is unfollowing {len(user_ids)} users")
+
+    try:
+        result = await session.execute(
+            delete(Follower)
+            .where(
+                Follower.follower_id == follower_id,
+                Follower.following_id.in_(user_ids),
+            )
+            .returning(Follower.following_id)
+        )
+        unfollowed = list(result.scalars().all())
+
+        if unfollowed:
+            await _shift_follow_counters(
+                session=session,
+                follower_id=follower_id,
+                following_ids=unfollowed,
+                delta=-1,
+            )
+            await remove_authors_from_timeline(
+                session=session, user_id=follower_id, author_ids=unfollowed
+            )
+
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Failed to remove follow relationships: {e}")
+        raise
+
+    if unfollowed and follow_graph is not None:
+        follow_graph.remove_many((int(follower_id), uid) for uid in unfollowed)
+    if unfollowed:
+        await invalidate_feeds([follower_id])
+        await invalidate_suggestions(follower_id)
+
+    outcomes = await _bulk_outcomes(
+        session=session,
+        follower_id=follower_id,
+        user_ids=user_ids,
+        changed=set(unfollowed),
+        changed_outcome="unfollowed",
+        unchanged_outcome="not_following",
+    )
+    logger.info(f"User {follower_id} unfollowed {len(unfollowed)} users")
+
+    return outcomes
+
+
+async def _bulk_outcomes(
+    session: AsyncSession,
+    follower_id: Column[int] | int,
+    user_ids: List[int],
+    changed: Set[int],
+    changed_outcome: FollowOutcome,
+    unchanged_outcome: FollowOutcome,
+) -> Dict[int, FollowOutcome]:
+    """
+    Определяет результат массовой операции для каждого ID.
+
+    Существование проверяется одним запросом и только для ID, которые
+    операция не изменила.
+    """
+    unchanged = [
+        user_id
+        for user_id in user_ids
+        if user_id not in changed and user_id != follower_id
+    ]
+    existing: Set[int] = set()
+
+    if unchanged:
+        result = await session.execute(
+            select(User.id).where(User.id.in_(unchanged))
+        )
+        existing = set(result.scalars().all())
+
+    outcomes: Dict[int, FollowOutcome] = {}
+
+    for user_id in user_ids:
+        if user_id in changed:
+            outcomes[user_id] = changed_outcome
+        elif user_id == follower_id:
+            outcomes[user_id] = "self"
+        elif user_id in existing:
+            outcomes[user_id] = unchanged_outcome
+        else:
+            outcomes[user_id] = "not_found"
+
+    return outcomes
+
+
+async def _shift_follow_counters(
+    session: AsyncSession,
+    follower_id: Column[int] | int,
+    following_ids: Sequence[Column[int] | int],
+    delta: int,
+) -> None:
+    """
+    Меняет счётчики подписок подписчика и авторов одним UPDATE.
+
+    Не делает commit: вызывается внутри транзакции подписки или отписки.
+
+    Args:
+        session: Асинхронная сессия БД
+        follower_id: ID подписчика (following_count меняется на
+            delta * количество авторов)
+        following_ids: ID авторов (followers_count меняется на delta)
+        delta: +1 при подписке, -1 при отписке
+    """
+    await session.execute(
+        update(User)
+        .where(User.id.in_([follower_id, *following_ids]))
+        .values(
+            followers_count=User.followers_count
+            + case((User.id.in_(following_ids), delta), else_=0),
+            following_count=User.following_count
+            + case(
+                (User.id == follower_id, delta * len(following_ids)),
+                else_=0,
+            ),
+        )
+    )
+
+
+async def get_followed_user_ids(
+    session: AsyncSession,
+    follower_id: Column[int] | int,
+    user_ids: Sequence[int],
+) -> Set[int]:
+    """
+    Возвращает подмножество пользователей, на которых подписан follower.
+
+    Если загружен индекс графа подписок, ответ строится по нему без
+    запроса; иначе запрос идёт по составному первичному ключу
+    (follower_id, following_id).
+
+    Args:
+        session: Асинхронная сессия БД
+        follower_id: ID подписчика
+        user_ids: ID проверяемых пользователей
+
+    Returns:
+        Множество ID пользователей, на которых есть подписка
+
+    Example:
+        >>> await get_followed_user_ids(session, 1, [2, 3, 4])
+        {2, 4}
+    """
+    if not user_ids:
+        return set()
+
+    if follow_graph is not None and follow_graph.ready:
+        return {
+            user_id
+            for user_id in user_ids
+            if follow_graph.is_following(int(follower_id), user_id)
+        }
+
+    result = await session.execute(
+        select(Follower.following_id).where(
+            Follower.follower_id == follower_id,
+            Follower.following_id.in_(user_ids),
+        )
+    )
+
+    return set(result.scalars().all())
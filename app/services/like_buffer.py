@@ -0,0 +1,282 @@
+"""
+Буфер записи лайков: объединяет лайки и отмены лайков из разных запросов
+в пакетные запросы к БД.
+
+Вместо транзакции на каждый лайк намерения копятся в памяти и
+записываются раз в LIKE_BUFFER_INTERVAL_MS миллисекунд или по достижении
+LIKE_BUFFER_MAX_BATCH разных пар (пользователь, твит) — одним многострочным
+INSERT, одним DELETE и одним UPDATE счётчиков в общей транзакции. Строки
+пишутся в порядке ключей, чтобы параллельные пакеты нескольких процессов
+не взаимоблокировались.
+
+Несколько намерений одного пользователя для одного твита схлопываются:
+записывается последнее. Вызывающий код ждёт завершения commit пакета,
+поэтому после ответа запрос видит собственную запись (read-your-writes).
+
+Буфер включается переменной окружения LIKE_BUFFER_ENABLED=1 и
+сбрасывается при остановке приложения.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
+
+from sqlalchemy import Table, bindparam, delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import (
+    LIKE_BUFFER_ENABLED,
+    LIKE_BUFFER_INTERVAL_MS,
+    LIKE_BUFFER_MAX_BATCH,
+)
+from app.core.logging import get_logger
+from app.db.database import async_session_maker
+from app.db.models import Like, Tweet
+from app.db.statements import insert_ignore
+from app.services.feed_cache import invalidate_feeds
+
+logger = get_logger("like_buffer")
+
+LikeKey = Tuple[int, int]
+
+
+class LikeWriteBuffer:
+    """
+    Асинхронный буфер намерений «лайкнуть» / «убрать лайк».
+
+    Attributes:
+        interval: Максимальная задержка записи в секундах
+        max_batch: Количество пар (пользователь, твит), при котором пакет
+            записывается без ожидания интервала
+        submitted: Количество принятых намерений
+        coalesced: Количество намерений, схлопнутых с более поздними
+        flushes: Количество записанных пакетов
+        written: Количество реально изменённых строк likes
+
+    Example:
+        >>> buffer = LikeWriteBuffer(async_session_maker)
+        >>> await buffer.submit(user_id=1, tweet_id=5, liked=True)
+        True
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        interval: float = LIKE_BUFFER_INTERVAL_MS / 1000,
+        max_batch: int = LIKE_BUFFER_MAX_BATCH,
+    ) -> None:
+        self.session_maker = session_maker
+        self.interval = interval
+        self.max_batch = max_batch
+        self.submitted = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.written = 0
+        self._pending: Dict[LikeKey, Tuple[bool, List[asyncio.Future]]] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, user_id: int, tweet_id: int, liked: bool) -> bool:
+        """
+        Ставит намерение в очередь и ждёт записи пакета.
+
+        Args:
+            user_id: ID пользователя
+            tweet_id: ID твита
+            liked: True — поставить лайк, False — убрать
+
+        Returns:
+            True, если состояние лайка изменилось
+
+        Raises:
+            LookupError: Если твит не найден
+            SQLAlchemyError: При ошибке записи пакета
+        """
+        key = (int(user_id), int(tweet_id))
+        future = asyncio.get_running_loop().create_future()
+
+        _, waiters = self._pending.get(key, (liked, []))
+        self.coalesced += len(waiters) > 0
+        self._pending[key] = (liked, [*waiters, future])
+        self.submitted += 1
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+        return await future
+
+    async def flush(self) -> None:
+        """Записывает накопленные намерения одним пакетом."""
+        async with self._flush_lock:
+            batch, self._pending = self._pending, {}
+
+            if not batch:
+                return
+
+            try:
+                results = await self._write(batch)
+            except Exception as e:
+                logger.exception(f"Failed to flush {len(batch)} likes: {e}")
+                results = {key: e for key in batch}
+
+            for key, (_, waiters) in batch.items():
+                result = results[key]
+
+                for future in waiters:
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+    async def close(self) -> None:
+        """Записывает оставшиеся намерения и останавливает фоновую задачу."""
+        self._wakeup.set()
+        await self.flush()
+
+        if self._task is not None:
+            await self._task
+
+        logger.info(f"Like buffer closed: {self.stats()}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Возвращает счётчики буфера.
+
+        Returns:
+            Словарь с полями: pending, submitted, coalesced, flushes,
+            written
+        """
+        return {
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "written": self.written,
+        }
+
+    async def _run(self) -> None:
+        """Фоновая задача: записывает пакеты, пока есть намерения."""
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _write(
+        self, batch: Dict[LikeKey, Tuple[bool, List[asyncio.Future]]]
+    ) -> Dict[LikeKey, Any]:
+        """
+        Записывает пакет в одной транзакции.
+
+        Returns:
+            Словарь {(user_id, tweet_id): изменилось ли состояние или
+            исключение для этой пары}
+        """
+        # Строки блокируются в порядке ключей: пакеты разных процессов
+        # с пересекающимися ключами не взаимоблокируются в PostgreSQL
+        likes = sorted(key for key, (liked, _) in batch.items() if liked)
+        unlikes = sorted(key for key, (liked, _) in batch.items() if not liked)
+        results: Dict[LikeKey, Any] = {}
+        inserted: Set[LikeKey] = set()
+        deleted: Set[LikeKey] = set()
+
+        async with self.session_maker() as session:
+            if likes:
+                # Лайк несуществующего твита не должен ронять весь пакет
+                found = await session.execute(
+                    select(Tweet.id).where(
+                        Tweet.id.in_({tweet_id for _, tweet_id in likes})
+                    )
+                )
+                existing = set(found.scalars().all())
+
+                for key in likes:
+                    if key[1] not in existing:
+                        results[key] = LookupError(f"Tweet {key[1]} not found")
+
+                likes = [key for key in likes if key[1] in existing]
+
+            if likes:
+                result = await session.execute(
+                    insert_ignore(
+                        session,
+                        Like,
+                        rows=[
+                            {"user_id": user_id, "tweet_id": tweet_id}
+                            for user_id, tweet_id in likes
+                        ],
+                    ).returning(Like.user_id, Like.tweet_id)
+                )
+                inserted = {(row[0], row[1]) for row in result.all()}
+
+            if unlikes:
+                result = await session.execute(
+                    delete(Like)
+                    .where(tuple_(Like.user_id, Like.tweet_id).in_(unlikes))
+                    .returning(Like.user_id, Like.tweet_id)
+                )
+                deleted = {(row[0], row[1]) for row in result.all()}
+
+            deltas: Counter[int] = Counter()
+
+            for _, tweet_id in inserted:
+                deltas[tweet_id] += 1
+            for _, tweet_id in deleted:
+                deltas[tweet_id] -= 1
+
+            tweets = cast(Table, Tweet.__table__)
+            changed = [
+                {"tweet": tweet_id, "delta": delta}
+                for tweet_id, delta in sorted(deltas.items())
+                if delta
+            ]
+
+            if changed:
+                await session.execute(
+                    update(tweets)
+                    .where(tweets.c.id == bindparam("tweet"))
+                    .values(
+                        like_count=tweets.c.like_count + bindparam("delta")
+                    ),
+                    changed,
+                )
+
+            await session.commit()
+
+            # Пакет уже записан: ошибка инвалидации не должна превращать
+            # успешные лайки в ошибки, кэш ленты истечёт по TTL
+            try:
+                await invalidate_feeds(
+                    sorted({user_id for user_id, _ in inserted | deleted})
+                )
+            except Exception as e:
+                logger.exception(
+                    f"Failed to invalidate feeds after like batch: {e}"
+                )
+
+        self.flushes += 1
+        self.written += len(inserted) + len(deleted)
+        logger.debug(
+            f"Flushed like batch: {len(batch)} keys, "
+            f"{len(inserted)} inserted, {len(deleted)} deleted"
+        )
+
+        for key in likes:
+            results[key] = key in inserted
+        for key in unlikes:
+            results[key] = key in deleted
+
+        return results
+
+
+like_buffer: Optional[LikeWriteBuffer] = (
+    LikeWriteBuffer(async_session_maker) if LIKE_BUFFER_ENABLED else None
+)
@@ -2,22 +2,34 @@
 Сервис для работы с лайками.
 """
 
-from sqlalchemy import Column, delete, select
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import Column, delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import LIST_DEFAULT_LIMIT
 from app.core.logging import get_logger
-from app.db.models import Like
+from app.db.models import Like, Tweet, User
+from app.db.statements import insert_ignore
+from app.services.feed_cache import invalidate_feeds
+from app.utils.pagination import decode_cursor, encode_cursor
 
 logger = get_logger("like_service")
 
 
 async def add_like(
-    session: AsyncSession, tweet_id: Column[int] | int, user_id: Column[int]
+    session: AsyncSession,
+    tweet_id: Column[int] | int,
+    user_id: Column[int] | int,
 ) -> bool:
     """
     Ставит лайк на твит.
 
-    Если лайк уже есть — ничего не делает (идемпотентность).
+    Вставка выполняется одним запросом `INSERT ... ON CONFLICT DO NOTHING
+    RETURNING`, поэтому повторный и конкурентный лайк ничего не меняют
+    (идемпотентность). При добавлении новой записи увеличивает счётчик
+    like_count твита в той же транзакции. Сбрасывается только кэш ленты
+    лайкнувшего (см. feed_cache).
 
     Args:
         session: Асинхронная сессия БД
@@ -25,7 +37,10 @@ async def add_like(
         user_id: ID пользователя
 
     Returns:
-        True в случае успеха
+        True, если лайк был поставлен; False, если он уже был
+
+    Raises:
+        SQLAlchemyError: При ошибке БД (транзакция откатывается)
 
     Example:
         >>> await add_like(session, 5, 1)
@@ -33,35 +48,46 @@ async def add_like(
     """
     logger.info(f"User {user_id} is liking tweet {tweet_id}")
 
-    result = await session.execute(
-        select(Like).where(Like.tweet_id == tweet_id, Like.user_id == user_id)
-    )
-
-    if result.scalar_one_or_none():
-        logger.debug(f"User {user_id} already liked tweet {tweet_id}")
-        return True
+    try:
+        result = await session.execute(
+            insert_ignore(
+                session, Like, user_id=user_id, tweet_id=tweet_id
+            ).returning(Like.tweet_id)
+        )
+        changed = result.first() is not None
 
-    like = Like(user_id=user_id, tweet_id=tweet_id)
+        if changed:
+            await session.execute(
+                update(Tweet)
+                .where(Tweet.id == tweet_id)
+                .values(like_count=Tweet.like_count + 1)
+            )
 
-    try:
-        session.add(like)
         await session.commit()
-        logger.info(f"User {user_id} liked tweet {tweet_id}")
-
-        return True
     except Exception as e:
+        await session.rollback()
         logger.exception(f"Failed to add like: {e}")
+        raise
 
+    if not changed:
+        logger.debug(f"User {user_id} already liked tweet {tweet_id}")
         return False
 
+    await invalidate_feeds([user_id])
+    logger.info(f"User {user_id} liked tweet {tweet_id}")
+
+    return True
+
 
 async def remove_like(
-    session: AsyncSession, tweet_id: int, user_id: Column[int]
+    session: AsyncSession, tweet_id: int, user_id: Column[int] | int
 ) -> bool:
     """
     Убирает лайк с твита.
 
-    Если лайка не было — ничего не делает (идемпотентность).
+    Удаление выполняется одним запросом `DELETE ... RETURNING`; если лайка
+    не было — ничего не делает (идемпотентность). Счётчик like_count твита
+    уменьшается, только если запись о лайке действительно была удалена.
 
     Args:
         session: Асинхронная сессия БД
@@ -69,7 +95,10 @@ async def remove_like(
         user_id: ID пользователя
 
     Returns:
-        True в случае успеха
+        True, если лайк был убран; False, если его не было
+
+    Raises:
+        SQLAlchemyError: При ошибке БД (транзакция откатывается)
 
     Example:
         >>> await remove_like(session, 5, 1)
@@ -77,21 +106,181 @@ async def remove_like(
     """
     logger.info(f"User {user_id} is unliking tweet {tweet_id}")
 
-    await session.execute(
-        delete(Like).where(Like.tweet_id == tweet_id, Like.user_id == user_id)
-    )
-
     try:
-        await session.execute(
-            delete(Like).where(
-                Like.tweet_id == tweet_id, Like.user_id == user_id
-            )
+        result = await session.execute(
+            delete(Like)
+            .where(Like.tweet_id == tweet_id, Like.user_id == user_id)
+            .returning(Like.tweet_id)
         )
-        await session.commit()
-        logger.info(f"User {user_id} removed like from tweet {tweet_id}")
+        changed = result.first() is not None
 
-        return True
+        if changed:
+            await session.execute(
+                update(Tweet)
+                .where(Tweet.id == tweet_id)
+                .values(like_count=Tweet.like_count - 1)
+            )
+
+        await session.commit()
     except Exception as e:
+        await session.rollback()
         logger.exception(f"Failed to remove like: {e}")
+        raise
 
+    if not changed:
+        logger.debug(f"User {user_id} has not liked tweet {tweet_id}")
         return False
+
+    await invalidate_feeds([user_id])
+    logger.info(f"User {user_id} removed like from tweet {tweet_id}")
+
+    return True
+
+
+async def get_likers_sample(
+    session: AsyncSession, tweet_ids: Sequence[int], per_tweet: int
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Возвращает первых `per_tweet` лайкнувших для каждого твита одним
+    запросом.
+
+    Лайкнувшие упорядочены по ID пользователя — так же, как в
+    постраничном списке `get_tweet_likers`.
+
+    Args:
+        session: Асинхронная сессия БД
+        tweet_ids: ID твитов
+        per_tweet: Максимальное количество лайкнувших на твит
+
+    Returns:
+        Словарь {tweet_id: [{"user_id": ..., "name": ...}, ...]}
+
+    Example:
+        >>> await get_likers_sample(session, [5, 6], 3)
+        {5: [{"user_id": 1, "name": "Alice"}]}
+    """
+    if not tweet_ids or per_tweet <= 0:
+        return {}
+
+    ranked = (
+        select(
+            Like.tweet_id,
+            Like.user_id,
+            func.row_number()
+            .over(partition_by=Like.tweet_id, order_by=Like.user_id)
+            .label("position"),
+        )
+        .where(Like.tweet_id.in_(tweet_ids))
+        .subquery()
+    )
+    result = await session.execute(
+        select(ranked.c.tweet_id, User.id, User.name)
+        .join(User, User.id == ranked.c.user_id)
+        .where(ranked.c.position <= per_tweet)
+        .order_by(ranked.c.tweet_id, ranked.c.position)
+    )
+
+    likers: Dict[int, List[Dict[str, Any]]] = {}
+
+    for tweet_id, liker_id, name in result.all():
+        likers.setdefault(tweet_id, []).append(
+            {"user_id": liker_id, "name": name}
+        )
+
+    return likers
+
+
+async def get_liked_tweet_ids(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    tweet_ids: Sequence[int],
+) -> Set[int]:
+    """
+    Возвращает подмножество твитов, которые лайкнул пользователь.
+
+    Запрос идёт по составному первичному ключу (user_id, tweet_id).
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID пользователя
+        tweet_ids: ID проверяемых твитов
+
+    Returns:
+        Множество ID лайкнутых твитов
+
+    Example:
+        >>> await get_liked_tweet_ids(session, 1, [5, 6, 7])
+        {5, 7}
+    """
+    if not tweet_ids:
+        return set()
+
+    result = await session.execute(
+        select(Like.tweet_id).where(
+            Like.user_id == user_id, Like.tweet_id.in_(tweet_ids)
+        )
+    )
+
+    return set(result.scalars().all())
+
+
+async def get_tweet_likers(
+    session: AsyncSession,
+    tweet_id: int,
+    limit: int = LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Возвращает страницу пользователей, лайкнувших твит.
+
+    Пагинация keyset по ID пользователя: курсор кодирует ID последнего
+    лайкнувшего на странице.
+
+    Args:
+        session: Асинхронная сессия БД
+        tweet_id: ID твита
+        limit: Максимальное количество пользователей на странице
+        cursor: Курсор, полученный в `next_cursor` предыдущей страницы
+
+    Returns:
+        Словарь с ключами `likes` и `next_cursor`;
+        None, если твит не найден
+
+    Raises:
+        ValueError: Если курсор повреждён
+
+    Example:
+        >>> page = await get_tweet_likers(session, 5, limit=2)
+        >>> page["likes"]
+        [{"user_id": 1, "name": "Alice"}, {"user_id": 2, "name": "Bob"}]
+    """
+    logger.info(f"Loading likers of tweet {tweet_id}")
+
+    query = (
+        select(User.id, User.name)
+        .join(Like, Like.user_id == User.id)
+        .where(Like.tweet_id == tweet_id)
+        .order_by(Like.user_id)
+        .limit(limit + 1)
+    )
+
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        query = query.where(Like.user_id > after_id)
+
+    rows = (await session.execute(query)).all()
+
+    if not rows and not cursor and await session.get(Tweet, tweet_id) is None:
+        logger.warning(f"Tweet {tweet_id} not found")
+        return None
+
+    next_cursor = None
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0])
+
+    return {
+        "likes": [{"user_id": uid, "name": name} for uid, name in rows],
+        "next_cursor": next_cursor,
+    }
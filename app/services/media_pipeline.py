@@ -0,0 +1,345 @@
+"""
+Фоновое построение уменьшенных копий (WebP) загруженных изображений.
+
+После commit загрузки `upload_media` ставит файл в ограниченную очередь
+(MEDIA_VARIANTS_QUEUE_SIZE). Задачи очереди выполняет пул из
+MEDIA_VARIANTS_WORKERS процессов: декодирование и кодирование изображений
+не выполняются ни в event loop, ни в потоках процесса приложения и не
+держат GIL. Копии строятся во временных файлах и переносятся в хранилище
+(см. app.core.storage); оригинал из удалённого хранилища предварительно
+скачивается. Готовые копии записываются в media.variants всех записей с
+тем же content_hash.
+
+Если очередь заполнена, задача отбрасывается (счётчик dropped): клиенты
+получают оригинал, как и до появления копий. Повторная постановка файла,
+который уже ждёт в очереди, ничего не делает.
+
+Пайплайн включается переменной окружения MEDIA_VARIANTS_ENABLED=1,
+запускается при старте приложения и останавливается при остановке.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import suppress
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import (
+    MEDIA_VARIANT_QUALITY,
+    MEDIA_VARIANT_WIDTHS,
+    MEDIA_VARIANTS_ENABLED,
+    MEDIA_VARIANTS_QUEUE_SIZE,
+    MEDIA_VARIANTS_WORKERS,
+)
+from app.core.logging import get_logger
+from app.core.storage import StorageBackend, storage
+from app.db.database import async_session_maker
+from app.db.models import Media
+from app.utils.file_storage import MEDIA_CATEGORIES, media_key
+from app.utils.images import render_variants
+
+logger = get_logger("media_pipeline")
+
+# Задача очереди: (content_hash, URL оригинала, время постановки)
+Job = Tuple[str, str, float]
+
+
+def variant_url(file_path: str, width: int) -> str:
+    """
+    Возвращает URL копии файла заданной ширины.
+
+    Example:
+        >>> variant_url("/media/9f/86/9f86d081.jpg", 320)
+        '/media/9f/86/9f86d081.w320.webp'
+    """
+    return f"{os.path.splitext(file_path)[0]}.w{width}.webp"
+
+
+class MediaPipeline:
+    """
+    Очередь построения копий изображений с пулом процессов.
+
+    Attributes:
+        processed: Количество обработанных файлов
+        failed: Количество файлов, обработка которых завершилась ошибкой
+        dropped: Количество файлов, не поставленных из-за полной очереди
+
+    Example:
+        >>> pipeline = MediaPipeline(async_session_maker)
+        >>> pipeline.start()
+        >>> pipeline.submit(content_hash, "/media/9f/86/9f86d081.jpg")
+        True
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        workers: int = MEDIA_VARIANTS_WORKERS,
+        queue_size: int = MEDIA_VARIANTS_QUEUE_SIZE,
+        widths: Tuple[int, ...] = MEDIA_VARIANT_WIDTHS,
+        quality: int = MEDIA_VARIANT_QUALITY,
+        backend: Optional[StorageBackend] = None,
+    ) -> None:
+        self.session_maker = session_maker
+        self.workers = workers
+        self.queue_size = queue_size
+        self.widths = widths
+        self.quality = quality
+        self.backend = backend or storage
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self._wait_seconds = 0.0
+        self._render_seconds = 0.0
+        self._render_max = 0.0
+        self._running = 0
+        self._pending: Set[str] = set()
+        self._queue: Optional[asyncio.Queue[Job]] = None
+        self._executor: Optional[Executor] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self, executor: Optional[Executor] = None) -> None:
+        """
+        Создаёт пул процессов и задачи, разбирающие очередь.
+
+        Args:
+            executor: Готовый пул (по умолчанию — ProcessPoolExecutor из
+                self.workers процессов, запускаемых через spawn)
+        """
+        if executor is None:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        self._executor = executor
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(self._queue))
+            for _ in range(self.workers)
+        ]
+        logger.info(f"Media pipeline started with {self.workers} workers")
+
+    def submit(self, content_hash: str, file_path: str) -> bool:
+        """
+        Ставит изображение в очередь построения копий.
+
+        Файлы, которые не являются изображениями, пропускаются.
+
+        Args:
+            content_hash: SHA-256 содержимого
+            file_path: URL оригинала (`/media/...`)
+
+        Returns:
+            True, если файл поставлен в очередь или уже ждёт в ней
+        """
+        ext = os.path.splitext(file_path)[1]
+
+        if self._queue is None or MEDIA_CATEGORIES.get(ext) != "image":
+            return False
+
+        if content_hash in self._pending:
+            return True
+
+        try:
+            self._queue.put_nowait(
+                (content_hash, file_path, time.perf_counter())
+            )
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Media pipeline queue full, dropped {file_path}")
+            return False
+
+        self._pending.add(content_hash)
+
+        return True
+
+    async def join(self) -> None:
+        """Ждёт обработки всех поставленных файлов."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Останавливает задачи очереди и пул процессов."""
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        self._queue = None
+        self._pending.clear()
+        logger.info(f"Media pipeline closed: {self.stats()}")
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Возвращает глубину очереди, счётчики и задержки.
+
+        wait_ms_avg — среднее время ожидания в очереди, render_ms_avg и
+        render_ms_max — время построения копий одного файла в пуле.
+
+        Returns:
+            Словарь с полями: queued, running, processed, failed, dropped,
+            wait_ms_avg, render_ms_avg, render_ms_max
+        """
+        done = self.processed + self.failed
+
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": self._running,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "wait_ms_avg": (
+                round(self._wait_seconds * 1000 / done, 1) if done else 0.0
+            ),
+            "render_ms_avg": (
+                round(self._render_seconds * 1000 / done, 1) if done else 0.0
+            ),
+            "render_ms_max": round(self._render_max * 1000, 1),
+        }
+
+    async def _worker(self, queue: asyncio.Queue[Job]) -> None:
+        """Задача, разбирающая очередь по одному файлу."""
+        while True:
+            content_hash, file_path, enqueued = await queue.get()
+
+            try:
+                await self._process(content_hash, file_path, enqueued)
+            except Exception as e:
+                self.failed += 1
+                logger.exception(f"Failed to render {file_path}: {e}")
+            finally:
+                self._pending.discard(content_hash)
+                queue.task_done()
+
+    async def _process(
+        self, content_hash: str, file_path: str, enqueued: float
+    ) -> None:
+        """Строит копии файла и записывает их в media.variants."""
+        started = time.perf_counter()
+        self._wait_seconds += started - enqueued
+        self._running += 1
+
+        try:
+            rendered = await self._render(file_path)
+        finally:
+            self._running -= 1
+            elapsed = time.perf_counter() - started
+            self._render_seconds += elapsed
+            self._render_max = max(self._render_max, elapsed)
+
+        variants = {
+            str(width): variant_url(file_path, width) for width in rendered
+        }
+
+        # Записи, добавленные после снятия с очереди, поставят файл снова
+        self._pending.discard(content_hash)
+
+        async with self.session_maker() as session:
+            await session.execute(
+                update(Media)
+                .where(Media.content_hash == content_hash)
+                .values(variants=variants)
+            )
+            await session.commit()
+
+        self.processed += 1
+        logger.info(
+            f"Rendered {len(variants)} variants of {file_path} in "
+            f"{elapsed * 1000:.0f} ms"
+        )
+
+    async def _render(self, file_path: str) -> List[int]:
+        """
+        Строит в пуле недостающие копии и переносит их в хранилище.
+
+        Returns:
+            Ширины копий, которые есть в хранилище
+        """
+        stored: List[int] = []
+        missing: List[Tuple[int, str]] = []
+
+        for width in self.widths:
+            key = media_key(variant_url(file_path, width))
+
+            if await self.backend.exists(key):
+                stored.append(width)
+            else:
+                missing.append((width, key))
+
+        if not missing:
+            return stored
+
+        key = media_key(file_path)
+        source = self.backend.local_path(key)
+        downloaded = None
+
+        if source is None:
+            source = downloaded = await self._download(key)
+
+        targets = [
+            (
+                width,
+                os.path.join(
+                    self.backend.staging_dir,
+                    f".variant-{uuid.uuid4().hex}.w{width}.webp",
+                ),
+            )
+            for width, _ in missing
+        ]
+
+        try:
+            rendered = await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                render_variants,
+                source,
+                targets,
+                self.quality,
+            )
+
+            for width, variant_key in missing:
+                if width in rendered:
+                    await self.backend.put_file(variant_key, rendered[width])
+                    stored.append(width)
+        finally:
+            for path in [downloaded] + [path for _, path in targets]:
+                if path is not None:
+                    with suppress(FileNotFoundError):
+                        await asyncio.to_thread(os.unlink, path)
+
+        return sorted(stored)
+
+    async def _download(self, key: str) -> str:
+        """Скачивает оригинал из хранилища во временный файл."""
+        fd, path = tempfile.mkstemp(
+            prefix=".variant-",
+            suffix=os.path.splitext(key)[1],
+            dir=self.backend.staging_dir,
+        )
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in self.backend.get(key):
+                    await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            os.unlink(path)
+            raise
+
+        return path
+
+
+media_pipeline: Optional[MediaPipeline] = (
+    MediaPipeline(async_session_maker) if MEDIA_VARIANTS_ENABLED else None
+)
@@ -1,50 +1,294 @@
 """
 Сервис для сохранения информации о медиафайлах в БД.
+
+Файлы адресуются по хэшу содержимого (см. app.utils.file_storage): на
+каждый файл приходится одна строка media_blobs со счётчиком ссылок из
+media. Повторная загрузка того же содержимого увеличивает счётчик и
+переиспользует файл, после удаления последней ссылки файл удаляется вместе
+с его уменьшенными копиями. После commit загрузки изображение ставится в
+очередь построения копий (см. media_pipeline).
+
+Файл записывается в хранилище до транзакции загрузки (запись по хэшу
+идемпотентна), а транзакция лишь создаёт или увеличивает строку
+media_blobs и добавляет запись media, поэтому блокировка строки не
+держится на время обращений к хранилищу. Если commit не удался, объект
+остаётся без ссылок и переиспользуется следующей загрузкой того же
+содержимого.
+
+Удаление двухфазное: `release_media` в транзакции удаления твитов только
+уменьшает счётчики, а `purge_media` после её commit в отдельной
+транзакции удаляет строки без ссылок и их файлы, держа блокировку этих
+строк. Откат удаления твитов не оставляет ссылок на удалённые файлы.
+Загрузка, заставшая файл уже в хранилище, держит свой временный файл до
+commit и после него проверяет файл ещё раз: если параллельная очистка
+успела его удалить, файл записывается заново. Сбой очистки оставляет
+строку с нулевым счётчиком и файл: утечка безопаснее потери, а повторная
+загрузка переиспользует такую строку.
 """
 
-from typing import Optional
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
 
-from sqlalchemy import Column
+from sqlalchemy import Column, delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
-from app.db.models import Media
+from app.db.models import Media, MediaBlob
+from app.db.statements import insert_ignore
+from app.services.media_pipeline import media_pipeline
+from app.utils.file_storage import (
+    StagedUpload,
+    delete_media_files,
+    discard_upload,
+    place_upload,
+)
 
 logger = get_logger("media_service")
 
 
 async def upload_media(
-    session: AsyncSession, file_path: str
+    session: AsyncSession, upload: StagedUpload
 ) -> Optional[int | Column[int]]:
     """
-    Сохраняет путь к файлу в базе данных.
+    Сохраняет загруженный файл и запись о нём в базе данных.
+
+    Файл записывается в хранилище до транзакции (см. описание модуля).
+    Если файл с таким же содержимым уже хранится, новая запись ссылается
+    на него, а временный файл загрузки удаляется.
 
     Args:
         session: Асинхронная сессия БД
-        file_path: Путь к файлу (например, `/media/abc.jpg`)
+        upload: Временный файл из `save_upload_file`
 
     Returns:
         ID созданной записи в таблице media;
         None в случае ошибки
 
+    Raises:
+        SQLAlchemyError: При ошибке БД (временный файл удаляется)
+
     Example:
-        >>> media_id = await upload_media(session, "/media/photo.jpg")
+        >>> media_id = await upload_media(session, upload)
         >>> print(media_id)
         3
     """
-    logger.info(f"Uploading media: {file_path}")
+    logger.info(f"Uploading media: {upload.url}")
 
-    media = Media(file_path=file_path)
+    try:
+        placed = await place_upload(upload, upload.url, keep_temp=True)
 
-    session.add(media)
-    await session.flush()
+        file_path = await _acquire_blob(session=session, upload=upload)
+        media = Media(file_path=file_path, content_hash=upload.content_hash)
+        session.add(media)
+        await session.flush()
 
-    try:
         await session.commit()
         logger.info(
             f"Media uploaded successfully: id={media.id}, path={file_path}"
         )
-        return media.id
     except Exception as e:
-        logger.exception(f"Failed to upload media {file_path}: {e}")
+        await session.rollback()
+        await discard_upload(upload)
+        logger.exception(f"Failed to upload media {upload.url}: {e}")
         raise
+
+    await _settle_upload(upload, file_path, placed)
+
+    if media_pipeline is not None:
+        media_pipeline.submit(upload.content_hash, file_path)
+
+    return media.id
+
+
+async def release_media(
+    session: AsyncSession, tweet_ids: Iterable[int | Column[int]]
+) -> Dict[str, List[str]]:
+    """
+    Уменьшает счётчики ссылок файлов медиа удаляемых твитов.
+
+    Вызывается в транзакции удаления твитов до удаления записей media.
+    Файлы не удаляются: результат передаётся в `purge_media` после
+    успешного commit вызывающего кода (см. описание модуля).
+
+    Args:
+        session: Асинхронная сессия БД
+        tweet_ids: ID удаляемых твитов
+
+    Returns:
+        Словарь {хэш содержимого: URL уменьшенных копий} для файлов,
+        на которые не осталось ссылок
+
+    Example:
+        >>> await release_media(session, [5])
+        {'9f86d081…': ['/media/9f/86/9f86d081…_320.jpg']}
+    """
+    tweet_ids = list(tweet_ids)
+
+    if not tweet_ids:
+        return {}
+
+    result = await session.execute(
+        select(Media.content_hash, Media.variants).where(
+            Media.tweet_id.in_(tweet_ids), Media.content_hash.is_not(None)
+        )
+    )
+    rows = result.all()
+    references = Counter(content_hash for content_hash, _ in rows)
+    variants = {
+        content_hash: list(urls.values())
+        for content_hash, urls in rows
+        if urls
+    }
+
+    if not references:
+        return {}
+
+    # Обычно каждый файл теряет одну ссылку: один UPDATE на величину
+    by_amount: Dict[int, List[str]] = {}
+
+    for content_hash, amount in references.items():
+        by_amount.setdefault(amount, []).append(content_hash)
+
+    released: List[str] = []
+
+    for amount, hashes in by_amount.items():
+        result = await session.execute(
+            update(MediaBlob)
+            .where(MediaBlob.content_hash.in_(hashes))
+            .values(ref_count=MediaBlob.ref_count - amount)
+            .returning(MediaBlob.content_hash, MediaBlob.ref_count)
+        )
+        released.extend(
+            content_hash
+            for content_hash, ref_count in result.all()
+            if ref_count <= 0
+        )
+
+    return {
+        content_hash: variants.get(content_hash, [])
+        for content_hash in released
+    }
+
+
+async def purge_media(
+    session: AsyncSession, released: Dict[str, List[str]]
+) -> List[str]:
+    """
+    Удаляет файлы, освобождённые `release_media`, и их строки media_blobs.
+
+    Вызывается после commit транзакции удаления твитов. Строка удаляется,
+    только если счётчик ссылок всё ещё нулевой: файл, который успела
+    переиспользовать параллельная загрузка, сохраняется. Ошибки
+    логируются и не пробрасываются — твиты уже удалены.
+
+    Args:
+        session: Асинхронная сессия БД
+        released: Результат `release_media`
+
+    Returns:
+        URL удалённых файлов
+
+    Example:
+        >>> await purge_media(session, released)
+        ['/media/9f/86/9f86d081….jpg']
+    """
+    if not released:
+        return []
+
+    try:
+        result = await session.execute(
+            delete(MediaBlob)
+            .where(
+                MediaBlob.content_hash.in_(list(released)),
+                MediaBlob.ref_count <= 0,
+            )
+            .returning(MediaBlob.content_hash, MediaBlob.file_path)
+        )
+        freed_rows = result.all()
+        freed = [file_path for _, file_path in freed_rows]
+        copies = [
+            url
+            for content_hash, _ in freed_rows
+            for url in released[content_hash]
+        ]
+
+        if freed:
+            await delete_media_files(freed + copies)
+
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Failed to purge {len(released)} media files: {e}")
+        return []
+
+    if freed:
+        logger.info(f"Freed {len(freed)} media files, {len(copies)} copies")
+
+    return freed
+
+
+async def _settle_upload(
+    upload: StagedUpload, file_path: str, placed: bool
+) -> None:
+    """
+    Сверяет хранилище с учтённым файлом после commit загрузки.
+
+    Ошибки логируются и не пробрасываются — запись media уже создана.
+
+    Args:
+        upload: Временный файл загрузки
+        file_path: URL файла из media_blobs
+        placed: Записала ли загрузка объект до транзакции
+    """
+    try:
+        if placed and file_path != upload.url:
+            # То же содержимое уже хранится под другим расширением
+            await delete_media_files([upload.url])
+        elif not placed:
+            # Очистка могла удалить файл до появления нашей ссылки
+            if await place_upload(upload, file_path):
+                logger.warning(f"Restored purged media file {file_path}")
+    except Exception as e:
+        logger.exception(f"Failed to settle media file {file_path}: {e}")
+    finally:
+        await discard_upload(upload)
+
+
+async def _acquire_blob(session: AsyncSession, upload: StagedUpload) -> str:
+    """
+    Создаёт строку media_blobs или увеличивает её счётчик ссылок.
+
+    Returns:
+        URL файла (у повторной загрузки — URL уже хранящегося файла)
+    """
+    # Строка может исчезнуть между конфликтом вставки и UPDATE, если
+    # параллельно удалили последнюю ссылку: тогда вставка повторяется
+    for _ in range(3):
+        result = await session.execute(
+            insert_ignore(
+                session,
+                MediaBlob,
+                content_hash=upload.content_hash,
+                file_path=upload.url,
+                size=upload.size,
+                ref_count=1,
+            ).returning(MediaBlob.file_path)
+        )
+        file_path = result.scalar_one_or_none()
+
+        if file_path is not None:
+            return file_path
+
+        result = await session.execute(
+            update(MediaBlob)
+            .where(MediaBlob.content_hash == upload.content_hash)
+            .values(ref_count=MediaBlob.ref_count + 1)
+            .returning(MediaBlob.file_path)
+        )
+        file_path = result.scalar_one_or_none()
+
+        if file_path is not None:
+            logger.debug(f"Duplicate upload of {file_path}")
+            return file_path
+
+    raise RuntimeError(f"Failed to acquire media blob {upload.content_hash}")
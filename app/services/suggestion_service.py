@@ -0,0 +1,223 @@
+"""
+Рекомендации «кого читать»: друзья друзей, ранжированные по числу общих
+связей.
+
+Кандидат — пользователь, на которого подписаны те, на кого подписан
+текущий пользователь; вес кандидата — количество таких подписок. Сам
+пользователь и те, на кого он уже подписан, исключаются.
+
+Если загружен индекс графа подписок, подсчёт идёт по его массивам
+(подсчёт Counter по цепочке массивов выполняется в C) с ограничением по
+времени; иначе — одним SQL-запросом с самосоединением followers. В обоих
+случаях учитываются не более SUGGESTIONS_MAX_SOURCES подписок пользователя.
+Результат кэшируется на SUGGESTIONS_CACHE_TTL секунд и сбрасывается при
+изменении подписок пользователя.
+"""
+
+import heapq
+import time
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.cache import cache
+from app.core.config import (
+    SUGGESTIONS_CACHE_TTL,
+    SUGGESTIONS_MAX_LIMIT,
+    SUGGESTIONS_MAX_SOURCES,
+    SUGGESTIONS_TIME_BUDGET_MS,
+)
+from app.core.logging import get_logger
+from app.db.models import Follower, User
+from app.services.follow_graph import FollowGraph, follow_graph
+
+logger = get_logger("suggestion_service")
+
+Ranked = List[Tuple[int, int]]
+
+
+def suggestions_key(user_id: Column[int] | int) -> str:
+    """
+    Возвращает ключ кэша рекомендаций пользователя.
+
+    Args:
+        user_id: ID пользователя
+
+    Returns:
+        Ключ вида `suggestions:{user_id}`
+    """
+    return f"suggestions:{user_id}"
+
+
+async def invalidate_suggestions(user_id: Column[int] | int) -> None:
+    """
+    Удаляет из кэша рекомендации пользователя (после смены подписок).
+
+    Args:
+        user_id: ID пользователя
+    """
+    await cache.delete(suggestions_key(user_id))
+
+
+def rank_friends_of_friends(
+    graph: FollowGraph,
+    user_id: int,
+    limit: int = SUGGESTIONS_MAX_LIMIT,
+    budget: float = SUGGESTIONS_TIME_BUDGET_MS / 1000,
+    max_sources: int = SUGGESTIONS_MAX_SOURCES,
+) -> Tuple[Ranked, bool]:
+    """
+    Ранжирует друзей друзей по индексу графа подписок.
+
+    Подписки пользователя обрабатываются порциями; если бюджет времени
+    исчерпан, возвращается результат по уже обработанным порциям.
+
+    Args:
+        graph: Загруженный индекс графа подписок
+        user_id: ID пользователя
+        limit: Количество кандидатов
+        budget: Бюджет времени в секундах
+        max_sources: Сколько подписок пользователя учитывать
+
+    Returns:
+        Пара (список (ID кандидата, число общих связей) по убыванию
+        веса, True — если результат неполный из-за бюджета)
+
+    Example:
+        >>> rank_friends_of_friends(graph, 1, limit=2)
+        ([(7, 3), (4, 1)], False)
+    """
+    deadline = time.perf_counter() + budget
+    sources = graph.following(user_id)[:max_sources]
+    counts: Counter[int] = Counter()
+    partial = False
+
+    for start in range(0, len(sources), 64):
+        end = start + 64
+        counts.update(
+            chain.from_iterable(
+                graph.following(source) for source in sources[start:end]
+            )
+        )
+
+        if time.perf_counter() > deadline and end < len(sources):
+            partial = True
+            break
+
+    counts.pop(int(user_id), None)
+
+    for followed in graph.following(user_id):
+        counts.pop(followed, None)
+
+    ranked = heapq.nlargest(
+        limit, counts.items(), key=lambda item: (item[1], -item[0])
+    )
+
+    return ranked, partial
+
+
+async def _rank_with_sql(
+    session: AsyncSession, user_id: int, limit: int
+) -> Ranked:
+    """
+    Ранжирует друзей друзей одним запросом с самосоединением followers.
+    """
+    mine = aliased(Follower)
+    theirs = aliased(Follower)
+    already = aliased(Follower)
+
+    sources = (
+        select(mine.following_id)
+        .where(mine.follower_id == user_id)
+        .order_by(mine.following_id)
+        .limit(SUGGESTIONS_MAX_SOURCES)
+        .subquery()
+    )
+    mutual = func.count().label("mutual")
+
+    result = await session.execute(
+        select(theirs.following_id, mutual)
+        .join(sources, theirs.follower_id == sources.c.following_id)
+        .where(
+            theirs.following_id != user_id,
+            ~select(already.following_id)
+            .where(
+                already.follower_id == user_id,
+                already.following_id == theirs.following_id,
+            )
+            .exists(),
+        )
+        .group_by(theirs.following_id)
+        .order_by(mutual.desc(), theirs.following_id)
+        .limit(limit)
+    )
+
+    return [(candidate, count) for candidate, count in result.all()]
+
+
+async def get_suggestions(
+    session: AsyncSession,
+    user_id: int,
+    limit: int = SUGGESTIONS_MAX_LIMIT,
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает рекомендации «кого читать» для пользователя.
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID пользователя
+        limit: Количество рекомендаций (не более SUGGESTIONS_MAX_LIMIT)
+
+    Returns:
+        Список словарей с ключами id, name, mutual_count
+
+    Example:
+        >>> await get_suggestions(session, 1, limit=1)
+        [{"id": 7, "name": "Carol", "mutual_count": 3}]
+    """
+    cached: Optional[List[Dict[str, Any]]] = await cache.get(
+        suggestions_key(user_id)
+    )
+
+    if cached is not None:
+        return cached[:limit]
+
+    started = time.perf_counter()
+    partial = False
+
+    if follow_graph is not None and follow_graph.ready:
+        ranked, partial = rank_friends_of_friends(follow_graph, user_id)
+    else:
+        ranked = await _rank_with_sql(session, user_id, SUGGESTIONS_MAX_LIMIT)
+
+    names: Dict[int, str] = {}
+
+    if ranked:
+        result = await session.execute(
+            select(User.id, User.name).where(
+                User.id.in_([candidate for candidate, _ in ranked])
+            )
+        )
+        names = {uid: name for uid, name in result.all()}
+
+    suggestions = [
+        {"id": candidate, "name": names[candidate], "mutual_count": count}
+        for candidate, count in ranked
+        if candidate in names
+    ]
+
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.debug(
+        f"Suggestions for user {user_id}: {len(suggestions)} in "
+        f"{elapsed:.1f} ms, partial={partial}"
+    )
+
+    # Неполный результат (упёрся в бюджет времени) живёт в кэше меньше
+    ttl = SUGGESTIONS_CACHE_TTL / 10 if partial else SUGGESTIONS_CACHE_TTL
+    await cache.set(suggestions_key(user_id), suggestions, ttl=ttl)
+
+    return suggestions[:limit]
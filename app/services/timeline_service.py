@@ -0,0 +1,371 @@
+"""
+Сервис материализованных лент (fan-out on write).
+
+Лента каждого пользователя хранится в таблице timeline_entries и
+поддерживается на запись: при создании твита он раскладывается по лентам
+подписчиков автора, поэтому чтение ленты не пересчитывает граф подписок.
+
+Лента ранжируется только по TIMELINE_MAX_ENTRIES последним записям (см.
+feed_query.build_page_query), поэтому более старые записи не нужны:
+подписка и пересборка добавляют не больше этого числа твитов, а ленты,
+выросшие от fan-out, обрезает периодическая команда
+app.commands.trim_timelines (`trim_oversized_timelines`). Запись твита и
+лайка при этом не платит за обрезку чужих лент.
+
+Функции, меняющие записи ленты в рамках бизнес-операций, не делают commit —
+это остаётся на вызывающем сервисе, чтобы лента менялась в той же
+транзакции, что и исходные данные.
+"""
+
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Column, delete, func, insert, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import TIMELINE_MAX_ENTRIES
+from app.core.logging import get_logger
+from app.db.models import Follower, TimelineEntry, Tweet, User
+from app.services.feed_cache import invalidate_feeds
+
+logger = get_logger("timeline_service")
+
+
+async def fan_out_tweet(
+    session: AsyncSession,
+    tweet_id: Column[int] | int,
+    author_id: Column[int] | int,
+) -> List[int]:
+    """
+    Добавляет твит в ленты всех подписчиков автора.
+
+    Args:
+        session: Асинхронная сессия БД
+        tweet_id: ID нового твита
+        author_id: ID автора твита
+
+    Returns:
+        ID пользователей, в ленты которых добавлен твит
+
+    Example:
+        >>> await fan_out_tweet(session, 7, 1)
+        [2, 5]
+    """
+    logger.debug(f"Fanning out tweet {tweet_id} of user {author_id}")
+
+    result = await session.execute(
+        insert(TimelineEntry)
+        .from_select(
+            ["user_id", "tweet_id"],
+            select(Follower.follower_id, literal(tweet_id)).where(
+                Follower.following_id == author_id
+            ),
+        )
+        .returning(TimelineEntry.user_id)
+    )
+
+    return list(result.scalars().all())
+
+
+async def remove_tweet_from_timelines(
+    session: AsyncSession, tweet_id: Column[int] | int
+) -> List[int]:
+    """
+    Удаляет твит из всех лент.
+
+    Args:
+        session: Асинхронная сессия БД
+        tweet_id: ID удаляемого твита
+
+    Returns:
+        ID пользователей, из лент которых удалён твит
+
+    Example:
+        >>> await remove_tweet_from_timelines(session, 7)
+        [2, 5]
+    """
+    logger.debug(f"Removing tweet {tweet_id} from timelines")
+
+    result = await session.execute(
+        delete(TimelineEntry)
+        .where(TimelineEntry.tweet_id == tweet_id)
+        .returning(TimelineEntry.user_id)
+    )
+
+    return list(result.scalars().all())
+
+
+async def add_author_to_timeline(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    author_id: Column[int] | int,
+) -> None:
+    """
+    Добавляет в ленту пользователя последние твиты автора (при подписке).
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID владельца ленты
+        author_id: ID автора, на которого подписались
+
+    Example:
+        >>> await add_author_to_timeline(session, 1, 2)
+    """
+    await add_authors_to_timeline(
+        session=session, user_id=user_id, author_ids=[author_id]
+    )
+
+
+async def add_authors_to_timeline(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    author_ids: Sequence[Column[int] | int],
+) -> None:
+    """
+    Добавляет в ленту пользователя твиты нескольких авторов одним
+    запросом (при массовой подписке).
+
+    Добавляются не больше TIMELINE_MAX_ENTRIES последних твитов авторов,
+    затем лента обрезается до того же размера.
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID владельца ленты
+        author_ids: ID авторов, на которых подписались
+
+    Example:
+        >>> await add_authors_to_timeline(session, 1, [2, 3])
+    """
+    if not author_ids:
+        return
+
+    logger.debug(
+        f"Adding tweets of {len(author_ids)} users to timeline {user_id}"
+    )
+
+    await session.execute(
+        insert(TimelineEntry).from_select(
+            ["user_id", "tweet_id"],
+            select(literal(user_id), Tweet.id)
+            .where(Tweet.author_id.in_(author_ids))
+            .order_by(Tweet.id.desc())
+            .limit(TIMELINE_MAX_ENTRIES),
+        )
+    )
+    await trim_timelines(session=session, user_ids=[user_id])
+
+
+async def remove_author_from_timeline(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    author_id: Column[int] | int,
+) -> None:
+    """
+    Удаляет из ленты пользователя все твиты автора (при отписке).
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID владельца ленты
+        author_id: ID автора, от которого отписались
+
+    Example:
+        >>> await remove_author_from_timeline(session, 1, 2)
+    """
+    await remove_authors_from_timeline(
+        session=session, user_id=user_id, author_ids=[author_id]
+    )
+
+
+async def remove_authors_from_timeline(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    author_ids: Sequence[Column[int] | int],
+) -> None:
+    """
+    Удаляет из ленты пользователя все твиты нескольких авторов одним
+    запросом (при массовой отписке).
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID владельца ленты
+        author_ids: ID авторов, от которых отписались
+
+    Example:
+        >>> await remove_authors_from_timeline(session, 1, [2, 3])
+    """
+    if not author_ids:
+        return
+
+    logger.debug(
+        f"Removing tweets of {len(author_ids)} users from timeline {user_id}"
+    )
+
+    await session.execute(
+        delete(TimelineEntry).where(
+            TimelineEntry.user_id == user_id,
+            TimelineEntry.tweet_id.in_(
+                select(Tweet.id).where(Tweet.author_id.in_(author_ids))
+            ),
+        )
+    )
+
+
+async def trim_timelines(
+    session: AsyncSession, user_ids: Sequence[Column[int] | int]
+) -> int:
+    """
+    Обрезает ленты до TIMELINE_MAX_ENTRIES последних твитов.
+
+    Args:
+        session: Асинхронная сессия БД
+        user_ids: ID владельцев лент
+
+    Returns:
+        Количество удалённых записей
+
+    Example:
+        >>> await trim_timelines(session, [1])
+        3
+    """
+    ranked = (
+        select(
+            TimelineEntry.user_id,
+            TimelineEntry.tweet_id,
+            func.row_number()
+            .over(
+                partition_by=TimelineEntry.user_id,
+                order_by=TimelineEntry.tweet_id.desc(),
+            )
+            .label("position"),
+        )
+        .where(TimelineEntry.user_id.in_(user_ids))
+        .subquery()
+    )
+    result = await session.execute(
+        delete(TimelineEntry).where(
+            tuple_(TimelineEntry.user_id, TimelineEntry.tweet_id).in_(
+                select(ranked.c.user_id, ranked.c.tweet_id).where(
+                    ranked.c.position > TIMELINE_MAX_ENTRIES
+                )
+            )
+        )
+    )
+    trimmed = result.rowcount  # type: ignore[attr-defined]
+
+    if trimmed:
+        logger.debug(f"Trimmed {trimmed} timeline entries")
+
+    return trimmed
+
+
+async def trim_oversized_timelines(
+    session: AsyncSession, batch_size: int = 500
+) -> int:
+    """
+    Обрезает все ленты, выросшие больше TIMELINE_MAX_ENTRIES записей.
+
+    Периодическая задача (см. app.commands.trim_timelines): ленты
+    обрезаются пачками по batch_size пользователей, каждая пачка — в своей
+    короткой транзакции. Кэш лент не сбрасывается: удаляются только записи
+    за пределами последних TIMELINE_MAX_ENTRIES, которые лента не читает.
+
+    Args:
+        session: Асинхронная сессия БД
+        batch_size: Количество лент в одной транзакции
+
+    Returns:
+        Количество удалённых записей
+
+    Example:
+        >>> await trim_oversized_timelines(session)
+        120
+    """
+    result = await session.execute(
+        select(TimelineEntry.user_id)
+        .group_by(TimelineEntry.user_id)
+        .having(func.count() > TIMELINE_MAX_ENTRIES)
+        .order_by(TimelineEntry.user_id)
+    )
+    user_ids = list(result.scalars().all())
+    logger.info(f"Trimming {len(user_ids)} oversized timelines")
+
+    trimmed = 0
+
+    while user_ids:
+        batch, user_ids = user_ids[:batch_size], user_ids[batch_size:]
+
+        try:
+            trimmed += await trim_timelines(session=session, user_ids=batch)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.exception(f"Failed to trim timelines: {e}")
+            raise
+
+    logger.info(f"Timelines trimmed: {trimmed} entries removed")
+
+    return trimmed
+
+
+async def rebuild_timelines(
+    session: AsyncSession, user_id: Optional[int] = None
+) -> int:
+    """
+    Пересобирает материализованные ленты из таблиц followers и tweets.
+
+    Используется для первичного заполнения и восстановления после сбоев.
+    В каждую ленту попадают не больше TIMELINE_MAX_ENTRIES последних
+    твитов.
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID пользователя; если не указан — пересобираются все ленты
+
+    Returns:
+        Количество записей в пересобранных лентах
+
+    Example:
+        >>> await rebuild_timelines(session, user_id=1)
+        42
+    """
+    target = f"user {user_id}" if user_id is not None else "all users"
+    logger.info(f"Rebuilding timelines for {target}")
+
+    clear = delete(TimelineEntry)
+    source = select(
+        Follower.follower_id,
+        Tweet.id,
+        func.row_number()
+        .over(partition_by=Follower.follower_id, order_by=Tweet.id.desc())
+        .label("position"),
+    ).join(Tweet, Tweet.author_id == Follower.following_id)
+
+    if user_id is not None:
+        clear = clear.where(TimelineEntry.user_id == user_id)
+        source = source.where(Follower.follower_id == user_id)
+
+    ranked = source.subquery()
+    newest = select(ranked.c.follower_id, ranked.c.id).where(
+        ranked.c.position <= TIMELINE_MAX_ENTRIES
+    )
+
+    try:
+        await session.execute(clear)
+        result = await session.execute(
+            insert(TimelineEntry).from_select(["user_id", "tweet_id"], newest)
+        )
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Failed to rebuild timelines for {target}: {e}")
+        raise
+
+    if user_id is not None:
+        await invalidate_feeds([user_id])
+    else:
+        user_ids = await session.execute(select(User.id))
+        await invalidate_feeds(user_ids.scalars().all())
+
+    count = result.rowcount  # type: ignore[attr-defined]
+    logger.info(f"Timelines rebuilt for {target}: {count} entries")
+
+    return count
@@ -2,21 +2,50 @@
 Сервис для работы с твитами: создание, удаление, получение ленты.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
 
-from sqlalchemy import Column, func, select
+from sqlalchemy import Column, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.config import (
+    FEED_DEFAULT_LIMIT,
+    FEED_ENGINE,
+    FEED_LIKERS_SAMPLE,
+    FEED_SNAPSHOT_PAGES,
+)
 from app.core.logging import get_logger
-from app.db.models import Follower, Like, Media, Tweet
+from app.db.models import Like, Media, TimelineEntry, Tweet
 from app.schemas import CreateTweetRequest
+from app.services.feed_cache import (
+    FeedKey,
+    cache_feed,
+    get_cached_feed,
+    invalidate_feeds,
+    load_feed_snapshot,
+    save_feed_snapshot,
+)
+from app.services.feed_query import build_page_query, fetch_feed_rows
+from app.services.like_service import (
+    get_liked_tweet_ids,
+    get_likers_sample,
+)
+from app.services.media_service import purge_media, release_media
+from app.services.timeline_service import (
+    fan_out_tweet,
+    remove_tweet_from_timelines,
+)
+from app.utils.pagination import decode_cursor, encode_cursor
 
 logger = get_logger("tweet_service")
 
+LikesMode = Literal["full", "summary"]
+
 
 async def create_tweet(
-    session: AsyncSession, request: CreateTweetRequest, author_id: Column[int]
+    session: AsyncSession,
+    request: CreateTweetRequest,
+    author_id: Column[int] | int,
 ) -> Optional[Column[int]]:
     """
     Создаёт новый твит с текстом и прикреплёнными медиа.
@@ -66,7 +95,11 @@ async def create_tweet(
         session.add_all(media_objs)
 
     try:
+        audience = await fan_out_tweet(
+            session=session, tweet_id=tweet.id, author_id=author_id
+        )
         await session.commit()
+        await invalidate_feeds(audience)
         logger.info(
             f"Tweet created successfully: id={tweet.id}, user={author_id}"
         )
@@ -78,7 +111,7 @@ async def create_tweet(
 
 
 async def delete_tweet(
-    session: AsyncSession, tweet_id: int, current_user_id: Column[int]
+    session: AsyncSession, tweet_id: int, current_user_id: Column[int] | int
 ) -> bool:
     """
     Удаляет твит, если он принадлежит указанному пользователю.
@@ -114,9 +147,15 @@ async def delete_tweet(
 
         return False
 
-    await session.delete(tweet)
     try:
+        audience = await remove_tweet_from_timelines(
+            session=session, tweet_id=tweet_id
+        )
+        released = await release_media(session=session, tweet_ids=[tweet_id])
+        await session.delete(tweet)
         await session.commit()
+        await invalidate_feeds(audience)
+        await purge_media(session=session, released=released)
         logger.info(f"Tweet {tweet_id} deleted by user {current_user_id}")
 
         return True
@@ -127,57 +166,231 @@ async def delete_tweet(
 
 
 async def get_user_feed(
-    session: AsyncSession, user_id: Column[int]
-) -> List[dict]:
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    limit: int = FEED_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    likes_mode: LikesMode = "full",
+) -> Dict[str, Any]:
     """
-    Возвращает ленту твитов для пользователя, отсортированную по популярности.
+    Возвращает страницу ленты твитов, отсортированную по популярности.
 
     Лента включает твиты от пользователей, на которых подписан текущий
-    пользователь.
+    пользователь, и читается из материализованной таблицы timeline_entries,
+    которая заполняется при записи (см. timeline_service).
+
+    Пагинация по снимку: первая страница читает ключи (like_count,
+    tweet_id) первых FEED_SNAPSHOT_PAGES страниц одним запросом и
+    сохраняет их снимком в общем кэше на FEED_SNAPSHOT_TTL секунд (один
+    снимок на пользователя). Курсор кодирует версию снимка, смещение и ключ
+    последнего элемента. Лайки меняют like_count, поэтому ключ сортировки
+    изменчив: листание по снимку не пропускает и не повторяет твиты, даже
+    если их популярность изменилась между запросами. Страница может
+    оказаться короче `limit`, если твиты снимка удалены или автор отписан.
+
+    Когда снимок закончился, истёк, перезаписан первой страницей из другой
+    сессии или не найден (кэш в памяти другого воркера), листание
+    продолжается обычным keyset-курсором (версия 0) по ключу последнего
+    элемента. Здесь твит, набравший или потерявший лайки между запросами,
+    может быть пропущен или показан повторно.
+
+    Первая страница кэшируется в общем кэше (см. feed_cache) и
+    инвалидируется сервисами твитов, лайков и подписок.
+
+    По умолчанию (FEED_ENGINE=json) страница строится одним запросом с
+    агрегацией JSON в СУБД (см. feed_query); FEED_ENGINE=orm включает
+    прежнюю загрузку через ORM с selectinload.
+
+    Режим `likes_mode="full"` возвращает всех лайкнувших каждого твита.
+    Режим `summary` возвращает счётчик like_count, флаг liked_by_me и
+    первых FEED_LIKERS_SAMPLE лайкнувших, поэтому объём выборки не зависит
+    от популярности твитов; полный список доступен через `get_tweet_likers`.
 
     Args:
         session: Асинхронная сессия БД
         user_id: ID пользователя, для которого формируется лента
+        limit: Максимальное количество твитов на странице
+        cursor: Курсор, полученный в `next_cursor` предыдущей страницы
+        likes_mode: Режим отображения лайков: `full` или `summary`
 
     Returns:
-        Список твитов в формате, готовом к JSON-сериализации
+        Словарь с ключами `tweets` (список твитов в формате, готовом к
+        JSON-сериализации) и `next_cursor` (None на последней странице)
+
+    Raises:
+        ValueError: Если курсор повреждён
 
     Example:
-        >>> feed = await get_user_feed(session, 1)
-        >>> len(feed)
-        3
+        >>> page = await get_user_feed(session, 1, limit=2)
+        >>> len(page["tweets"]), page["next_cursor"]
+        (2, 'WzEyMywyLDMsNDJd')
     """
     logger.info(f"Loading feed for user {user_id}")
 
-    following_subquery = select(Follower.following_id).where(
-        Follower.follower_id == user_id
-    )
+    resume = decode_cursor(cursor, 4) if cursor else None
 
-    try:
-        result = await session.execute(
-            select(Tweet)
-            .outerjoin(Like)
-            .options(
-                selectinload(Tweet.author),  # type: ignore
-                selectinload(Tweet.media),
-                selectinload(Tweet.likes).selectinload(
-                    Like.user  # type: ignore
-                ),
-            )
-            .where(Tweet.author_id.in_(following_subquery))
-            .order_by(func.count(Like.tweet_id).desc())
-            .group_by(Tweet.id)
+    if resume is not None and resume[1] < 0:
+        raise ValueError("Invalid cursor.")
+
+    if resume is None:
+        cached, generation = await get_cached_feed(
+            user_id=user_id, limit=limit, likes_mode=likes_mode
         )
 
-        tweets = result.scalars().all()
-        logger.debug(f"Loaded {len(tweets)} tweets for user {user_id}")
+        if cached is not None:
+            logger.debug(f"Feed cache hit for user {user_id}")
+            return cached
 
-        return [format_tweet_for_response(tweet=tweet) for tweet in tweets]
+    try:
+        keys, next_cursor = await _load_page_keys(
+            session=session, user_id=user_id, limit=limit, resume=resume
+        )
+        tweet_ids = [tweet_id for _, tweet_id in keys]
+
+        if FEED_ENGINE == "orm":
+            tweets = await _load_feed_orm(
+                session=session,
+                user_id=user_id,
+                tweet_ids=tweet_ids,
+                likes_mode=likes_mode,
+            )
+        else:
+            summary = likes_mode == "summary"
+            tweets = await fetch_feed_rows(
+                session=session,
+                user_id=user_id,
+                tweet_ids=tweet_ids,
+                likers_limit=FEED_LIKERS_SAMPLE if summary else None,
+                with_liked_by_me=summary,
+            )
+        logger.debug(f"Loaded {len(tweets)} tweets for user {user_id}")
 
     except Exception as e:
         logger.exception(f"Failed to load feed for user {user_id}: {e}")
 
-        return []
+        return {"tweets": [], "next_cursor": None}
+
+    page = {"tweets": tweets, "next_cursor": next_cursor}
+
+    if resume is None:
+        await cache_feed(
+            user_id=user_id,
+            limit=limit,
+            likes_mode=likes_mode,
+            page=page,
+            generation=generation,
+        )
+
+    return page
+
+
+async def _load_page_keys(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    limit: int,
+    resume: Optional[Sequence[int]],
+) -> Tuple[List[FeedKey], Optional[str]]:
+    """
+    Возвращает ключи сортировки страницы ленты и курсор следующей.
+
+    Первая страница читает ключи первых FEED_SNAPSHOT_PAGES страниц и
+    сохраняет их снимком, если страниц больше одной. Следующие берутся из
+    снимка версии из курсора, а без него — keyset-запросом после ключа
+    из курсора.
+
+    Returns:
+        Пара (ключи (like_count, tweet_id) страницы в порядке ленты, курсор
+        следующей страницы или None)
+    """
+    if resume is not None:
+        version, offset, *after = resume
+
+        if version:
+            snapshot = await load_feed_snapshot(
+                user_id=user_id, version=version
+            )
+
+            if snapshot is not None:
+                keys, more = snapshot
+                return _snapshot_page(keys, more, version, offset, limit)
+
+            logger.debug(f"Feed snapshot of user {user_id} gone, resuming")
+
+        return await _load_keyset_page(
+            session=session, user_id=user_id, limit=limit, after=after
+        )
+
+    size = limit * FEED_SNAPSHOT_PAGES
+    keys = await _query_feed_keys(
+        session=session, user_id=user_id, limit=size + 1
+    )
+
+    if len(keys) <= limit:
+        return keys, None
+
+    keys, more = keys[:size], len(keys) > size
+    version = await save_feed_snapshot(user_id=user_id, keys=keys, more=more)
+
+    return _snapshot_page(keys, more, version, 0, limit)
+
+
+def _snapshot_page(
+    keys: List[FeedKey], more: bool, version: int, offset: int, limit: int
+) -> Tuple[List[FeedKey], Optional[str]]:
+    """
+    Вырезает страницу из снимка порядка ленты.
+
+    После последней страницы снимка курсор переходит на keyset (версия 0),
+    если в ленте есть твиты за пределами снимка.
+    """
+    end = offset + limit
+    page = keys[offset:end]
+
+    if not page:
+        return [], None
+
+    if end < len(keys):
+        return page, encode_cursor(version, end, *page[-1])
+
+    if more:
+        return page, encode_cursor(0, 0, *page[-1])
+
+    return page, None
+
+
+async def _load_keyset_page(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    limit: int,
+    after: Sequence[int],
+) -> Tuple[List[FeedKey], Optional[str]]:
+    """
+    Загружает страницу ленты после ключа сортировки без снимка.
+    """
+    keys = await _query_feed_keys(
+        session=session, user_id=user_id, limit=limit + 1, after=after
+    )
+
+    if len(keys) <= limit:
+        return keys, None
+
+    return keys[:limit], encode_cursor(0, 0, *keys[limit - 1])
+
+
+async def _query_feed_keys(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    limit: int,
+    after: Optional[Sequence[int]] = None,
+) -> List[FeedKey]:
+    """
+    Читает ключи сортировки ленты (см. feed_query.build_page_query).
+    """
+    result = await session.execute(
+        build_page_query(user_id=user_id, limit=limit, after=after)
+    )
+
+    return [(like_count, tweet_id) for tweet_id, like_count in result.all()]
 
 
 def format_tweet_for_response(tweet: Tweet) -> Dict[str, Any]:
@@ -188,7 +401,8 @@ def format_tweet_for_response(tweet: Tweet) -> Dict[str, Any]:
         tweet: Объект Tweet из SQLAlchemy
 
     Returns:
-        Словарь с полями: id, content, attachments, author, likes
+        Словарь с полями: id, content, attachments, attachment_variants
+        (уменьшенные копии вложений {ширина: URL}), author, likes
 
     Example:
         >>> data = format_tweet_for_response(tweet)
@@ -199,6 +413,7 @@ def format_tweet_for_response(tweet: Tweet) -> Dict[str, Any]:
         "id": tweet.id,
         "content": tweet.content,
         "attachments": [media.file_path for media in tweet.media],
+        "attachment_variants": [media.variants or {} for media in tweet.media],
         "author": {
             "id": tweet.author_id,
             "name": tweet.author.name,  # type: ignore
@@ -208,3 +423,116 @@ def format_tweet_for_response(tweet: Tweet) -> Dict[str, Any]:
             for like in tweet.likes
         ],
     }
+
+
+async def _load_feed_orm(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    tweet_ids: Sequence[int],
+    likes_mode: LikesMode,
+) -> List[Dict[str, Any]]:
+    """
+    Загружает страницу ленты через ORM (запасной движок FEED_ENGINE=orm).
+
+    Returns:
+        Твиты в формате ответа в порядке tweet_ids (без твитов, которых уже
+        нет в ленте)
+    """
+    if not tweet_ids:
+        return []
+
+    options = [
+        selectinload(Tweet.author),  # type: ignore
+        selectinload(Tweet.media),
+    ]
+
+    if likes_mode == "full":
+        options.append(
+            selectinload(Tweet.likes).selectinload(Like.user)  # type: ignore
+        )
+
+    query = (
+        select(Tweet)
+        .join(
+            TimelineEntry,
+            (TimelineEntry.tweet_id == Tweet.id)
+            & (TimelineEntry.user_id == user_id),
+        )
+        .options(*options)
+        .where(Tweet.id.in_(tweet_ids))
+    )
+
+    result = await session.execute(query)
+    by_id = {int(tweet.id): tweet for tweet in result.scalars().all()}
+    tweets = [by_id[i] for i in tweet_ids if i in by_id]
+
+    if likes_mode == "summary":
+        return await _format_feed_summary(
+            session=session, user_id=user_id, tweets=tweets
+        )
+
+    return [format_tweet_for_response(tweet=tweet) for tweet in tweets]
+
+
+async def _format_feed_summary(
+    session: AsyncSession, user_id: Column[int] | int, tweets: List[Tweet]
+) -> List[Dict[str, Any]]:
+    """
+    Форматирует страницу ленты в режиме `summary`.
+
+    Догружает двумя запросами выборку лайкнувших и лайки текущего
+    пользователя для всех твитов страницы.
+    """
+    tweet_ids = [int(tweet.id) for tweet in tweets]  # type: ignore[arg-type]
+    likers = await get_likers_sample(
+        session=session, tweet_ids=tweet_ids, per_tweet=FEED_LIKERS_SAMPLE
+    )
+    liked = await get_liked_tweet_ids(
+        session=session, user_id=user_id, tweet_ids=tweet_ids
+    )
+
+    return [
+        format_tweet_summary(
+            tweet=tweet,
+            likers=likers.get(tweet_id, []),
+            liked_by_me=tweet_id in liked,
+        )
+        for tweet, tweet_id in zip(tweets, tweet_ids)
+    ]
+
+
+def format_tweet_summary(
+    tweet: Tweet, likers: List[Dict[str, Any]], liked_by_me: bool
+) -> Dict[str, Any]:
+    """
+    Преобразует ORM-объект твита в компактный словарь для JSON-ответа.
+
+    В отличие от `format_tweet_for_response` не обращается к tweet.likes.
+
+    Args:
+        tweet: Объект Tweet из SQLAlchemy
+        likers: Первые лайкнувшие пользователи
+        liked_by_me: Лайкнул ли твит текущий пользователь
+
+    Returns:
+        Словарь с полями: id, content, attachments, attachment_variants,
+        author, like_count, liked_by_me, likes
+
+    Example:
+        >>> data = format_tweet_summary(tweet, [], False)
+        >>> print(data["like_count"])
+        0
+    """
+    return {
+        "id": tweet.id,
+        "content": tweet.content,
+        "attachments": [media.file_path for media in tweet.media],
+        "attachment_variants": [media.variants or {} for media in tweet.media],
+        "author": {
+            "id": tweet.author_id,
+            "name": tweet.author.name,  # type: ignore
+        },
+        "like_count": tweet.like_count,
+        "liked_by_me": liked_by_me,
+        "likes": likers,
+    }
@@ -1,44 +1,66 @@
 """
-Сервис для получения информации о пользователях.
+Сервис для получения информации о пользователях и их удаления.
 """
 
-from typing import Optional
+from typing import Any, Dict, Literal, Optional
 
-from sqlalchemy import Column, select
+from sqlalchemy import Column, delete, select, true, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
+from app.core.config import LIST_DEFAULT_LIMIT
 from app.core.logging import get_logger
-from app.db.models import Follower, User
+from app.core.security import invalidate_api_keys
+from app.db.models import Follower, Like, Tweet, User
+from app.services.feed_cache import invalidate_feeds
+from app.services.follow_graph import FollowGraph, follow_graph
+from app.services.media_service import purge_media, release_media
+from app.utils.pagination import decode_cursor, encode_cursor
 
 logger = get_logger("user_service")
 
+FollowDirection = Literal["followers", "following"]
+
 
 async def get_user_profile(
-    session: AsyncSession, target_user_id: Column[int] | int
+    session: AsyncSession,
+    target_user_id: Column[int] | int,
+    full: bool = False,
 ) -> Optional[dict]:
     """
     Получает профиль пользователя по его ID.
 
-    Включает списки подписчиков и подписок.
+    По умолчанию включает только количество подписчиков и подписок —
+    денормализованные счётчики пользователя; сами списки доступны
+    постранично через `get_follow_list`. Полные списки загружаются только
+    при full=True — для популярных пользователей это дорого.
 
     Args:
         session: Асинхронная сессия БД
         target_user_id: ID запрашиваемого пользователя
+        full: Включать ли полные списки подписчиков и подписок
 
     Returns:
         Словарь с данными профиля или None, если пользователь не найден
 
     Example:
         >>> profile = await get_user_profile(session, 1)
-        >>> print(profile["name"])
-        "Alice"
+        >>> profile
+        {"id": 1, "name": "Alice", "followers_count": 2,
+         "following_count": 1}
     """
-    logger.info(f"Fetching profile for user {target_user_id}")
+    logger.info(f"Fetching profile for user {target_user_id}, full={full}")
 
-    result = await session.execute(
+    # Счётчики меняются UPDATE-запросами в обход ORM, поэтому объект из
+    # identity map сессии нужно перечитать
+    query = (
         select(User)
-        .options(
+        .where(User.id == target_user_id)
+        .execution_options(populate_existing=True)
+    )
+
+    if full:
+        query = query.options(
             selectinload(User.followers).selectinload(
                 Follower.follower  # type: ignore
             ),
@@ -46,33 +68,375 @@ async def get_user_profile(
                 Follower.following  # type: ignore
             ),
         )
-        .where(User.id == target_user_id)
-    )
 
-    user = result.scalar_one_or_none()
+    user = (await session.execute(query)).scalar_one_or_none()
 
     if user is None:
         logger.warning(f"Profile not found for user {target_user_id}")
         return None
 
-    followers = [
-        {"id": follow.follower.id, "name": follow.follower.name}
-        for follow in user.followers
-    ]
-    following = [
-        {"id": follow.following.id, "name": follow.following.name}
-        for follow in user.following
-    ]
-
-    profile = {
+    profile: Dict[str, Any] = {
         "id": user.id,
         "name": user.name,
-        "followers": followers,
-        "following": following,
+        "followers_count": user.followers_count,
+        "following_count": user.following_count,
     }
 
+    if full:
+        profile["followers"] = [
+            {"id": follow.follower.id, "name": follow.follower.name}
+            for follow in user.followers
+        ]
+        profile["following"] = [
+            {"id": follow.following.id, "name": follow.following.name}
+            for follow in user.following
+        ]
+
     logger.debug(
-        f"Profile retrieved: {len(followers)} followers, \
-        {len(following)} following"
+        f"Profile retrieved: {user.followers_count} followers, "
+        f"{user.following_count} following"
     )
     return profile
+
+
+async def get_follow_list(
+    session: AsyncSession,
+    user_id: int,
+    direction: FollowDirection,
+    limit: int = LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Возвращает страницу подписчиков или подписок пользователя.
+
+    Пагинация keyset по ID пользователя из списка: курсор кодирует ID
+    последнего пользователя на странице. Подписки читаются по первичному
+    ключу followers, подписчики — по индексу (following_id, follower_id).
+    Если загружен индекс графа подписок, ID страницы берутся из него, а из
+    БД читаются только имена по явному списку ID.
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID пользователя, чей список запрашивается
+        direction: `followers` — подписчики, `following` — подписки
+        limit: Максимальное количество пользователей на странице
+        cursor: Курсор, полученный в `next_cursor` предыдущей страницы
+
+    Returns:
+        Словарь с ключами `users` и `next_cursor`;
+        None, если пользователь не найден
+
+    Raises:
+        ValueError: Если курсор повреждён
+
+    Example:
+        >>> page = await get_follow_list(session, 1, "followers", limit=2)
+        >>> page["users"]
+        [{"id": 2, "name": "Bob"}, {"id": 5, "name": "Eve"}]
+    """
+    logger.info(f"Loading {direction} of user {user_id}")
+
+    if follow_graph is not None and follow_graph.ready:
+        return await _follow_list_from_graph(
+            session=session,
+            graph=follow_graph,
+            user_id=user_id,
+            direction=direction,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    if direction == "followers":
+        owner, other = Follower.following_id, Follower.follower_id
+    else:
+        owner, other = Follower.follower_id, Follower.following_id
+
+    query = (
+        select(User.id, User.name)
+        .join(Follower, other == User.id)
+        .where(owner == user_id)
+        .order_by(other)
+        .limit(limit + 1)
+    )
+
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        query = query.where(other > after_id)
+
+    rows = (await session.execute(query)).all()
+
+    if not rows and not cursor and await session.get(User, user_id) is None:
+        logger.warning(f"User {user_id} not found")
+        return None
+
+    next_cursor = None
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0])
+
+    return {
+        "users": [{"id": uid, "name": name} for uid, name in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+async def _follow_list_from_graph(
+    session: AsyncSession,
+    graph: FollowGraph,
+    user_id: int,
+    direction: FollowDirection,
+    limit: int,
+    cursor: Optional[str],
+) -> Optional[Dict[str, Any]]:
+    """
+    Строит страницу подписчиков или подписок по индексу графа подписок.
+    """
+    after = decode_cursor(cursor, 1)[0] if cursor else None
+    ids = (
+        graph.followers(user_id)
+        if direction == "followers"
+        else (graph.following(user_id))
+    )
+    page = graph.page(ids, after=after, limit=limit + 1)
+
+    if not page and not cursor and await session.get(User, user_id) is None:
+        logger.warning(f"User {user_id} not found")
+        return None
+
+    next_cursor = None
+
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1])
+
+    names: Dict[int, str] = {}
+
+    if page:
+        result = await session.execute(
+            select(User.id, User.name).where(User.id.in_(page.tolist()))
+        )
+        names = {uid: name for uid, name in result.all()}
+
+    return {
+        "users": [
+            {"id": uid, "name": names[uid]} for uid in page if uid in names
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+async def get_relationship(
+    session: AsyncSession,
+    user_id: Column[int] | int,
+    other_id: int,
+    limit: int = LIST_DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Возвращает отношения пользователя с другим пользователем.
+
+    Один запрос отвечает на всё сразу: подписки в обе стороны проверяются
+    подзапросами EXISTS по первичному ключу followers, а страница общих
+    подписчиков (подписанных на обоих) строится соединением followers с
+    самой собой по индексу (following_id, follower_id) и присоединяется к
+    строке пользователя через LEFT JOIN.
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID текущего пользователя
+        other_id: ID другого пользователя
+        limit: Размер страницы общих подписчиков
+        cursor: Курсор следующей страницы общих подписчиков
+
+    Returns:
+        Словарь с ключами user_id, you_follow, follows_you,
+        mutual_followers и next_cursor; None, если пользователь не найден
+
+    Raises:
+        ValueError: Если курсор повреждён
+
+    Example:
+        >>> await get_relationship(session, 1, 2, limit=1)
+        {"user_id": 2, "you_follow": True, "follows_you": False,
+         "mutual_followers": [{"id": 5, "name": "Eve"}],
+         "next_cursor": None}
+    """
+    logger.info(f"Loading relationship of user {user_id} with {other_id}")
+
+    mine = aliased(Follower)
+    theirs = aliased(Follower)
+    member = aliased(User)
+
+    you_follow = (
+        select(Follower.follower_id)
+        .where(
+            Follower.follower_id == user_id,
+            Follower.following_id == User.id,
+        )
+        .exists()
+    )
+    follows_you = (
+        select(Follower.follower_id)
+        .where(
+            Follower.follower_id == User.id,
+            Follower.following_id == user_id,
+        )
+        .exists()
+    )
+
+    mutual_query = (
+        select(mine.follower_id.label("id"), member.name.label("name"))
+        .join(theirs, theirs.follower_id == mine.follower_id)
+        .join(member, member.id == mine.follower_id)
+        .where(mine.following_id == user_id, theirs.following_id == other_id)
+        .order_by(mine.follower_id)
+        .limit(limit + 1)
+    )
+
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        mutual_query = mutual_query.where(mine.follower_id > after_id)
+
+    mutual = mutual_query.subquery("mutual")
+
+    result = await session.execute(
+        select(
+            User.id,
+            you_follow.label("you_follow"),
+            follows_you.label("follows_you"),
+            mutual.c.id,
+            mutual.c.name,
+        )
+        .outerjoin(mutual, true())
+        .where(User.id == other_id)
+        .order_by(mutual.c.id)
+    )
+    rows = result.all()
+
+    if not rows:
+        logger.warning(f"User {other_id} not found")
+        return None
+
+    mutual_followers = [
+        {"id": row[3], "name": row[4]} for row in rows if row[3] is not None
+    ]
+    next_cursor = None
+
+    if len(mutual_followers) > limit:
+        mutual_followers = mutual_followers[:limit]
+        next_cursor = encode_cursor(mutual_followers[-1]["id"])
+
+    return {
+        "user_id": other_id,
+        "you_follow": bool(rows[0][1]),
+        "follows_you": bool(rows[0][2]),
+        "mutual_followers": mutual_followers,
+        "next_cursor": next_cursor,
+    }
+
+
+async def delete_user(session: AsyncSession, user_id: int) -> bool:
+    """
+    Удаляет пользователя вместе с его твитами, лайками и подписками.
+
+    Твиты, медиа и записи лент удаляются каскадом внешних ключей. Подписки
+    и лайки удаляются явно, чтобы в той же транзакции уменьшить
+    денормализованные счётчики у затронутых пользователей и твитов:
+    каскад на уровне БД их бы не обновил. По той же причине до удаления
+    освобождаются ссылки на файлы медиа твитов пользователя; сами файлы
+    удаляются только после commit.
+
+    Args:
+        session: Асинхронная сессия БД
+        user_id: ID удаляемого пользователя
+
+    Returns:
+        True, если пользователь удалён; False, если он не найден
+
+    Raises:
+        SQLAlchemyError: При ошибке БД (транзакция откатывается)
+
+    Example:
+        >>> await delete_user(session, 3)
+        True
+    """
+    logger.info(f"Deleting user {user_id}")
+
+    user = await session.get(User, user_id)
+
+    if user is None:
+        logger.warning(f"User {user_id} not found")
+        return False
+
+    api_key = str(user.api_key)
+
+    try:
+        result = await session.execute(
+            delete(Follower)
+            .where(Follower.follower_id == user_id)
+            .returning(Follower.following_id)
+        )
+        followed = list(result.scalars().all())
+
+        result = await session.execute(
+            delete(Follower)
+            .where(Follower.following_id == user_id)
+            .returning(Follower.follower_id)
+        )
+        followers = list(result.scalars().all())
+
+        result = await session.execute(
+            delete(Like)
+            .where(Like.user_id == user_id)
+            .returning(Like.tweet_id)
+        )
+        liked = list(result.scalars().all())
+
+        if followed:
+            await session.execute(
+                update(User)
+                .where(User.id.in_(followed))
+                .values(followers_count=User.followers_count - 1)
+            )
+        if followers:
+            await session.execute(
+                update(User)
+                .where(User.id.in_(followers))
+                .values(following_count=User.following_count - 1)
+            )
+        if liked:
+            await session.execute(
+                update(Tweet)
+                .where(Tweet.id.in_(liked), Tweet.author_id != user_id)
+                .values(like_count=Tweet.like_count - 1)
+            )
+
+        result = await session.execute(
+            select(Tweet.id).where(Tweet.author_id == user_id)
+        )
+        released = await release_media(
+            session=session, tweet_ids=result.scalars().all()
+        )
+
+        await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Failed to delete user {user_id}: {e}")
+        raise
+
+    session.expunge(user)
+
+    if follow_graph is not None:
+        follow_graph.remove_user(user_id)
+
+    await invalidate_api_keys(api_key)
+    await invalidate_feeds(followers)
+    await purge_media(session=session, released=released)
+    logger.info(
+        f"User {user_id} deleted: {len(followers)} followers, "
+        f"{len(followed)} following, {len(liked)} likes"
+    )
+
+    return True
@@ -0,0 +1,23 @@
+"""
+Утилиты для ответов пакетной проверки состояния.
+"""
+
+from typing import Container, Iterable
+
+
+def membership_bitset(ids: Iterable[int], members: Container[int]) -> str:
+    """
+    Строит битовую строку принадлежности ID множеству.
+
+    Args:
+        ids: Проверяемые ID в порядке запроса
+        members: ID, для которых условие выполняется
+
+    Returns:
+        Строка из `0` и `1` той же длины, что и ids
+
+    Example:
+        >>> membership_bitset([5, 6, 7], {5, 7})
+        '101'
+    """
+    return "".join("1" if item in members else "0" for item in ids)
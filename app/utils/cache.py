@@ -0,0 +1,114 @@
+"""
+Ограниченный in-memory кэш с вытеснением LRU и временем жизни записей.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Кэш фиксированного размера с TTL и вытеснением давно неиспользуемых
+    записей (LRU).
+
+    Не потокобезопасен: рассчитан на использование из одного event loop.
+
+    Attributes:
+        maxsize: Максимальное количество записей
+        ttl: Время жизни записи в секундах
+        hits: Количество попаданий
+        misses: Количество промахов (включая просроченные записи)
+        evictions: Количество записей, вытесненных по размеру
+
+    Example:
+        >>> cache = TTLCache(maxsize=2, ttl=30)
+        >>> cache.set("a", 1)
+        >>> cache.get("a")
+        1
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Возвращает значение по ключу и отмечает его как недавно
+        использованное.
+
+        Args:
+            key: Ключ записи
+            default: Значение, возвращаемое при промахе
+
+        Returns:
+            Сохранённое значение или default
+        """
+        item = self._data.get(key)
+
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+
+        return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Сохраняет значение, вытесняя самую старую запись при переполнении.
+
+        Args:
+            key: Ключ записи
+            value: Значение
+            ttl: Время жизни в секундах (по умолчанию — ttl кэша)
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        Удаляет запись.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            True, если запись существовала
+        """
+        return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Удаляет все записи (счётчики сохраняются)."""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Возвращает счётчики кэша.
+
+        Returns:
+            Словарь с полями: size, maxsize, hits, misses, evictions
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,40 +1,181 @@
 """
 Утилиты для сохранения загружаемых файлов.
+
+Файл читается из запроса порциями по UPLOAD_CHUNK_SIZE байт и пишется во
+временный файл в папке назначения; запись на диск и подсчёт SHA-256
+выполняются в пуле потоков, чтобы не блокировать event loop. Лимит
+размера (свой для изображений, видео и прочих файлов) проверяется по мере
+чтения, поэтому слишком большой файл отклоняется, не дописываясь до конца.
+
+Файлы хранятся по хэшу содержимого в каталогах-шардах
+(`/media/ab/cd/abcd….jpg`), поэтому одинаковые загрузки занимают в
+хранилище один объект. Временный файл переносится в хранилище
+(`place_upload`, см. app.core.storage) только если такого объекта ещё нет;
+у локального хранилища это атомарное переименование, и недописанные файлы
+никогда не видны под URL из /media. Учёт ссылок на файлы ведёт
+media_service.
 """
 
+import asyncio
+import hashlib
 import os
-import uuid
-from typing import Optional
+import re
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Optional
 
 from fastapi import UploadFile
 
+from app.core.config import (
+    MEDIA_MAX_IMAGE_BYTES,
+    MEDIA_MAX_OTHER_BYTES,
+    MEDIA_MAX_VIDEO_BYTES,
+    UPLOAD_CHUNK_SIZE,
+)
 from app.core.logging import get_logger
+from app.core.storage import storage
 
 logger = get_logger("file_storage")
 
+# Допустимые расширения и их категория (для лимита размера)
+MEDIA_CATEGORIES: Dict[str, str] = {
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".png": "image",
+    ".gif": "image",
+    ".webp": "image",
+    ".mp4": "video",
+    ".mov": "video",
+    ".bin": "other",
+}
+
+MEDIA_MAX_BYTES: Dict[str, int] = {
+    "image": MEDIA_MAX_IMAGE_BYTES,
+    "video": MEDIA_MAX_VIDEO_BYTES,
+    "other": MEDIA_MAX_OTHER_BYTES,
+}
+
+# Префикс и суффикс временных файлов в папке назначения
+TEMP_PREFIX = ".upload-"
+TEMP_SUFFIX = ".part"
+
+# Префикс URL медиафайлов; путь после него — ключ объекта в хранилище
+MEDIA_URL_PREFIX = "/media/"
+
+# Путь файла, адресуемого по содержимому: ab/cd/abcd…[.w320].ext
+CONTENT_ADDRESSED_PATH = re.compile(
+    r"([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}(\.w\d+)?\.\w+"
+)
+
+
+class UploadTooLargeError(ValueError):
+    """Файл превышает лимит размера для своей категории."""
+
+
+class StagedUpload:
+    """
+    Загруженный файл во временном файле, ещё не перенесённый на место.
+
+    Attributes:
+        temp_path: Путь к временному файлу
+        content_hash: SHA-256 содержимого (hex)
+        size: Размер в байтах
+        ext: Расширение исходного файла (с точкой)
+        dest_folder: Папка временных файлов (staging_dir хранилища)
+    """
+
+    def __init__(
+        self,
+        temp_path: str,
+        content_hash: str,
+        size: int,
+        ext: str,
+        dest_folder: str,
+    ) -> None:
+        self.temp_path = temp_path
+        self.content_hash = content_hash
+        self.size = size
+        self.ext = ext
+        self.dest_folder = dest_folder
+
+    @property
+    def url(self) -> str:
+        """Адресуемый по содержимому URL файла."""
+        return content_url(self.content_hash, self.ext)
+
+
+class UploadStats:
+    """
+    Счётчики сохранённых загрузок для /api/metrics.
+
+    Attributes:
+        uploads: Количество сохранённых файлов
+        rejected: Количество файлов, отклонённых по размеру
+        bytes_written: Сколько байт записано на диск
+        seconds: Суммарное время сохранения
+    """
+
+    def __init__(self) -> None:
+        self.uploads = 0
+        self.rejected = 0
+        self.bytes_written = 0
+        self.seconds = 0.0
+
+    def record(self, size: int, seconds: float) -> None:
+        """Учитывает сохранённый файл."""
+        self.uploads += 1
+        self.bytes_written += size
+        self.seconds += seconds
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Возвращает счётчики и среднюю пропускную способность.
+
+        Returns:
+            Словарь с полями: uploads, rejected, bytes_written, seconds,
+            throughput_mib_s
+        """
+        throughput = (
+            self.bytes_written / 2**20 / self.seconds if self.seconds else 0.0
+        )
+
+        return {
+            "uploads": self.uploads,
+            "rejected": self.rejected,
+            "bytes_written": self.bytes_written,
+            "seconds": round(self.seconds, 3),
+            "throughput_mib_s": round(throughput, 1),
+        }
+
+
+upload_stats = UploadStats()
+
 
 async def save_upload_file(
     upload_file: UploadFile, dest_folder: str
-) -> Optional[str]:
+) -> Optional[StagedUpload]:
     """
-    Сохраняет загруженный файл на диск и возвращает относительный путь.
+    Сохраняет загруженный файл во временный файл и считает его хэш.
 
-    Генерирует уникальное имя файла, чтобы избежать коллизий.
+    Файл копируется порциями и не читается в память целиком. На место по
+    хэшу содержимого его переносит `place_upload`, а если загрузка не
+    понадобилась — удаляет `discard_upload`.
 
     Args:
         upload_file: Загруженный файл
-        dest_folder: Папка для сохранения (например, "app/media")
+        dest_folder: Папка временных файлов (`storage.staging_dir`)
 
     Returns:
-        Относительный URL к файлу (например, `/media/abc.jpg`)
+        Временный файл с хэшем и размером содержимого
 
     Raises:
         ValueError: Если расширение файла недопустимо
+        UploadTooLargeError: Если файл больше лимита для его типа
 
     Example:
-        >>> path = await save_upload_file(file, "app/media")
-        >>> print(path)
-        /media/abc.jpg
+        >>> upload = await save_upload_file(file, storage.staging_dir)
+        >>> print(upload.url)
+        /media/9f/86/9f86d08188….jpg
     """
     original_filename = (
         upload_file.filename if upload_file.filename else "unknown"
@@ -47,46 +188,199 @@ async def save_upload_file(
         else ".bin"
     )
 
-    acceptable_extensions = [
-        ".jpg",
-        ".jpeg",
-        ".png",
-        ".gif",
-        ".webp",
-        ".mp4",
-        ".mov",
-        ".bin",
-    ]
-
-    if ext not in acceptable_extensions:
+    if ext not in MEDIA_CATEGORIES:
         logger.warning(
             f"Rejected file with unsupported extension: {ext} \
             (file: {original_filename})"
         )
         raise ValueError("Unacceptable file format.")
 
+    max_bytes = MEDIA_MAX_BYTES[MEDIA_CATEGORIES[ext]]
+
+    # Размер из заголовков multipart известен не всегда
+    if isinstance(upload_file.size, int):
+        _check_size(upload_file.size, max_bytes, original_filename)
+
     os.makedirs(dest_folder, exist_ok=True)
     logger.debug(f"Ensured directory exists: {dest_folder}")
 
-    file_name = f"{uuid.uuid4().hex}{ext}"
-    file_path = os.path.join(dest_folder, file_name)
+    # У локального хранилища staging_dir — его корень: перенос файла на
+    # место остаётся атомарным переименованием
+    fd, temp_path = tempfile.mkstemp(
+        prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX, dir=dest_folder
+    )
+    digest = hashlib.sha256()
+    started = time.perf_counter()
+    written = 0
 
     try:
-        content = await upload_file.read()
-        logger.debug(f"Read {len(content)} bytes from upload")
-
-        with open(file_path, "wb") as f:
-            f.write(content)
-
-        relative_url = f"/media/{file_name}"
-        logger.info(
-            f"File saved successfully: {original_filename} -> {relative_url}"
-        )
-        return relative_url
-
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await upload_file.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                _check_size(written, max_bytes, original_filename)
+                await asyncio.to_thread(_write_chunk, f, digest, chunk)
+    except UploadTooLargeError:
+        os.unlink(temp_path)
+        raise
     except Exception as e:
+        os.unlink(temp_path)
         logger.exception(
             f"Failed to save uploaded file: {original_filename} \
                           : {e}"
         )
         raise
+
+    elapsed = time.perf_counter() - started
+    upload_stats.record(written, elapsed)
+
+    upload = StagedUpload(
+        temp_path=temp_path,
+        content_hash=digest.hexdigest(),
+        size=written,
+        ext=ext,
+        dest_folder=dest_folder,
+    )
+    throughput = written / 2**20 / elapsed if elapsed else 0.0
+    logger.info(
+        f"File received: {original_filename} -> {upload.url}, "
+        f"{written} bytes in {elapsed:.3f} s ({throughput:.1f} MiB/s)"
+    )
+
+    return upload
+
+
+async def place_upload(
+    upload: StagedUpload, url: str, keep_temp: bool = False
+) -> bool:
+    """
+    Переносит временный файл в хранилище под URL url.
+
+    Если объект с таким содержимым уже есть, временный файл удаляется
+    (или остаётся для вызывающего кода при keep_temp).
+
+    Args:
+        upload: Временный файл из `save_upload_file`
+        url: URL, под которым файл хранится
+        keep_temp: Не удалять временный файл, если объект уже есть
+
+    Returns:
+        True, если файл записан; False, если он уже был в хранилище
+    """
+    key = media_key(url)
+
+    if await storage.exists(key):
+        if not keep_temp:
+            await discard_upload(upload)
+        logger.info(f"Reused stored file {url}")
+        return False
+
+    await storage.put_file(key, upload.temp_path)
+    logger.info(f"File saved successfully: {url}")
+
+    return True
+
+
+async def discard_upload(upload: StagedUpload) -> None:
+    """Удаляет временный файл загрузки, если он ещё существует."""
+    try:
+        await asyncio.to_thread(os.unlink, upload.temp_path)
+    except FileNotFoundError:
+        pass
+
+
+async def delete_media_files(urls: Iterable[str]) -> int:
+    """
+    Удаляет файлы медиа из хранилища по их URL.
+
+    Отсутствующие файлы пропускаются.
+
+    Args:
+        urls: URL файлов (например, `/media/ab/cd/abcd….jpg`)
+
+    Returns:
+        Количество удалённых файлов
+    """
+    deleted = 0
+
+    for url in urls:
+        if await storage.delete(media_key(url)):
+            deleted += 1
+        else:
+            logger.warning(f"Media file {url} is already missing")
+
+    return deleted
+
+
+def content_url(content_hash: str, ext: str) -> str:
+    """
+    Строит URL файла по хэшу содержимого.
+
+    Два уровня каталогов по первым байтам хэша ограничивают число файлов
+    в одном каталоге.
+
+    Example:
+        >>> content_url("9f86d081", ".jpg")
+        '/media/9f/86/9f86d081.jpg'
+    """
+    return (
+        f"{MEDIA_URL_PREFIX}{content_hash[:2]}/{content_hash[2:4]}/"
+        f"{content_hash}{ext}"
+    )
+
+
+def is_content_addressed(url: str) -> bool:
+    """
+    Проверяет, адресуется ли файл по содержимому (не меняется никогда).
+
+    Example:
+        >>> is_content_addressed("/media/ab/cd/abcd….w320.webp")
+        True
+        >>> is_content_addressed("/media/3f2a.jpg")
+        False
+    """
+    relative = url.removeprefix(MEDIA_URL_PREFIX)
+
+    return CONTENT_ADDRESSED_PATH.fullmatch(relative) is not None
+
+
+def media_key(url: str) -> str:
+    """
+    Преобразует URL медиафайла в ключ объекта хранилища.
+
+    Raises:
+        ValueError: Если URL не указывает внутрь /media
+
+    Example:
+        >>> media_key("/media/9f/86/9f86d081.jpg")
+        '9f/86/9f86d081.jpg'
+    """
+    key = url.removeprefix(MEDIA_URL_PREFIX)
+
+    if key == url or not key or ".." in key.split("/"):
+        raise ValueError(f"Not a media URL: {url}")
+
+    return key
+
+
+def _write_chunk(f: Any, digest: Any, chunk: bytes) -> None:
+    """Пишет порцию в файл и добавляет её в хэш (в пуле потоков)."""
+    digest.update(chunk)
+    f.write(chunk)
+
+
+def _check_size(size: int, max_bytes: int, filename: str) -> None:
+    """
+    Проверяет размер файла против лимита его категории.
+
+    Raises:
+        UploadTooLargeError: Если размер больше max_bytes
+    """
+    if size <= max_bytes:
+        return
+
+    upload_stats.rejected += 1
+    logger.warning(
+        f"Rejected file {filename}: more than {max_bytes} bytes allowed"
+    )
+
+    raise UploadTooLargeError(f"File is too large (max {max_bytes} bytes).")
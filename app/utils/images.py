@@ -0,0 +1,86 @@
+"""
+Построение уменьшенных копий изображений в формате WebP.
+
+Функции модуля выполняются в процессах пула media_pipeline и не должны
+вызываться из event loop: декодирование и кодирование изображений —
+долгая работа процессора.
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageOps
+
+# Режимы с прозрачностью: копии сохраняются в RGBA, остальные — в RGB
+ALPHA_MODES = ("RGBA", "LA", "PA")
+
+
+def render_variants(
+    source: str, targets: List[Tuple[int, str]], quality: int
+) -> Dict[int, str]:
+    """
+    Создаёт копии изображения нужной ширины в формате WebP.
+
+    Копии шире оригинала не создаются. Уже существующие файлы копий не
+    перезаписываются: у файлов, адресуемых по содержимому, они одинаковы.
+    JPEG декодируется сразу в уменьшенном масштабе (draft), если это не
+    ухудшит самую широкую копию.
+
+    Args:
+        source: Путь к оригиналу
+        targets: Пары (ширина, путь копии)
+        quality: Качество WebP (0–100)
+
+    Returns:
+        Словарь {ширина: путь копии} для копий, которые есть на диске
+
+    Raises:
+        OSError: Если файл не читается как изображение
+
+    Example:
+        >>> render_variants("a.jpg", [(320, "a.w320.webp")], 80)
+        {320: 'a.w320.webp'}
+    """
+    rendered: Dict[int, str] = {}
+
+    with Image.open(source) as original:
+        needed = [
+            (width, path) for width, path in targets if width < original.width
+        ]
+
+        if not needed:
+            return rendered
+
+        widest = max(width for width, _ in needed)
+        # После поворота по EXIF ширина может стать высотой
+        original.draft("RGB", (widest, widest))
+        image = ImageOps.exif_transpose(original)
+
+        mode = "RGBA" if _has_alpha(image) else "RGB"
+
+        if image.mode != mode:
+            image = image.convert(mode)
+
+        for width, path in sorted(needed, reverse=True):
+            if os.path.exists(path):
+                rendered[width] = path
+                continue
+
+            if width >= image.width:
+                continue
+
+            variant = image.copy()
+            variant.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+
+            # Запись через временный файл: недописанная копия не видна
+            temp_path = f"{path}.part"
+            variant.save(temp_path, "WEBP", quality=quality, method=4)
+            os.replace(temp_path, path)
+            rendered[width] = path
+
+    return rendered
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    """Проверяет, есть ли у изображения прозрачность."""
+    return image.mode in ALPHA_MODES or "transparency" in image.info
@@ -0,0 +1,64 @@
+"""
+Утилиты для keyset-пагинации: кодирование и разбор непрозрачных курсоров.
+"""
+
+import base64
+import binascii
+import json
+from typing import Tuple
+
+
+def encode_cursor(*values: int) -> str:
+    """
+    Кодирует ключ сортировки последнего элемента страницы в курсор.
+
+    Args:
+        values: Значения ключа сортировки (например, число лайков и ID)
+
+    Returns:
+        Непрозрачная строка, безопасная для передачи в URL
+
+    Example:
+        >>> encode_cursor(3, 42)
+        'WzMsNDJd'
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[int, ...]:
+    """
+    Разбирает курсор, созданный `encode_cursor`.
+
+    Args:
+        cursor: Строка курсора из запроса клиента
+        size: Ожидаемое количество значений в ключе сортировки
+
+    Returns:
+        Кортеж целых чисел ключа сортировки
+
+    Raises:
+        ValueError: Если курсор повреждён или имеет неверный формат
+
+    Example:
+        >>> decode_cursor("WzMsNDJd", 2)
+        (3, 42)
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor.")
+
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(
+            isinstance(v, int) and not isinstance(v, bool) for v in values
+        )
+    ):
+        raise ValueError("Invalid cursor.")
+
+    return tuple(values)
@@ -0,0 +1,150 @@
+"""
+Замер загрузки и размера индекса графа подписок.
+
+Заполняет отдельную базу синтетическим графом (степени подписок
+распределены по степенному закону, как в реальных соцсетях), загружает
+FollowGraph и выводит время загрузки, размер индекса, время типичных
+операций и время построения рекомендаций «кого читать».
+
+Запуск:
+    python -m benchmarks.follow_graph
+    python -m benchmarks.follow_graph --users 100000 --edges 1000000
+
+Внимание: таблицы базы из --database-url пересоздаются.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+DEFAULT_URL = "sqlite+aiosqlite:///:memory:"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark follow graph.")
+    parser.add_argument("--database-url", default=DEFAULT_URL)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=1000)
+
+    return parser.parse_args()
+
+
+def generate_edges(users: int, edges: int) -> List[Dict[str, int]]:
+    """
+    Генерирует уникальные подписки; популярность авторов — закон Ципфа.
+    """
+    rng = random.Random(42)
+    weights = [1 / rank for rank in range(1, users + 1)]
+    seen = set()
+
+    while len(seen) < edges:
+        need = edges - len(seen)
+        followers = rng.choices(range(1, users + 1), k=need)
+        authors = rng.choices(range(1, users + 1), weights=weights, k=need)
+        seen.update((f, a) for f, a in zip(followers, authors) if f != a)
+
+    return [
+        {"follower_id": f, "following_id": a} for f, a in sorted(seen)[:edges]
+    ]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from sqlalchemy import insert
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.db.database import Base
+    from app.db.models import Follower, User
+    from app.services.follow_graph import FollowGraph
+    from app.services.suggestion_service import rank_friends_of_friends
+
+    engine = create_async_engine(args.database_url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    rows = generate_edges(args.users, args.edges)
+
+    async with session_maker() as session:
+        await session.execute(
+            insert(User),
+            [
+                {"id": i, "name": f"user_{i}", "api_key": f"key_{i}"}
+                for i in range(1, args.users + 1)
+            ],
+        )
+        for start in range(0, len(rows), 50_000):
+            end = start + 50_000
+            await session.execute(insert(Follower), rows[start:end])
+        await session.commit()
+
+    graph = FollowGraph()
+
+    async with session_maker() as session:
+        started = time.perf_counter()
+        await graph.load(session, batch_size=args.batch_size)
+        load_seconds = time.perf_counter() - started
+
+    rng = random.Random(7)
+    timings = []
+
+    for _ in range(args.repeat):
+        a, b = rng.randint(1, args.users), rng.randint(1, args.users)
+        started = time.perf_counter()
+
+        # Подписка и отписка, не меняющие граф в итоге
+        if not graph.is_following(a, b):
+            graph.add(a, b)
+            graph.remove(a, b)
+
+        timings.append((time.perf_counter() - started) * 1e6)
+
+    suggestions = []
+    partial = 0
+
+    for _ in range(args.repeat):
+        user_id = rng.randint(1, args.users)
+        started = time.perf_counter()
+        _, cut = rank_friends_of_friends(graph, user_id)
+        suggestions.append((time.perf_counter() - started) * 1000)
+        partial += cut
+
+    await engine.dispose()
+
+    return {
+        **graph.stats(),
+        "load_seconds": load_seconds,
+        "op_median_us": statistics.median(timings),
+        "suggest_median_ms": statistics.median(suggestions),
+        "suggest_p95_ms": statistics.quantiles(suggestions, n=20)[-1],
+        "suggest_partial": partial,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault("DATABASE_URL", args.database_url)
+
+    result = asyncio.run(run(args))
+
+    print(f"users:          {result['users']}")
+    print(f"edges:          {result['edges']}")
+    print(f"memory:         {result['bytes'] / 2**20:.1f} MiB")
+    print(f"load:           {result['load_seconds']:.2f} s")
+    print(f"check+add+rm:   {result['op_median_us']:.1f} us (median)")
+    print(
+        f"suggestions:    {result['suggest_median_ms']:.2f} ms median, "
+        f"{result['suggest_p95_ms']:.2f} ms p95, "
+        f"{result['suggest_partial']} cut by time budget"
+    )
+
+
+if __name__ == "__main__":
+    main()
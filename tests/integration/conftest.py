@@ -7,6 +7,8 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
+from app.core.cache import InMemoryCacheBackend, cache
+from app.core.security import negative_auth_cache
 from app.db.database import Base, get_db_session
 from app.db.models import Follower, Like, Media, Tweet, User
 from app.main import app
@@ -17,6 +19,17 @@ def anyio_backend():
     return "asyncio"
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    if isinstance(cache, InMemoryCacheBackend):
+        cache.store.clear()
+    negative_auth_cache.clear()
+    yield
+    if isinstance(cache, InMemoryCacheBackend):
+        cache.store.clear()
+    negative_auth_cache.clear()
+
+
 @pytest.fixture(scope="session", autouse=True)
 async def setup_db():
     engine = create_async_engine(
@@ -1,7 +1,8 @@
 import pytest
+from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import create_async_engine
 
-from app.main import startup_event
+from app.main import shutdown_event, startup_event
 
 
 @pytest.mark.anyio
@@ -16,3 +17,38 @@ async def test_startup_event(mocker, caplog):
         await startup_event()
         assert "Starting up application..." in caplog.text
         assert "Database connection established." in caplog.text
+
+
+@pytest.mark.anyio
+async def test_get_metrics(client, test_user_1):
+    response = await client.get(
+        "/api/metrics", headers={"api-key": str(test_user_1.api_key)}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["result"] is True
+    assert {"backend", "hits", "misses", "errors"} <= set(
+        data["data"]["cache"]
+    )
+    assert {"sessions", "used", "unused"} == set(data["data"]["db"])
+
+
+@pytest.mark.anyio
+async def test_shutdown_event(caplog):
+    with caplog.at_level("INFO"):
+        await shutdown_event()
+        assert "Shutting down application..." in caplog.text
+
+
+@pytest.mark.anyio
+async def test_openapi_documents_typed_responses(client: AsyncClient):
+    response = await client.get("/openapi.json")
+    schemas = response.json()["components"]["schemas"]
+
+    assert (
+        "TweetOut"
+        in schemas["FeedPage"]["properties"]["tweets"]["items"]["$ref"]
+    )
+    assert set(schemas["LikeOut"]["properties"]) == {"user_id", "name"}
+    assert "UserProfileData" in str(schemas["UserProfileApiResponse"])
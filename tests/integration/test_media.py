@@ -100,3 +100,18 @@ async def test_post_medias_exception_empty_media(
     assert data["result"] is False
     assert data["error_type"] == "FileUploadError"
     assert "File path is empty" in data["error_message"]
+
+
+@pytest.mark.anyio
+async def test_upload_media_too_large(mocker, client, test_user_1):
+    mocker.patch.dict("app.utils.file_storage.MEDIA_MAX_BYTES", {"image": 4})
+
+    response = await client.post(
+        "/api/medias",
+        headers={"api-key": test_user_1.api_key},
+        files={"file": ("big.png", b"fake image content", "image/png")},
+    )
+
+    data = response.json()
+    assert data["result"] is False
+    assert data["error_type"] == "FileTooLarge"
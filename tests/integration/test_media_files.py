@@ -0,0 +1,160 @@
+import hashlib
+import warnings
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.storage import LocalStorageBackend, S3StorageBackend
+from app.main import app
+
+CONTENT = b"0123456789" * 10
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+CONTENT_PATH = f"{DIGEST[:2]}/{DIGEST[2:4]}/{DIGEST}.mp4"
+
+
+@pytest.fixture
+def media_root(mocker, tmp_path):
+    mocker.patch(
+        "app.api.v1.media_files.storage", LocalStorageBackend(str(tmp_path))
+    )
+
+    shard = tmp_path / DIGEST[:2] / DIGEST[2:4]
+    shard.mkdir(parents=True)
+    (shard / f"{DIGEST}.mp4").write_bytes(CONTENT)
+    (tmp_path / "legacy.jpg").write_bytes(CONTENT)
+
+    return tmp_path
+
+
+@pytest.mark.anyio
+async def test_get_content_addressed_file(client: AsyncClient, media_root):
+    response = await client.get(f"/media/{CONTENT_PATH}")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{DIGEST}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["content-type"] == "video/mp4"
+
+
+@pytest.mark.anyio
+async def test_head_media_file(client: AsyncClient, media_root):
+    response = await client.head(f"/media/{CONTENT_PATH}")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == str(len(CONTENT))
+    assert response.headers["etag"] == f'"{DIGEST}"'
+
+
+def test_media_route_has_unique_operation_id(mocker):
+    mocker.patch.object(app, "openapi_schema", None)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        schema = app.openapi()
+
+    assert list(schema["paths"]["/media/{file_path}"]) == ["get"]
+
+
+@pytest.mark.anyio
+async def test_get_media_file_not_modified(client: AsyncClient, media_root):
+    response = await client.get(
+        f"/media/{CONTENT_PATH}",
+        headers={"If-None-Match": f'"other", W/"{DIGEST}"'},
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{DIGEST}"'
+
+
+@pytest.mark.anyio
+async def test_get_media_file_range(client: AsyncClient, media_root):
+    response = await client.get(
+        f"/media/{CONTENT_PATH}", headers={"Range": "bytes=10-19"}
+    )
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+
+@pytest.mark.anyio
+async def test_get_legacy_media_file(client: AsyncClient, media_root):
+    response = await client.get("/media/legacy.jpg")
+
+    assert response.status_code == 200
+    assert "immutable" not in response.headers["cache-control"]
+    assert "max-age" in response.headers["cache-control"]
+
+    etag = response.headers["etag"]
+    response = await client.get(
+        "/media/legacy.jpg", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path", ["missing.jpg", "../conftest.py", "ab"])
+async def test_get_media_file_not_found(client: AsyncClient, media_root, path):
+    response = await client.get(f"/media/{path}")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_get_media_file_accel_redirect(
+    mocker, client: AsyncClient, media_root
+):
+    mocker.patch("app.api.v1.media_files.MEDIA_SERVE_MODE", "accel")
+
+    response = await client.get(f"/media/{CONTENT_PATH}")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["x-accel-redirect"] == f"/_media/{CONTENT_PATH}"
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.anyio
+async def test_get_media_file_redirects_to_s3(mocker, client: AsyncClient):
+    mocker.patch(
+        "app.api.v1.media_files.storage",
+        S3StorageBackend("s3://media", public_url="https://cdn.example/media"),
+    )
+
+    response = await client.get(f"/media/{CONTENT_PATH}")
+
+    assert response.status_code == 307
+    assert response.headers["location"] == (
+        f"https://cdn.example/media/{CONTENT_PATH}"
+    )
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.anyio
+async def test_get_media_file_redirect_to_presigned_url_is_cacheable(
+    mocker, client: AsyncClient
+):
+    storage = S3StorageBackend(
+        "s3://media",
+        endpoint_url="http://s3.local:9000",
+        access_key_id="key",
+        secret_access_key="secret",
+        public_url=None,
+        presign_expires=3600,
+    )
+    mocker.patch("app.api.v1.media_files.storage", storage)
+
+    response = await client.get(f"/media/{CONTENT_PATH}")
+    await storage.close()
+
+    assert response.status_code == 307
+    assert response.headers["location"].startswith(
+        f"http://s3.local:9000/media/{CONTENT_PATH}?"
+    )
+    assert "X-Amz-Expires=3600" in response.headers["location"]
+    # Браузер не использует ссылку дольше срока её подписи
+    assert response.headers["cache-control"] == "private, max-age=1800"
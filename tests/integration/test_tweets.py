@@ -196,3 +196,125 @@ async def test_get_tweets_exception(
     assert response.status_code == 200
     data = response.json()
     assert data["result"] is False
+
+
+@pytest.mark.anyio
+async def test_get_feed_paginated(
+    session: AsyncSession,
+    client: AsyncClient,
+    test_user_1: User,
+    test_user_2: User,
+):
+    await follow_user(
+        session, follower_id=test_user_1.id, following_id=test_user_2.id
+    )
+    for i in range(3):
+        await create_tweet(
+            session,
+            CreateTweetRequest(tweet_data=f"Page {i}", tweet_media_ids=[]),
+            test_user_2.id,
+        )
+
+    response = await client.get(
+        "/api/tweets",
+        params={"limit": 2},
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+    data = response.json()["data"]
+    assert len(data["tweets"]) == 2
+    assert data["next_cursor"] is not None
+
+    response = await client.get(
+        "/api/tweets",
+        params={"limit": 2, "cursor": data["next_cursor"]},
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+    next_ids = {tweet["id"] for tweet in response.json()["data"]["tweets"]}
+    assert next_ids.isdisjoint({tweet["id"] for tweet in data["tweets"]})
+
+
+@pytest.mark.anyio
+async def test_get_feed_invalid_cursor(client: AsyncClient, test_user_1: User):
+    response = await client.get(
+        "/api/tweets",
+        params={"cursor": "not-a-cursor"},
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["result"] is False
+    assert data["error_type"] == "InvalidCursor"
+
+
+@pytest.mark.anyio
+async def test_get_feed_likes_summary(
+    session: AsyncSession,
+    client: AsyncClient,
+    test_user_1: User,
+    test_user_2: User,
+):
+    await follow_user(
+        session, follower_id=test_user_1.id, following_id=test_user_2.id
+    )
+    tweet_id = await create_tweet(
+        session,
+        CreateTweetRequest(tweet_data="Summary", tweet_media_ids=[]),
+        test_user_2.id,
+    )
+    await add_like(session, tweet_id=tweet_id, user_id=test_user_1.id)
+
+    response = await client.get(
+        "/api/tweets",
+        params={"likes_mode": "summary", "limit": 200},
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+
+    assert response.json()["result"] is True
+    tweets = {t["id"]: t for t in response.json()["data"]["tweets"]}
+    assert tweets[tweet_id]["like_count"] == 1
+    assert tweets[tweet_id]["liked_by_me"] is True
+    assert tweets[tweet_id]["likes"] == [
+        {"user_id": test_user_1.id, "name": "user_1"}
+    ]
+
+
+@pytest.mark.anyio
+async def test_get_tweet_likes_paginated(
+    session: AsyncSession,
+    client: AsyncClient,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet: Tweet,
+):
+    await add_like(session, tweet_id=test_tweet.id, user_id=test_user_1.id)
+    await add_like(session, tweet_id=test_tweet.id, user_id=test_user_2.id)
+
+    response = await client.get(
+        f"/api/tweets/{test_tweet.id}/likes",
+        params={"limit": 1},
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+    data = response.json()["data"]
+    assert data["likes"] == [{"user_id": test_user_1.id, "name": "user_1"}]
+
+    response = await client.get(
+        f"/api/tweets/{test_tweet.id}/likes",
+        params={"limit": 1, "cursor": data["next_cursor"]},
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+    data = response.json()["data"]
+    assert data["likes"] == [{"user_id": test_user_2.id, "name": "user_2"}]
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_get_tweet_likes_not_found(
+    client: AsyncClient, test_user_1: User
+):
+    response = await client.get(
+        "/api/tweets/999999/likes",
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+
+    assert response.json()["error_type"] == "NotFound"
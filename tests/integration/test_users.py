@@ -1,7 +1,10 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import User
+from app.db.models import Tweet, User
+from app.services.follower_service import follow_user
+from app.services.like_service import add_like
 
 
 @pytest.mark.anyio
@@ -15,6 +18,15 @@ async def test_get_my_profile(client: AsyncClient, test_user_1: User):
     user = data["data"]["user"]
     assert user["id"] == test_user_1.id
     assert user["name"] == test_user_1.name
+    assert isinstance(user["followers_count"], int)
+    assert isinstance(user["following_count"], int)
+    assert "followers" not in user
+
+    response = await client.get(
+        "/api/users/me?full=true",
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+    user = response.json()["data"]["user"]
     assert isinstance(user["followers"], list)
     assert isinstance(user["following"], list)
 
@@ -81,6 +93,90 @@ async def test_follow_unfollow_user(
     assert resp.json()["result"] is True
 
 
+@pytest.mark.anyio
+async def test_follower_and_following_lists(
+    session: AsyncSession,
+    client: AsyncClient,
+    test_user_1: User,
+    test_user_2: User,
+):
+    await follow_user(
+        session, follower_id=test_user_2.id, following_id=test_user_1.id
+    )
+    headers = {"api-key": str(test_user_1.api_key)}
+
+    resp = await client.get(
+        f"/api/users/{test_user_1.id}/followers?limit=1", headers=headers
+    )
+    data = resp.json()
+    assert data["result"] is True
+    assert [u["id"] for u in data["data"]["users"]] == [test_user_2.id]
+
+    resp = await client.get(
+        f"/api/users/{test_user_2.id}/following", headers=headers
+    )
+    assert test_user_1.id in [u["id"] for u in resp.json()["data"]["users"]]
+
+    resp = await client.get("/api/users/999999/followers", headers=headers)
+    assert resp.json()["error_type"] == "UserNotFound"
+
+    resp = await client.get(
+        f"/api/users/{test_user_1.id}/followers?cursor=broken",
+        headers=headers,
+    )
+    assert resp.json()["error_type"] == "InvalidCursor"
+
+
+@pytest.mark.anyio
+async def test_bulk_follow_unfollow(
+    client: AsyncClient, test_user_1: User, test_user_2: User
+):
+    headers = {"api-key": str(test_user_1.api_key)}
+    # Пользователи общие для модуля: сбрасываем подписку из других тестов
+    await client.post(
+        "/api/users/unfollow/bulk",
+        json={"ids": [test_user_2.id]},
+        headers=headers,
+    )
+
+    resp = await client.post(
+        "/api/users/follow/bulk",
+        json={"ids": [test_user_2.id, test_user_1.id, 999999]},
+        headers=headers,
+    )
+    assert resp.json()["data"]["results"] == [
+        {"id": test_user_2.id, "outcome": "followed"},
+        {"id": test_user_1.id, "outcome": "self"},
+        {"id": 999999, "outcome": "not_found"},
+    ]
+
+    resp = await client.post(
+        "/api/users/unfollow/bulk",
+        json={"ids": [test_user_2.id]},
+        headers=headers,
+    )
+    assert resp.json()["data"]["results"] == [
+        {"id": test_user_2.id, "outcome": "unfollowed"}
+    ]
+
+    resp = await client.post(
+        "/api/users/follow/bulk", json={"ids": []}, headers=headers
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_my_suggestions(client: AsyncClient, test_user_1: User):
+    resp = await client.get(
+        "/api/users/me/suggestions?limit=5",
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+
+    data = resp.json()
+    assert data["result"] is True
+    assert isinstance(data["data"]["users"], list)
+
+
 @pytest.mark.anyio
 async def test_like_tweet(client: AsyncClient, test_user_1: User):
     create_resp = await client.post(
@@ -96,6 +192,13 @@ async def test_like_tweet(client: AsyncClient, test_user_1: User):
     )
     assert like_resp.status_code == 200
     assert like_resp.json()["result"] is True
+    assert like_resp.json()["data"] == {"changed": True}
+
+    repeat_resp = await client.post(
+        f"/api/tweets/{tweet_id}/likes",
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+    assert repeat_resp.json()["data"] == {"changed": False}
 
     unlike_resp = await client.delete(
         f"/api/tweets/{tweet_id}/likes",
@@ -103,3 +206,46 @@ async def test_like_tweet(client: AsyncClient, test_user_1: User):
     )
     assert unlike_resp.status_code == 200
     assert unlike_resp.json()["result"] is True
+    assert unlike_resp.json()["data"] == {"changed": True}
+
+
+@pytest.mark.anyio
+async def test_lookup_following_and_likes(
+    session: AsyncSession,
+    client: AsyncClient,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet: Tweet,
+):
+    await follow_user(
+        session, follower_id=test_user_2.id, following_id=test_user_1.id
+    )
+    await add_like(session, tweet_id=test_tweet.id, user_id=test_user_2.id)
+    headers = {"api-key": str(test_user_2.api_key)}
+
+    resp = await client.post(
+        "/api/users/following/lookup",
+        json={"ids": [test_user_1.id, 999999]},
+        headers=headers,
+    )
+    assert resp.json()["data"] == {"bitset": "10"}
+
+    resp = await client.post(
+        "/api/tweets/likes/lookup",
+        json={"ids": [999999, test_tweet.id]},
+        headers=headers,
+    )
+    assert resp.json()["data"] == {"bitset": "01"}
+
+
+@pytest.mark.anyio
+async def test_lookup_rejects_too_many_ids(
+    client: AsyncClient, test_user_1: User
+):
+    resp = await client.post(
+        "/api/tweets/likes/lookup",
+        json={"ids": list(range(10_000))},
+        headers={"api-key": str(test_user_1.api_key)},
+    )
+
+    assert resp.status_code == 422
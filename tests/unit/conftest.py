@@ -5,6 +5,9 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
+from app.core.cache import InMemoryCacheBackend, cache
+from app.core.security import negative_auth_cache
+from app.core.storage import LocalStorageBackend
 from app.db.database import Base
 from app.db.models import Media, Tweet, User
 
@@ -15,6 +18,25 @@ def anyio_backend():
     return "asyncio"
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    if isinstance(cache, InMemoryCacheBackend):
+        cache.store.clear()
+    negative_auth_cache.clear()
+    yield
+    if isinstance(cache, InMemoryCacheBackend):
+        cache.store.clear()
+    negative_auth_cache.clear()
+
+
+@pytest.fixture
+def local_storage(mocker, tmp_path) -> LocalStorageBackend:
+    backend = LocalStorageBackend(str(tmp_path))
+    mocker.patch("app.utils.file_storage.storage", backend)
+
+    return backend
+
+
 @pytest.fixture
 async def session():
     engine = create_async_engine(
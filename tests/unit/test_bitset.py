@@ -0,0 +1,9 @@
+from app.utils.bitset import membership_bitset
+
+
+def test_membership_bitset_keeps_request_order():
+    assert membership_bitset([7, 5, 6, 5], {5, 7}) == "1101"
+
+
+def test_membership_bitset_empty():
+    assert membership_bitset([], {1}) == ""
@@ -0,0 +1,186 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.cache import (
+    CacheBackend,
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+    create_cache_backend,
+)
+
+
+async def read_command(reader) -> list:
+    line = await reader.readline()
+    if not line.startswith(b"*"):
+        raise ConnectionError("Connection closed")
+    args = []
+    for _ in range(int(line[1:-2])):
+        size = int((await reader.readline())[1:-2])
+        args.append((await reader.readexactly(size + 2))[:-2].decode())
+    return args
+
+
+def encode_reply(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(map(encode_reply, value))
+    data = value.encode()
+    return b"$%d\r\n%s\r\n" % (len(data), data)
+
+
+class FakeRedisServer:
+    """Минимальный сервер RESP: GET, SET PX, DEL, MGET, AUTH, SELECT."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.writers = []
+
+    def drop_connections(self):
+        for writer in self.writers:
+            writer.close()
+
+    def get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at < time.monotonic():
+            self.data.pop(key)
+            return None
+        return value
+
+    async def handle(self, reader, writer):
+        self.writers.append(writer)
+        while True:
+            try:
+                command = await read_command(reader)
+            except Exception:
+                break
+            name, args = command[0].upper(), command[1:]
+            # CLIENT SETINFO клиента отклоняется и не записывается
+            if name != "CLIENT":
+                self.commands.append(command)
+
+            if name == "SET":
+                expires_at = None
+                if len(args) == 4 and args[2].upper() == "PX":
+                    expires_at = time.monotonic() + int(args[3]) / 1000
+                self.data[args[0]] = (args[1], expires_at)
+                writer.write(b"+OK\r\n")
+            elif name == "GET":
+                writer.write(encode_reply(self.get(args[0])))
+            elif name == "MGET":
+                writer.write(encode_reply([self.get(key) for key in args]))
+            elif name == "DEL":
+                removed = sum(self.data.pop(k, None) is not None for k in args)
+                writer.write(encode_reply(removed))
+            elif name in ("AUTH", "SELECT"):
+                writer.write(b"+OK\r\n")
+            else:
+                writer.write(b"-ERR unknown command\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+async def fake_redis():
+    fake = FakeRedisServer()
+    server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+    fake.port = server.sockets[0].getsockname()[1]
+
+    yield fake
+
+    server.close()
+    await server.wait_closed()
+
+
+async def check_backend_contract(backend: CacheBackend):
+    await backend.set("feed:1", {"tweets": [1, 2]}, ttl=30)
+    await backend.set("feed:2", {"tweets": []}, ttl=30)
+
+    assert await backend.get("feed:1") == {"tweets": [1, 2]}
+    assert await backend.get_many(["feed:1", "feed:2", "feed:3"]) == {
+        "feed:1": {"tweets": [1, 2]},
+        "feed:2": {"tweets": []},
+        "feed:3": None,
+    }
+
+    await backend.delete("feed:1", "feed:2")
+    assert await backend.get("feed:1") is None
+
+    await backend.set("short", 1, ttl=0.01)
+    await asyncio.sleep(0.03)
+    assert await backend.get("short") is None
+
+
+@pytest.mark.anyio
+async def test_in_memory_backend():
+    backend = InMemoryCacheBackend(maxsize=10)
+
+    await check_backend_contract(backend)
+
+    stats = backend.stats()
+    assert stats["backend"] == "InMemoryCacheBackend"
+    assert stats["hits"] == 3
+    assert stats["misses"] == 3
+    assert (backend.hits, backend.misses) == (0, 0)
+
+
+@pytest.mark.anyio
+async def test_redis_backend(fake_redis):
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{fake_redis.port}/0")
+
+    await check_backend_contract(backend)
+    await backend.close()
+
+    assert backend.stats()["errors"] == 0
+    assert backend.stats()["hits"] == 3
+    assert fake_redis.commands[0][:2] == ["SET", "microblog:v1:feed:1"]
+
+
+@pytest.mark.anyio
+async def test_redis_backend_auth_and_db(fake_redis):
+    backend = RedisCacheBackend(
+        f"redis://:secret@127.0.0.1:{fake_redis.port}/3"
+    )
+
+    await backend.set("key", "value", ttl=30)
+    await backend.close()
+
+    assert fake_redis.commands[:2] == [["AUTH", "secret"], ["SELECT", "3"]]
+
+
+@pytest.mark.anyio
+async def test_redis_backend_reconnects(fake_redis):
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{fake_redis.port}/0")
+    await backend.set("key", "value", ttl=30)
+
+    fake_redis.drop_connections()
+    await asyncio.sleep(0.01)
+
+    assert await backend.get("key") == "value"
+    assert backend.stats()["errors"] == 0
+    await backend.close()
+
+
+@pytest.mark.anyio
+async def test_redis_backend_unavailable_is_a_miss():
+    backend = RedisCacheBackend("redis://127.0.0.1:1/0", timeout=0.5)
+
+    await backend.set("key", "value", ttl=30)
+
+    assert await backend.get("key") is None
+    assert backend.stats()["errors"] == 2
+
+
+def test_create_cache_backend():
+    assert isinstance(create_cache_backend("memory://"), InMemoryCacheBackend)
+    assert isinstance(
+        create_cache_backend("redis://localhost:6379/0"), RedisCacheBackend
+    )
+
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached://localhost")
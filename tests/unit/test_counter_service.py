@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Follower, Like, Tweet, User
+from app.services.counter_service import check_counters
+from app.services.follower_service import follow_user
+
+
+@pytest.mark.anyio
+async def test_check_counters_consistent(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    await follow_user(
+        session, follower_id=test_user_1.id, following_id=test_user_2.id
+    )
+
+    assert await check_counters(session) == {
+        "tweets.like_count": 0,
+        "users.followers_count": 0,
+        "users.following_count": 0,
+        "media_blobs.ref_count": 0,
+    }
+
+
+@pytest.mark.anyio
+async def test_check_counters_detects_and_repairs_drift(
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    # Строки, записанные в обход сервисов, не меняют счётчики
+    session.add(
+        Follower(follower_id=test_user_2.id, following_id=test_user_1.id)
+    )
+    session.add(Like(user_id=test_user_2.id, tweet_id=test_tweet_1.id))
+    await session.execute(
+        update(User).where(User.id == test_user_1.id).values(following_count=7)
+    )
+    await session.commit()
+
+    drift = await check_counters(session)
+
+    assert drift == {
+        "tweets.like_count": 1,
+        "users.followers_count": 1,
+        "users.following_count": 2,
+        "media_blobs.ref_count": 0,
+    }
+
+    assert await check_counters(session, repair=True) == drift
+    assert sum((await check_counters(session)).values()) == 0
+
+    for obj in (test_user_1, test_user_2, test_tweet_1):
+        await session.refresh(obj)
+
+    assert test_user_1.followers_count == 1
+    assert test_user_1.following_count == 0
+    assert test_user_2.following_count == 1
+    assert test_tweet_1.like_count == 1
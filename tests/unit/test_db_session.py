@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.db.database import get_db_session, session_usage
+
+
+async def run_request(use_db: bool) -> SimpleNamespace:
+    request = SimpleNamespace(state=SimpleNamespace())
+    dependency = get_db_session(request)  # type: ignore[arg-type]
+
+    session = await anext(dependency)
+    if use_db:
+        await session.execute(text("SELECT 1"))
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+
+    return request
+
+
+@pytest.mark.anyio
+async def test_db_session_without_queries_does_not_use_connection():
+    before = session_usage.stats()
+
+    request = await run_request(use_db=False)
+
+    assert request.state.db_connection_used is False
+    after = session_usage.stats()
+    assert after["sessions"] == before["sessions"] + 1
+    assert after["used"] == before["used"]
+
+
+@pytest.mark.anyio
+async def test_db_session_with_query_uses_connection():
+    before = session_usage.stats()
+
+    request = await run_request(use_db=True)
+
+    assert request.state.db_connection_used is True
+    assert session_usage.stats()["used"] == before["used"] + 1
@@ -0,0 +1,190 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Tweet, User
+from app.schemas import CreateTweetRequest
+from app.services import tweet_service
+from app.services.feed_cache import (
+    cache_feed,
+    get_cached_feed,
+    invalidate_feeds,
+)
+from app.services.follower_service import follow_user, unfollow_user
+from app.services.like_service import add_like, remove_like
+from app.services.tweet_service import (
+    create_tweet,
+    delete_tweet,
+    get_user_feed,
+)
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_ttl_cache_expiration():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1, ttl=-1)
+
+    assert cache.get("a", "missing") == "missing"
+    assert len(cache) == 0
+
+
+@pytest.mark.anyio
+async def test_feed_is_served_from_cache(
+    mocker,
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+
+    load = mocker.spy(tweet_service, "fetch_feed_rows")
+    first = await get_user_feed(session=session, user_id=test_user_2.id)
+    second = await get_user_feed(session=session, user_id=test_user_2.id)
+
+    assert second == first
+    assert load.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_feed_cache_invalidated_by_writes(
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+
+    async def feed_ids():
+        page = await get_user_feed(session=session, user_id=test_user_2.id)
+        return [tweet["id"] for tweet in page["tweets"]]
+
+    assert await feed_ids() == [test_tweet_1.id]
+
+    tweet_id = await create_tweet(
+        session=session,
+        request=CreateTweetRequest(tweet_data="new"),
+        author_id=test_user_1.id,
+    )
+    assert await feed_ids() == [tweet_id, test_tweet_1.id]
+
+    await add_like(
+        session=session, tweet_id=test_tweet_1.id, user_id=test_user_2.id
+    )
+    assert await feed_ids() == [test_tweet_1.id, tweet_id]
+
+    await remove_like(
+        session=session, tweet_id=test_tweet_1.id, user_id=test_user_2.id
+    )
+    assert await feed_ids() == [tweet_id, test_tweet_1.id]
+
+    await delete_tweet(
+        session=session, tweet_id=tweet_id, current_user_id=test_user_1.id
+    )
+    assert await feed_ids() == [test_tweet_1.id]
+
+    await unfollow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+    assert await feed_ids() == []
+
+
+@pytest.mark.anyio
+async def test_like_invalidates_only_likers_feed(
+    mocker,
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+    first = await get_user_feed(session=session, user_id=test_user_2.id)
+
+    load = mocker.spy(tweet_service, "fetch_feed_rows")
+    await add_like(
+        session=session, tweet_id=test_tweet_1.id, user_id=test_user_1.id
+    )
+
+    # Лента подписчика отдаётся из кэша до истечения FEED_CACHE_TTL
+    assert await get_user_feed(session=session, user_id=test_user_2.id) == (
+        first
+    )
+    assert load.call_count == 0
+
+    await get_user_feed(session=session, user_id=test_user_1.id)
+    assert load.call_count == 1
+
+
+@pytest.mark.anyio
+async def test_feed_cache_skips_page_read_before_invalidation():
+    page = {"tweets": [{"id": 1}], "next_cursor": None}
+
+    cached, generation = await get_cached_feed(
+        user_id=1, limit=10, likes_mode="full"
+    )
+    assert cached is None
+
+    # Лента изменилась, пока страница читалась из БД
+    await invalidate_feeds([1])
+    await cache_feed(
+        user_id=1,
+        limit=10,
+        likes_mode="full",
+        page=page,
+        generation=generation,
+    )
+
+    cached, _ = await get_cached_feed(user_id=1, limit=10, likes_mode="full")
+    assert cached is None
+
+
+@pytest.mark.anyio
+async def test_feed_cache_keeps_concurrent_pages():
+    pages = {
+        limit: {"tweets": [{"id": limit}], "next_cursor": None}
+        for limit in (10, 20)
+    }
+    generations = {
+        limit: (await get_cached_feed(1, limit, "full"))[1] for limit in pages
+    }
+
+    for limit, page in pages.items():
+        await cache_feed(1, limit, "full", page, generations[limit])
+
+    for limit, page in pages.items():
+        assert await get_cached_feed(1, limit, "full") == (
+            page,
+            generations[limit],
+        )
@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Media, Tweet, User
+from app.services.feed_query import build_feed_query, fetch_feed_rows
+from app.services.follower_service import follow_user
+from app.services.like_service import add_like
+from app.services.tweet_service import get_user_feed
+
+
+async def seed_feed(session: AsyncSession, author: User, reader: User):
+    tweets = [
+        Tweet(content=f"tweet_{i}", author_id=author.id) for i in range(3)
+    ]
+    session.add_all(tweets)
+    await session.commit()
+
+    session.add_all(
+        [
+            Media(
+                file_path="/media/a.jpg",
+                tweet_id=tweets[0].id,
+                variants={"320": "/media/a.w320.webp"},
+            ),
+            Media(file_path="/media/b.jpg", tweet_id=tweets[0].id),
+        ]
+    )
+    await session.commit()
+
+    await follow_user(
+        session=session, follower_id=reader.id, following_id=author.id
+    )
+    for user in (author, reader):
+        await add_like(session=session, tweet_id=tweets[1].id, user_id=user.id)
+
+    return tweets
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("likes_mode", ["full", "summary"])
+async def test_json_engine_matches_orm_engine(
+    mocker,
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    likes_mode: str,
+):
+    await seed_feed(session, author=test_user_1, reader=test_user_2)
+
+    mocker.patch("app.services.tweet_service.FEED_ENGINE", "orm")
+    orm_page = await get_user_feed(
+        session=session, user_id=test_user_2.id, likes_mode=likes_mode
+    )
+
+    mocker.patch("app.services.tweet_service.FEED_ENGINE", "json")
+    mocker.patch(
+        "app.services.tweet_service.get_cached_feed",
+        return_value=(None, "generation"),
+    )
+    json_page = await get_user_feed(
+        session=session, user_id=test_user_2.id, likes_mode=likes_mode
+    )
+
+    assert len(json_page["tweets"]) == 3
+    assert json_page == orm_page
+
+
+@pytest.mark.anyio
+async def test_fetch_feed_rows_documents(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    tweets = await seed_feed(session, author=test_user_1, reader=test_user_2)
+
+    order = [tweets[1].id, tweets[2].id, tweets[0].id]
+    docs = await fetch_feed_rows(
+        session=session,
+        user_id=test_user_2.id,
+        tweet_ids=order,
+        likers_limit=1,
+        with_liked_by_me=True,
+    )
+
+    assert [doc["id"] for doc in docs] == order
+    assert docs[0]["like_count"] == 2
+    assert docs[0]["liked_by_me"] is True
+    assert docs[0]["likes"] == [{"user_id": test_user_1.id, "name": "user_1"}]
+    assert docs[2]["attachments"] == ["/media/a.jpg", "/media/b.jpg"]
+    assert docs[2]["attachment_variants"] == [
+        {"320": "/media/a.w320.webp"},
+        {},
+    ]
+    assert docs[2]["liked_by_me"] is False
+
+    # Твиты не из ленты читателя не возвращаются
+    assert (
+        await fetch_feed_rows(
+            session=session, user_id=test_user_1.id, tweet_ids=order
+        )
+        == []
+    )
+
+
+def test_build_feed_query_postgresql():
+    query = build_feed_query(dialect="postgresql", user_id=1, tweet_ids=[42])
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "json_build_object" in sql
+    assert "json_agg" in sql
+    assert "json_group_array" not in sql
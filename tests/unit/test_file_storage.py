@@ -1,36 +1,83 @@
+import hashlib
 import logging
 import os
 from unittest.mock import AsyncMock
 
 import pytest
 
-from app.utils.file_storage import save_upload_file
+from app.utils.file_storage import (
+    UploadTooLargeError,
+    delete_media_files,
+    is_content_addressed,
+    media_key,
+    place_upload,
+    save_upload_file,
+    upload_stats,
+)
 
 
 @pytest.mark.anyio
-async def test_save_upload_file():
+async def test_save_upload_file(local_storage, tmp_path):
     mock_upload_file = AsyncMock()
     mock_upload_file.filename = "test.jpg"
-    mock_upload_file.read.return_value = b"file content"
+    mock_upload_file.size = None
+    mock_upload_file.read.side_effect = [b"file ", b"content", b""]
 
     result = await save_upload_file(
-        upload_file=mock_upload_file, dest_folder="tests/temp_media"
+        upload_file=mock_upload_file, dest_folder=str(tmp_path)
     )
 
+    digest = hashlib.sha256(b"file content").hexdigest()
+
     assert result is not None
-    assert result.startswith("/media/")
-    assert result.endswith(".jpg")
+    assert result.content_hash == digest
+    assert result.size == len(b"file content")
+    assert result.url == f"/media/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
 
-    mock_upload_file.read.assert_called_once()
+    assert mock_upload_file.read.call_count == 3
 
-    saved_file_path = os.path.join(
-        "tests", "temp_media", os.path.basename(result)
-    )
+    assert await place_upload(result, result.url) is True
+
+    saved_file_path = local_storage.local_path(media_key(result.url))
     with open(saved_file_path, "rb") as f:
         content = f.read()
         assert content == b"file content"
 
-    os.remove(saved_file_path)
+    assert not os.path.exists(result.temp_path)
+
+
+@pytest.mark.anyio
+async def test_place_upload_reuses_existing_file(local_storage, tmp_path):
+    uploads = []
+
+    for _ in range(2):
+        mock_upload_file = AsyncMock()
+        mock_upload_file.filename = "same.png"
+        mock_upload_file.size = None
+        mock_upload_file.read.side_effect = [b"same bytes", b""]
+        uploads.append(
+            await save_upload_file(
+                upload_file=mock_upload_file, dest_folder=str(tmp_path)
+            )
+        )
+
+    first, second = uploads
+
+    assert first.url == second.url
+    assert await place_upload(first, first.url) is True
+    assert await place_upload(second, second.url) is False
+    assert not os.path.exists(second.temp_path)
+
+    assert await delete_media_files([first.url]) == 1
+    assert await delete_media_files([first.url]) == 0
+
+
+def test_media_key_rejects_foreign_urls():
+    assert media_key("/media/ab/cd/x.jpg") == "ab/cd/x.jpg"
+
+    for url in ("/static/x.jpg", "/media/../etc/passwd", "/media/"):
+        with pytest.raises(ValueError):
+            media_key(url)
 
 
 @pytest.mark.anyio
@@ -52,3 +99,48 @@ async def test_save_upload_file_exception(caplog):
             assert "Failed to save uploaded file:" in caplog.text
             assert f"{mock_upload_file.filename}" in caplog.text
             assert "File read error" in caplog.text
+
+
+@pytest.mark.anyio
+async def test_save_upload_file_too_large_while_streaming(mocker, tmp_path):
+    mocker.patch.dict("app.utils.file_storage.MEDIA_MAX_BYTES", {"image": 8})
+    mock_upload_file = AsyncMock()
+    mock_upload_file.filename = "big.png"
+    mock_upload_file.size = None
+    mock_upload_file.read.side_effect = [b"12345", b"67890", b""]
+    rejected = upload_stats.rejected
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload_file(
+            upload_file=mock_upload_file, dest_folder=str(tmp_path)
+        )
+
+    # Вторая порция превысила лимит: чтение остановлено, файлов не осталось
+    assert mock_upload_file.read.call_count == 2
+    assert os.listdir(tmp_path) == []
+    assert upload_stats.rejected == rejected + 1
+
+
+@pytest.mark.anyio
+async def test_save_upload_file_too_large_by_declared_size(mocker, tmp_path):
+    mocker.patch.dict("app.utils.file_storage.MEDIA_MAX_BYTES", {"video": 100})
+    mock_upload_file = AsyncMock()
+    mock_upload_file.filename = "clip.mov"
+    mock_upload_file.size = 101
+
+    with pytest.raises(UploadTooLargeError):
+        await save_upload_file(
+            upload_file=mock_upload_file, dest_folder=str(tmp_path)
+        )
+
+    mock_upload_file.read.assert_not_called()
+
+
+def test_is_content_addressed():
+    digest = hashlib.sha256(b"x").hexdigest()
+    path = f"/media/{digest[:2]}/{digest[2:4]}/{digest}"
+
+    assert is_content_addressed(f"{path}.jpg")
+    assert is_content_addressed(f"{path}.w320.webp")
+    assert not is_content_addressed(f"/media/00/00/{digest}.jpg")
+    assert not is_content_addressed("/media/3f2a9c.jpg")
@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models import Follower, User
+from app.services import follower_service, user_service
+from app.services.follow_graph import FollowGraph, create_follow_graph
+from app.services.follower_service import (
+    follow_user,
+    follow_users,
+    get_followed_user_ids,
+    unfollow_user,
+)
+from app.services.user_service import delete_user, get_follow_list
+
+
+def test_follow_graph_keeps_arrays_sorted():
+    graph = FollowGraph()
+
+    for following_id in (5, 2, 9, 2):
+        graph.add(1, following_id)
+    graph.add(3, 2)
+
+    assert list(graph.following(1)) == [2, 5, 9]
+    assert list(graph.followers(2)) == [1, 3]
+    assert graph.is_following(1, 5)
+    assert not graph.is_following(5, 1)
+    assert graph.edges == 4
+
+    assert graph.remove(1, 5) is True
+    assert graph.remove(1, 5) is False
+    assert list(graph.page(graph.following(1), after=2, limit=10)) == [9]
+
+    graph.remove_user(2)
+
+    assert list(graph.following(1)) == [9]
+    assert list(graph.following(3)) == []
+    assert graph.edges == 1
+    assert graph.stats()["bytes"] > 0
+
+
+@pytest.mark.anyio
+async def test_follow_graph_load(session: AsyncSession):
+    users = [User(name=f"user{i}", api_key=f"key{i}") for i in range(4)]
+    session.add_all(users)
+    await session.flush()
+    a, b, c, d = (user.id for user in users)
+    session.add_all(
+        Follower(follower_id=f, following_id=t)
+        for f, t in [(d, a), (b, a), (a, c), (a, b), (c, a)]
+    )
+    await session.commit()
+
+    graph = FollowGraph()
+
+    assert await graph.load(session, batch_size=2) == 5
+    assert graph.ready
+    assert list(graph.following(a)) == sorted([b, c])
+    assert list(graph.followers(a)) == sorted([b, c, d])
+    assert graph.stats()["users"] == 4
+
+
+@pytest.mark.anyio
+async def test_follow_graph_load_yields_between_batches(
+    mocker, session: AsyncSession
+):
+    users = [User(name=f"user{i}", api_key=f"key{i}") for i in range(5)]
+    session.add_all(users)
+    await session.flush()
+    session.add_all(
+        Follower(follower_id=f.id, following_id=t.id)
+        for f in users
+        for t in users
+        if f is not t
+    )
+    await session.commit()
+
+    sleep = mocker.spy(asyncio, "sleep")
+    await FollowGraph().load(session, batch_size=4)
+
+    # 20 подписок: 5 пакетов строк и 5 пакетов сортировки подписчиков
+    assert sleep.call_count == 10
+
+
+def test_follow_graph_disabled_with_several_workers():
+    assert isinstance(
+        create_follow_graph(enabled=True, workers=1), FollowGraph
+    )
+    assert create_follow_graph(enabled=True, workers=4) is None
+    assert create_follow_graph(enabled=False, workers=1) is None
+
+
+@pytest.mark.anyio
+async def test_follow_graph_refresh_sees_external_changes(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    maker = async_sessionmaker(bind=session.bind, expire_on_commit=False)
+    graph = FollowGraph()
+    await graph.load(session)
+
+    graph.start(maker, interval=0.01)
+    try:
+        # Подписка, записанная в обход сервисов (например, командой)
+        session.add(
+            Follower(follower_id=test_user_1.id, following_id=test_user_2.id)
+        )
+        await session.commit()
+
+        for _ in range(100):
+            if graph.is_following(test_user_1.id, test_user_2.id):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await graph.close()
+
+    assert graph.is_following(test_user_1.id, test_user_2.id)
+    assert graph.edges == 1
+
+
+@pytest.fixture
+def loaded_graph(monkeypatch):
+    graph = FollowGraph()
+    graph.ready = True
+    monkeypatch.setattr(follower_service, "follow_graph", graph)
+    monkeypatch.setattr(user_service, "follow_graph", graph)
+
+    return graph
+
+
+@pytest.mark.anyio
+async def test_services_keep_graph_current(
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    loaded_graph: FollowGraph,
+):
+    third = User(name="user_3", api_key="key_3")
+    session.add(third)
+    await session.commit()
+
+    await follow_user(
+        session, follower_id=test_user_1.id, following_id=test_user_2.id
+    )
+    await follow_users(
+        session, follower_id=third.id, user_ids=[test_user_2.id]
+    )
+
+    assert loaded_graph.is_following(test_user_1.id, test_user_2.id)
+    assert await get_followed_user_ids(
+        session, test_user_1.id, [test_user_2.id, third.id]
+    ) == {test_user_2.id}
+
+    page = await get_follow_list(session, test_user_2.id, "followers", limit=1)
+
+    assert page is not None
+    assert page["users"] == [{"id": test_user_1.id, "name": "user_1"}]
+
+    page = await get_follow_list(
+        session,
+        test_user_2.id,
+        "followers",
+        limit=1,
+        cursor=page["next_cursor"],
+    )
+
+    assert page == {
+        "users": [{"id": third.id, "name": "user_3"}],
+        "next_cursor": None,
+    }
+    assert await get_follow_list(session, 999, "following") is None
+
+    await unfollow_user(
+        session, follower_id=test_user_1.id, following_id=test_user_2.id
+    )
+    await delete_user(session, third.id)
+
+    assert list(loaded_graph.followers(test_user_2.id)) == []
+    assert loaded_graph.edges == 0
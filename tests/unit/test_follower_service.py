@@ -2,11 +2,17 @@ import logging
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Follower, User
-from app.services.follower_service import follow_user, unfollow_user
+from app.db.models import Follower, TimelineEntry, Tweet, User
+from app.services.follower_service import (
+    follow_user,
+    follow_users,
+    unfollow_user,
+    unfollow_users,
+)
 
 
 @pytest.mark.anyio
@@ -26,6 +32,11 @@ async def test_follow_user_new(
     )
     assert follow is not None
 
+    await session.refresh(test_user_1)
+    await session.refresh(test_user_2)
+    assert (test_user_1.followers_count, test_user_1.following_count) == (0, 1)
+    assert (test_user_2.followers_count, test_user_2.following_count) == (1, 0)
+
 
 @pytest.mark.anyio
 async def test_follow_user_already_following(
@@ -40,35 +51,29 @@ async def test_follow_user_already_following(
         follower_id=test_user_1.id,
         following_id=test_user_2.id,
     )
-    assert result is True
+    assert result is False
 
 
 @pytest.mark.anyio
 async def test_follow_user_exception(caplog):
     # Создаём мок-сессию
     mock_session = AsyncMock()
-    mock_result = MagicMock()
+    mock_session.bind.dialect.name = "sqlite"
+    mock_session.execute.return_value = MagicMock()
 
     # Имитируем выброс исключения при commit()
-    mock_result.scalar_one_or_none.return_value = None
-    mock_session.execute.return_value = mock_result
-
     mock_session.commit.side_effect = SQLAlchemyError("DB commit failed")
 
     with caplog.at_level(logging.ERROR):
-        result = await follow_user(
-            session=mock_session, follower_id=5, following_id=6
-        )
-
-    # Проверяем результат
-    assert result is False
-
-    # Проверяем, что add() был вызван
-    mock_session.add.assert_called_once()
-    assert isinstance(mock_session.add.call_args[0][0], Follower)
+        with pytest.raises(SQLAlchemyError):
+            await follow_user(
+                session=mock_session, follower_id=5, following_id=6
+            )
 
-    # Проверяем, что commit() был вызван
+    # Проверяем, что INSERT был выполнен, а транзакция откатена
+    mock_session.execute.assert_awaited()
     mock_session.commit.assert_awaited()
+    mock_session.rollback.assert_awaited()
 
     # Проверяем логирование
     assert len(caplog.records) >= 1
@@ -100,6 +105,91 @@ async def test_unfollow_user(
     assert follow is None
 
 
+@pytest.mark.anyio
+async def test_follow_counters_change_only_on_state_change(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    for _ in range(2):
+        await follow_user(
+            session=session,
+            follower_id=test_user_1.id,
+            following_id=test_user_2.id,
+        )
+
+    await session.refresh(test_user_2)
+    assert test_user_2.followers_count == 1
+
+    for _ in range(2):
+        await unfollow_user(
+            session=session,
+            follower_id=test_user_1.id,
+            following_id=test_user_2.id,
+        )
+
+    await session.refresh(test_user_1)
+    await session.refresh(test_user_2)
+    assert test_user_1.following_count == 0
+    assert test_user_2.followers_count == 0
+
+
+@pytest.mark.anyio
+async def test_follow_users_bulk(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    third = User(name="user_3", api_key="key_3")
+    session.add(third)
+    await session.flush()
+    session.add(Tweet(content="hello", author_id=third.id))
+    await session.commit()
+    await follow_user(
+        session, follower_id=test_user_1.id, following_id=test_user_2.id
+    )
+
+    outcomes = await follow_users(
+        session,
+        follower_id=test_user_1.id,
+        user_ids=[third.id, test_user_2.id, test_user_1.id, 999, third.id],
+    )
+
+    assert outcomes == {
+        third.id: "followed",
+        test_user_2.id: "already_following",
+        test_user_1.id: "self",
+        999: "not_found",
+    }
+
+    timeline = await session.execute(
+        select(TimelineEntry.tweet_id).where(
+            TimelineEntry.user_id == test_user_1.id
+        )
+    )
+    assert len(timeline.all()) == 1
+
+    outcomes = await unfollow_users(
+        session,
+        follower_id=test_user_1.id,
+        user_ids=[test_user_2.id, third.id, test_user_2.id, 999],
+    )
+
+    assert outcomes == {
+        test_user_2.id: "unfollowed",
+        third.id: "unfollowed",
+        999: "not_found",
+    }
+
+    outcomes = await unfollow_users(
+        session, follower_id=test_user_1.id, user_ids=[third.id]
+    )
+    assert outcomes == {third.id: "not_following"}
+
+    for user in (test_user_1, test_user_2, third):
+        await session.refresh(user)
+
+    assert test_user_1.following_count == 0
+    assert test_user_2.followers_count == 0
+    assert third.followers_count == 0
+
+
 @pytest.mark.anyio
 async def test_unfollow_user_not_following(
     session: AsyncSession, test_user_1: User, test_user_2: User
@@ -109,24 +199,22 @@ async def test_unfollow_user_not_following(
         follower_id=test_user_1.id,
         following_id=test_user_2.id,
     )
-    assert result is True
+    assert result is False
 
 
 @pytest.mark.anyio
 async def test_unfollow_user_exception(caplog):
     # Создаём мок-сессию
     mock_session = AsyncMock()
+    mock_session.execute.return_value = MagicMock()
 
     mock_session.commit.side_effect = SQLAlchemyError("DB commit failed")
 
     with caplog.at_level(logging.ERROR):
-        result = await unfollow_user(
-            session=mock_session, follower_id=5, following_id=6
-        )
-
-    print(caplog.text)
-    # Проверяем результат
-    assert result is False
+        with pytest.raises(SQLAlchemyError):
+            await unfollow_user(
+                session=mock_session, follower_id=5, following_id=6
+            )
 
     # Проверяем, что delete() был вызван
     mock_session.execute.assert_awaited()
@@ -0,0 +1,156 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models import Like, Tweet, User
+from app.db.statements import insert_ignore
+from app.services.like_buffer import LikeWriteBuffer
+
+
+@pytest.fixture
+def buffer(session: AsyncSession) -> LikeWriteBuffer:
+    maker = async_sessionmaker(bind=session.bind, expire_on_commit=False)
+    return LikeWriteBuffer(maker, interval=0.01, max_batch=100)
+
+
+async def likers_of(session: AsyncSession, tweet_id) -> set:
+    result = await session.execute(
+        select(Like.user_id).where(Like.tweet_id == tweet_id)
+    )
+    return set(result.scalars().all())
+
+
+@pytest.mark.anyio
+async def test_buffer_batches_and_coalesces(
+    buffer: LikeWriteBuffer,
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    results = await asyncio.gather(
+        buffer.submit(test_user_1.id, test_tweet_1.id, liked=True),
+        buffer.submit(test_user_2.id, test_tweet_1.id, liked=True),
+        buffer.submit(test_user_2.id, test_tweet_1.id, liked=False),
+        buffer.submit(test_user_2.id, test_tweet_1.id, liked=True),
+    )
+
+    assert results == [True, True, True, True]
+    assert buffer.stats()["flushes"] == 1
+    assert buffer.stats()["coalesced"] == 2
+
+    # read-your-writes: после ответа запись уже закоммичена
+    assert await likers_of(session, test_tweet_1.id) == {
+        test_user_1.id,
+        test_user_2.id,
+    }
+    await session.refresh(test_tweet_1)
+    assert test_tweet_1.like_count == 2
+
+
+@pytest.mark.anyio
+async def test_buffer_reports_unchanged_state(
+    buffer: LikeWriteBuffer,
+    session: AsyncSession,
+    test_user_1: User,
+    test_tweet_1: Tweet,
+):
+    assert await buffer.submit(test_user_1.id, test_tweet_1.id, True)
+    assert not await buffer.submit(test_user_1.id, test_tweet_1.id, True)
+    assert await buffer.submit(test_user_1.id, test_tweet_1.id, False)
+    assert not await buffer.submit(test_user_1.id, test_tweet_1.id, False)
+
+    await session.refresh(test_tweet_1)
+    assert test_tweet_1.like_count == 0
+
+
+@pytest.mark.anyio
+async def test_buffer_missing_tweet_fails_only_its_request(
+    buffer: LikeWriteBuffer, test_user_1: User, test_tweet_1: Tweet
+):
+    results = await asyncio.gather(
+        buffer.submit(test_user_1.id, test_tweet_1.id, liked=True),
+        buffer.submit(test_user_1.id, 999, liked=True),
+        return_exceptions=True,
+    )
+
+    assert results[0] is True
+    assert isinstance(results[1], LookupError)
+
+
+@pytest.mark.anyio
+async def test_buffer_close_flushes_pending(
+    session: AsyncSession, test_user_1: User, test_tweet_1: Tweet
+):
+    maker = async_sessionmaker(bind=session.bind, expire_on_commit=False)
+    buffer = LikeWriteBuffer(maker, interval=60, max_batch=100)
+
+    pending = asyncio.create_task(
+        buffer.submit(test_user_1.id, test_tweet_1.id, liked=True)
+    )
+    await asyncio.sleep(0)
+    await buffer.close()
+
+    assert await pending is True
+    assert await likers_of(session, test_tweet_1.id) == {test_user_1.id}
+    assert buffer.stats()["pending"] == 0
+
+
+@pytest.mark.anyio
+async def test_buffer_invalidation_error_keeps_results(
+    buffer: LikeWriteBuffer,
+    session: AsyncSession,
+    test_user_1: User,
+    test_tweet_1: Tweet,
+):
+    with patch(
+        "app.services.like_buffer.invalidate_feeds",
+        side_effect=RuntimeError("cache down"),
+    ):
+        assert await buffer.submit(test_user_1.id, test_tweet_1.id, True)
+
+    assert await likers_of(session, test_tweet_1.id) == {test_user_1.id}
+    assert buffer.stats()["flushes"] == 1
+
+
+@pytest.mark.anyio
+async def test_buffer_writes_in_key_order(
+    buffer: LikeWriteBuffer,
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    other = Tweet(content="other", author_id=test_user_1.id)
+    session.add(other)
+    await session.commit()
+
+    inserted = []
+    updated = []
+    execute = AsyncSession.execute
+
+    def record_insert(session, model, rows):
+        inserted.extend((row["user_id"], row["tweet_id"]) for row in rows)
+        return insert_ignore(session, model, rows=rows)
+
+    async def record_update(self, statement, *args, **kwargs):
+        if statement.is_update:
+            updated.extend(row["tweet"] for row in args[0])
+        return await execute(self, statement, *args, **kwargs)
+
+    with (
+        patch("app.services.like_buffer.insert_ignore", record_insert),
+        patch.object(AsyncSession, "execute", record_update),
+    ):
+        await asyncio.gather(
+            buffer.submit(test_user_2.id, other.id, liked=True),
+            buffer.submit(test_user_1.id, other.id, liked=True),
+            buffer.submit(test_user_2.id, test_tweet_1.id, liked=True),
+        )
+
+    assert inserted == sorted(inserted)
+    assert len(inserted) == 3
+    assert updated == sorted([test_tweet_1.id, other.id])
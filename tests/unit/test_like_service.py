@@ -6,7 +6,13 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import Like, Tweet, User
-from app.services.like_service import add_like, remove_like
+from app.services.like_service import (
+    add_like,
+    get_liked_tweet_ids,
+    get_likers_sample,
+    get_tweet_likers,
+    remove_like,
+)
 
 
 @pytest.mark.anyio
@@ -23,6 +29,9 @@ async def test_add_like_new(
     )
     assert like is not None
 
+    await session.refresh(test_tweet_1)
+    assert test_tweet_1.like_count == 1
+
 
 @pytest.mark.anyio
 async def test_add_like_already_exists(
@@ -35,26 +44,29 @@ async def test_add_like_already_exists(
     result = await add_like(
         session=session, user_id=test_user_1.id, tweet_id=test_tweet_1.id
     )
-    assert result is True
+    assert result is False
+
+    await session.refresh(test_tweet_1)
+    assert test_tweet_1.like_count == 0
 
 
 @pytest.mark.anyio
 async def test_add_like_exception(caplog):
     # Создаём мок-сессию
     mock_session = AsyncMock()
-    mock_result = MagicMock()
+    mock_session.bind.dialect.name = "sqlite"
+    mock_session.execute.return_value = MagicMock()
 
     # Имитируем выброс исключения при commit()
-    mock_result.scalar_one_or_none.return_value = None
-    mock_session.execute.return_value = mock_result
-
     mock_session.commit.side_effect = SQLAlchemyError("DB commit failed")
 
     with caplog.at_level(logging.ERROR):
-        result = await add_like(session=mock_session, tweet_id=1, user_id=1)
-        assert result is False
+        with pytest.raises(SQLAlchemyError):
+            await add_like(session=mock_session, tweet_id=1, user_id=1)
         assert "Failed to add like" in caplog.text
 
+    mock_session.rollback.assert_awaited()
+
 
 @pytest.mark.anyio
 async def test_remove_like_exists(
@@ -74,6 +86,9 @@ async def test_remove_like_exists(
     )
     assert like is None
 
+    await session.refresh(test_tweet_1)
+    assert test_tweet_1.like_count == 0
+
 
 @pytest.mark.anyio
 async def test_remove_like_not_exists(
@@ -82,22 +97,92 @@ async def test_remove_like_not_exists(
     result = await remove_like(
         session=session, tweet_id=test_tweet_1.id, user_id=test_user_1.id
     )
-    assert result is True
+    assert result is False
+
+
+@pytest.mark.anyio
+async def test_remove_like_twice_keeps_counter(
+    session: AsyncSession, test_user_1: User, test_tweet_1: Tweet
+):
+    await add_like(
+        session=session, tweet_id=test_tweet_1.id, user_id=test_user_1.id
+    )
+
+    for _ in range(2):
+        await remove_like(
+            session=session, tweet_id=test_tweet_1.id, user_id=test_user_1.id
+        )
+
+    await session.refresh(test_tweet_1)
+    assert test_tweet_1.like_count == 0
 
 
 @pytest.mark.anyio
 async def test_remove_like_exception(caplog):
     # Создаём мок-сессию
     mock_session = AsyncMock()
-    mock_result = MagicMock()
+    mock_session.execute.return_value = MagicMock()
 
     # Имитируем выброс исключения при commit()
-    mock_result.scalar_one_or_none.return_value = Like()
-    mock_session.execute.return_value = mock_result
-
     mock_session.commit.side_effect = SQLAlchemyError("DB commit failed")
 
     with caplog.at_level(logging.ERROR):
-        result = await remove_like(session=mock_session, tweet_id=1, user_id=1)
-        assert result is False
+        with pytest.raises(SQLAlchemyError):
+            await remove_like(session=mock_session, tweet_id=1, user_id=1)
         assert "Failed to remove like" in caplog.text
+
+    mock_session.rollback.assert_awaited()
+
+
+@pytest.mark.anyio
+async def test_get_likers_sample(
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    for user_id in (test_user_1.id, test_user_2.id):
+        await add_like(
+            session=session, tweet_id=test_tweet_1.id, user_id=user_id
+        )
+
+    sample = await get_likers_sample(
+        session=session, tweet_ids=[test_tweet_1.id, 999], per_tweet=1
+    )
+    assert sample == {
+        test_tweet_1.id: [{"user_id": test_user_1.id, "name": "user_1"}]
+    }
+
+    liked = await get_liked_tweet_ids(
+        session=session, user_id=test_user_2.id, tweet_ids=[test_tweet_1.id]
+    )
+    assert liked == {test_tweet_1.id}
+
+
+@pytest.mark.anyio
+async def test_get_tweet_likers_pagination(
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    for user_id in (test_user_1.id, test_user_2.id):
+        await add_like(
+            session=session, tweet_id=test_tweet_1.id, user_id=user_id
+        )
+
+    page = await get_tweet_likers(
+        session=session, tweet_id=test_tweet_1.id, limit=1
+    )
+    assert page["likes"] == [{"user_id": test_user_1.id, "name": "user_1"}]
+
+    page = await get_tweet_likers(
+        session=session,
+        tweet_id=test_tweet_1.id,
+        limit=1,
+        cursor=page["next_cursor"],
+    )
+    assert page["likes"] == [{"user_id": test_user_2.id, "name": "user_2"}]
+    assert page["next_cursor"] is None
+
+    assert await get_tweet_likers(session=session, tweet_id=999) is None
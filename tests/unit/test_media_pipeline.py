@@ -0,0 +1,121 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models import Media
+from app.services.media_pipeline import MediaPipeline, variant_url
+from app.services.media_service import upload_media
+from app.utils.file_storage import StagedUpload, media_key
+from app.utils.images import render_variants
+
+
+def make_image(
+    path, size=(800, 600), mode="RGB", fmt="JPEG", color="red"
+) -> bytes:
+    Image.new(mode, size, color).save(path, fmt)
+
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_render_variants_skips_upscaling(tmp_path):
+    source = tmp_path / "photo.jpg"
+    make_image(source)
+    small = str(tmp_path / "photo.w320.webp")
+    large = str(tmp_path / "photo.w1080.webp")
+
+    rendered = render_variants(str(source), [(320, small), (1080, large)], 80)
+
+    assert rendered == {320: small}
+    assert not os.path.exists(large)
+
+    with Image.open(small) as image:
+        assert image.format == "WEBP"
+        assert image.size == (320, 240)
+
+
+def test_render_variants_keeps_alpha(tmp_path):
+    source = tmp_path / "logo.png"
+    make_image(source, mode="RGBA", fmt="PNG", color=(255, 0, 0, 128))
+    target = str(tmp_path / "logo.w320.webp")
+
+    render_variants(str(source), [(320, target)], 80)
+
+    with Image.open(target) as image:
+        assert image.mode == "RGBA"
+
+
+def test_variant_url():
+    assert variant_url("/media/ab/cd/abcd.jpg", 320) == (
+        "/media/ab/cd/abcd.w320.webp"
+    )
+
+
+@pytest.mark.anyio
+async def test_pipeline_records_variants(
+    session: AsyncSession, local_storage, tmp_path
+):
+    temp_path = str(tmp_path / ".upload-a.part")
+    content = make_image(temp_path)
+    upload = StagedUpload(
+        temp_path=temp_path,
+        content_hash=hashlib.sha256(content).hexdigest(),
+        size=len(content),
+        ext=".jpg",
+        dest_folder=str(tmp_path),
+    )
+    media_id = await upload_media(session=session, upload=upload)
+
+    pipeline = MediaPipeline(
+        async_sessionmaker(bind=session.bind, expire_on_commit=False),
+        workers=1,
+        widths=(320,),
+        backend=local_storage,
+    )
+    pipeline.start(executor=ThreadPoolExecutor(max_workers=1))
+
+    try:
+        assert pipeline.submit(upload.content_hash, upload.url) is True
+        # Файл уже в очереди: повторная постановка ничего не делает
+        assert pipeline.submit(upload.content_hash, upload.url) is True
+        await pipeline.join()
+    finally:
+        await pipeline.close()
+
+    media = await session.get(Media, media_id)
+    await session.refresh(media)
+
+    small = variant_url(upload.url, 320)
+    assert media.variants == {"320": small}
+    assert await local_storage.exists(media_key(small))
+
+    stats = pipeline.stats()
+    assert stats["processed"] == 1
+    assert stats["failed"] == 0
+    assert stats["queued"] == 0
+
+
+@pytest.mark.anyio
+async def test_pipeline_skips_non_images_and_drops_when_full(
+    session: AsyncSession,
+):
+    pipeline = MediaPipeline(
+        async_sessionmaker(bind=session.bind), workers=1, queue_size=1
+    )
+    # Без задач, разбирающих очередь: она заполняется первой же задачей
+    pipeline.start(executor=ThreadPoolExecutor(max_workers=1))
+    for task in pipeline._tasks:
+        task.cancel()
+
+    try:
+        assert pipeline.submit("a" * 64, "/media/aa/aa/clip.mp4") is False
+        assert pipeline.submit("b" * 64, "/media/bb/bb/one.png") is True
+        assert pipeline.submit("c" * 64, "/media/cc/cc/two.png") is False
+    finally:
+        await pipeline.close()
+
+    assert pipeline.stats()["dropped"] == 1
@@ -1,41 +1,262 @@
+import hashlib
 import logging
+import os
 from unittest.mock import AsyncMock
 
 import pytest
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Media
-from app.services.media_service import upload_media
+from app.db.models import Media, MediaBlob, Tweet, User
+from app.services import media_service
+from app.services.media_service import (
+    purge_media,
+    release_media,
+    upload_media,
+)
+from app.utils.file_storage import StagedUpload, media_key
+
+
+def make_upload(folder, content: bytes, name: str) -> StagedUpload:
+    temp_path = os.path.join(str(folder), f".upload-{name}.part")
+
+    with open(temp_path, "wb") as f:
+        f.write(content)
+
+    return StagedUpload(
+        temp_path=temp_path,
+        content_hash=hashlib.sha256(content).hexdigest(),
+        size=len(content),
+        ext=".jpg",
+        dest_folder=str(folder),
+    )
+
+
+async def chunks_of(data: bytes):
+    yield data
 
 
 @pytest.mark.anyio
-async def test_upload_media(session: AsyncSession):
-    file_path = "/media/test.jpg"
-    media_id = await upload_media(session=session, file_path=file_path)
+async def test_upload_media(session: AsyncSession, local_storage, tmp_path):
+    upload = make_upload(tmp_path, b"image", "a")
+    media_id = await upload_media(session=session, upload=upload)
 
     assert media_id is not None
 
     media = await session.get(Media, media_id)
 
     assert media is not None
-    assert media.file_path == file_path
+    assert media.file_path == upload.url
+    assert media.content_hash == upload.content_hash
     assert media.tweet_id is None
+    assert await local_storage.exists(media_key(upload.url))
+    assert not os.path.exists(upload.temp_path)
+
+
+@pytest.mark.anyio
+async def test_upload_media_deduplicates(
+    session: AsyncSession, local_storage, tmp_path
+):
+    first = await upload_media(
+        session=session, upload=make_upload(tmp_path, b"meme", "a")
+    )
+    second = await upload_media(
+        session=session, upload=make_upload(tmp_path, b"meme", "b")
+    )
+
+    rows = (
+        await session.execute(
+            select(Media.file_path).where(Media.id.in_([first, second]))
+        )
+    ).scalars()
+    blob = (await session.execute(select(MediaBlob))).scalar_one()
+
+    assert set(rows) == {blob.file_path}
+    assert blob.ref_count == 2
+    # На диске один файл: временные файлы обеих загрузок удалены
+    assert [name for _, _, files in os.walk(tmp_path) for name in files] == [
+        os.path.basename(blob.file_path)
+    ]
+
+
+@pytest.mark.anyio
+async def test_upload_media_stores_file_outside_transaction(
+    mocker, session: AsyncSession, local_storage, tmp_path
+):
+    put_file = local_storage.put_file
+
+    async def put_outside_transaction(key, path):
+        assert not session.in_transaction()
+        return await put_file(key, path)
+
+    mocker.patch.object(
+        local_storage, "put_file", side_effect=put_outside_transaction
+    )
+    upload = make_upload(tmp_path, b"image", "a")
+
+    await upload_media(session=session, upload=upload)
+
+    local_storage.put_file.assert_awaited_once()
+    assert await local_storage.exists(media_key(upload.url))
+
+
+@pytest.mark.anyio
+async def test_upload_media_restores_file_purged_during_upload(
+    mocker, session: AsyncSession, local_storage, tmp_path
+):
+    # Файл остался от удалённой загрузки и исчезает, пока идёт транзакция
+    upload = make_upload(tmp_path, b"image", "a")
+    key = media_key(upload.url)
+    await local_storage.put(key, chunks_of(b"image"))
+    acquire_blob = media_service._acquire_blob
+
+    async def purge_then_acquire(session, upload):
+        await local_storage.delete(key)
+        return await acquire_blob(session=session, upload=upload)
+
+    mocker.patch(
+        "app.services.media_service._acquire_blob",
+        side_effect=purge_then_acquire,
+    )
+
+    await upload_media(session=session, upload=upload)
+
+    assert await local_storage.exists(key)
+    assert not os.path.exists(upload.temp_path)
+
+
+@pytest.mark.anyio
+async def test_upload_media_reuses_file_with_other_extension(
+    session: AsyncSession, local_storage, tmp_path
+):
+    first = make_upload(tmp_path, b"meme", "a")
+    second = make_upload(tmp_path, b"meme", "b")
+    second.ext = ".jpeg"
+
+    await upload_media(session=session, upload=first)
+    media_id = await upload_media(session=session, upload=second)
+
+    media = await session.get(Media, media_id)
+    assert media is not None
+    assert media.file_path == first.url
+    # Объект, записанный второй загрузкой до транзакции, удалён
+    assert not await local_storage.exists(media_key(second.url))
+    assert not os.path.exists(second.temp_path)
 
 
 @pytest.mark.anyio
-async def test_upload_media_exception(caplog):
+async def test_release_media_frees_file_with_last_reference(
+    session: AsyncSession, test_user_1: User, local_storage, tmp_path
+):
+    tweets = [
+        Tweet(content=f"tweet_{i}", author_id=test_user_1.id) for i in (1, 2)
+    ]
+    session.add_all(tweets)
+    await session.flush()
+
+    for i, tweet in enumerate(tweets):
+        media_id = await upload_media(
+            session=session, upload=make_upload(tmp_path, b"logo", str(i))
+        )
+        media = await session.get(Media, media_id)
+        media.tweet_id = tweet.id
+
+    await session.commit()
+
+    blob = (await session.execute(select(MediaBlob))).scalar_one()
+    path = local_storage.local_path(media_key(blob.file_path))
+
+    assert await release_media(session, [tweets[0].id]) == {}
+    await session.refresh(blob)
+    assert blob.ref_count == 1
+    assert os.path.exists(path)
+
+    released = await release_media(session, [tweets[1].id])
+    assert released == {blob.content_hash: []}
+    # До commit удаления твитов файл остаётся на месте
+    assert os.path.exists(path)
+
+    await session.commit()
+    assert await purge_media(session, released) == [blob.file_path]
+    assert not os.path.exists(path)
+    assert (await session.execute(select(MediaBlob))).first() is None
+
+
+@pytest.mark.anyio
+async def test_release_media_keeps_file_after_rollback(
+    session: AsyncSession, test_user_1: User, local_storage, tmp_path
+):
+    tweet = Tweet(content="tweet", author_id=test_user_1.id)
+    session.add(tweet)
+    await session.flush()
+
+    media_id = await upload_media(
+        session=session, upload=make_upload(tmp_path, b"logo", "0")
+    )
+    media = await session.get(Media, media_id)
+    media.tweet_id = tweet.id
+    await session.commit()
+
+    blob = (await session.execute(select(MediaBlob))).scalar_one()
+    path = local_storage.local_path(media_key(blob.file_path))
+
+    assert await release_media(session, [tweet.id]) == {blob.content_hash: []}
+    await session.rollback()
+
+    assert os.path.exists(path)
+    await session.refresh(blob)
+    assert blob.ref_count == 1
+
+
+@pytest.mark.anyio
+async def test_purge_media_keeps_reacquired_file(
+    session: AsyncSession, test_user_1: User, local_storage, tmp_path
+):
+    tweet = Tweet(content="tweet", author_id=test_user_1.id)
+    session.add(tweet)
+    await session.flush()
+
+    media_id = await upload_media(
+        session=session, upload=make_upload(tmp_path, b"logo", "0")
+    )
+    media = await session.get(Media, media_id)
+    media.tweet_id = tweet.id
+    await session.commit()
+
+    released = await release_media(session, [tweet.id])
+    await session.delete(media)
+    await session.commit()
+
+    # Между commit удаления и очисткой то же содержимое загрузили снова
+    await upload_media(
+        session=session, upload=make_upload(tmp_path, b"logo", "1")
+    )
+
+    blob = (await session.execute(select(MediaBlob))).scalar_one()
+    assert await purge_media(session, released) == []
+    assert os.path.exists(local_storage.local_path(media_key(blob.file_path)))
+    await session.refresh(blob)
+    assert blob.ref_count == 1
+
+
+@pytest.mark.anyio
+async def test_upload_media_exception(caplog, local_storage, tmp_path):
     # Создаём мок-сессию
     mock_session = AsyncMock()
+    mock_session.bind.dialect.name = "sqlite"
 
-    # Имитируем выброс исключения при commit()
-    mock_session.commit.side_effect = SQLAlchemyError("DB commit failed")
+    # Имитируем выброс исключения при обращении к БД
+    mock_session.execute.side_effect = SQLAlchemyError("DB commit failed")
+    upload = make_upload(tmp_path, b"image", "a")
 
     with pytest.raises(SQLAlchemyError):
         with caplog.at_level(logging.ERROR):
-            result = await upload_media(
-                session=mock_session, file_path="/media/test.jpg"
-            )
-            assert result is None
-            assert "Failed to upload media" in caplog.text
-            assert "DB commit failed" in caplog.text
+            await upload_media(session=mock_session, upload=upload)
+
+    assert "Failed to upload media" in caplog.text
+    assert "DB commit failed" in caplog.text
+    mock_session.rollback.assert_awaited_once()
+    assert not os.path.exists(upload.temp_path)
+    # Объект без ссылок остаётся и переиспользуется следующей загрузкой
+    assert await local_storage.exists(media_key(upload.url))
@@ -0,0 +1,18 @@
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(3, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == (3, 42)
+
+
+@pytest.mark.parametrize(
+    "cursor", ["garbage!", encode_cursor(1), "InN0cmluZyI", "WzEsdHJ1ZV0"]
+)
+def test_decode_cursor_invalid(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
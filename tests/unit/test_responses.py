@@ -0,0 +1,22 @@
+import json
+
+from app.core.responses import FastJSONResponse, api_response
+
+
+def test_api_response_shape():
+    response = api_response(result=True, data={"tweets": [], "cursor": None})
+
+    assert isinstance(response, FastJSONResponse)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {
+        "result": True,
+        "data": {"tweets": [], "cursor": None},
+        "error_type": None,
+        "error_message": None,
+    }
+
+
+def test_fast_json_response_keeps_unicode():
+    response = FastJSONResponse({"content": "Привет"})
+
+    assert json.loads(response.body) == {"content": "Привет"}
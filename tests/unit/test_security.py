@@ -1,7 +1,16 @@
+from unittest.mock import AsyncMock
+
 import pytest
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_current_user
+from app.core.cache import cache
+from app.core.security import (
+    auth_key,
+    get_current_user,
+    invalidate_api_keys,
+    negative_auth_cache,
+)
 from app.db.models import User
 
 
@@ -26,3 +35,75 @@ async def test_get_current_user_invalid_key(
         await get_current_user(api_key="invalid_key", session=session)
     assert exc_info.value.status_code == 403
     assert exc_info.value.detail == "Invalid API key"
+
+
+@pytest.mark.anyio
+async def test_get_current_user_is_cached(
+    session: AsyncSession, test_user_1: User
+):
+    await get_current_user(api_key="key_1", session=session)
+
+    mock_session = AsyncMock()
+    user = await get_current_user(api_key="key_1", session=mock_session)
+
+    assert user.id == test_user_1.id
+    assert user.api_key == "key_1"
+    mock_session.execute.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_get_current_user_negative_cache(
+    session: AsyncSession, test_user_1: User
+):
+    with pytest.raises(HTTPException):
+        await get_current_user(api_key="new_key", session=session)
+
+    session.add(User(name="new_user", api_key="new_key"))
+    await session.commit()
+
+    # Отрицательный результат закэширован до инвалидации
+    with pytest.raises(HTTPException):
+        await get_current_user(api_key="new_key", session=session)
+
+    await invalidate_api_keys("new_key")
+    user = await get_current_user(api_key="new_key", session=session)
+
+    assert user.name == "new_user"
+
+
+@pytest.mark.anyio
+async def test_invalidate_api_keys_on_rotation(
+    session: AsyncSession, test_user_1: User
+):
+    await get_current_user(api_key="key_1", session=session)
+
+    test_user_1.api_key = "rotated_key"
+    await session.commit()
+    await invalidate_api_keys("key_1")
+
+    with pytest.raises(HTTPException):
+        await get_current_user(api_key="key_1", session=session)
+    assert (
+        await get_current_user("rotated_key", session)
+    ).id == test_user_1.id
+
+
+@pytest.mark.anyio
+async def test_invalid_keys_stay_out_of_shared_cache(
+    monkeypatch, session: AsyncSession, test_user_1: User
+):
+    monkeypatch.setattr(negative_auth_cache, "maxsize", 2)
+    await get_current_user(api_key="key_1", session=session)
+
+    for i in range(5):
+        with pytest.raises(HTTPException):
+            await get_current_user(api_key=f"random_{i}", session=session)
+
+    # Перебор вытесняет только отрицательные записи
+    assert len(negative_auth_cache) == 2
+    assert await cache.get(auth_key("random_4")) is None
+    assert await cache.get(auth_key("key_1")) is not None
+
+
+def test_auth_key_does_not_contain_api_key():
+    assert "key_1" not in auth_key("key_1")
@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import Like
+from app.db.statements import insert_ignore
+
+
+def session_for(dialect: str) -> MagicMock:
+    session = MagicMock()
+    session.bind.dialect.name = dialect
+    return session
+
+
+def test_insert_ignore_postgresql():
+    stmt = insert_ignore(
+        session_for("postgresql"), Like, user_id=1, tweet_id=2
+    )
+    sql = str(
+        stmt.returning(Like.tweet_id).compile(dialect=postgresql.dialect())
+    )
+
+    assert "ON CONFLICT DO NOTHING RETURNING likes.tweet_id" in sql
+
+
+def test_insert_ignore_unsupported_dialect():
+    with pytest.raises(NotImplementedError):
+        insert_ignore(session_for("mysql"), Like, user_id=1, tweet_id=2)
@@ -0,0 +1,220 @@
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+from botocore.exceptions import ClientError
+from moto.server import ThreadedMotoServer
+
+from app.core.storage import (
+    LocalStorageBackend,
+    S3StorageBackend,
+    StorageBackend,
+    StorageError,
+    create_storage_backend,
+)
+
+KEY = "ab/cd/abcd.jpg"
+CONTENT = b"0123456789" * 3
+
+
+async def chunks(data: bytes, size: int = 4):
+    for start in range(0, len(data), size):
+        end = start + size
+        yield data[start:end]
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    """Сервер moto, эмулирующий S3."""
+    server = ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+
+    yield f"http://{host}:{port}"
+
+    server.stop()
+
+
+@pytest.fixture
+async def s3_backend(mocker, s3_endpoint):
+    # moto, как и S3, не принимает части меньше 5 МиБ
+    mocker.patch("moto.s3.models.S3_UPLOAD_PART_MIN_SIZE", 1)
+    httpx.post(f"{s3_endpoint}/moto-api/reset")
+    backend = make_s3_backend(s3_endpoint)
+    client = await backend.client()
+    await client.create_bucket(Bucket="media")
+
+    yield backend
+
+    await backend.close()
+
+
+def make_s3_backend(endpoint: str, **kwargs) -> S3StorageBackend:
+    options = {
+        "endpoint_url": endpoint,
+        "access_key_id": "key",
+        "secret_access_key": "secret",
+        "public_url": None,
+        "part_size": 8,
+        **kwargs,
+    }
+
+    return S3StorageBackend("s3://media/prod", **options)
+
+
+async def list_uploads(backend: S3StorageBackend):
+    client = await backend.client()
+    response = await client.list_multipart_uploads(Bucket="media")
+
+    return response.get("Uploads", [])
+
+
+async def check_backend_contract(backend: StorageBackend):
+    assert await backend.exists(KEY) is False
+    assert await backend.put(KEY, chunks(CONTENT)) == len(CONTENT)
+    assert await backend.exists(KEY) is True
+
+    stored = await backend.stat(KEY)
+    assert stored is not None
+    assert stored.size == len(CONTENT)
+
+    assert b"".join([c async for c in backend.get(KEY)]) == CONTENT
+    assert b"".join([c async for c in backend.get(KEY, 5, 14)]) == (
+        CONTENT[5:15]
+    )
+
+    assert await backend.delete(KEY) is True
+    assert await backend.stat(KEY) is None
+
+    with pytest.raises(FileNotFoundError):
+        async for _ in backend.get(KEY):
+            pass
+
+    assert backend.stats()["puts"] == 1
+    assert backend.stats()["bytes_put"] == len(CONTENT)
+
+
+@pytest.mark.anyio
+async def test_local_backend(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+
+    await check_backend_contract(backend)
+
+    assert await backend.url(KEY) is None
+    assert await backend.delete(KEY) is False
+    # Временные файлы записи не остаются на диске
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+
+
+@pytest.mark.anyio
+async def test_local_backend_put_file_moves_file(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    source = tmp_path / ".upload-a.part"
+    source.write_bytes(CONTENT)
+
+    assert await backend.put_file(KEY, str(source)) == len(CONTENT)
+    assert not source.exists()
+    assert (tmp_path / "ab" / "cd" / "abcd.jpg").read_bytes() == CONTENT
+
+
+@pytest.mark.anyio
+async def test_s3_backend(mocker, s3_backend):
+    s3_backend.part_size = len(CONTENT) + 1
+    client = await s3_backend.client()
+    put_object = mocker.spy(client, "put_object")
+    create_upload = mocker.spy(client, "create_multipart_upload")
+
+    await check_backend_contract(s3_backend)
+
+    # Файл меньше части загружается одним PutObject
+    put_object.assert_called_once()
+    assert put_object.call_args.kwargs["Key"] == "prod/ab/cd/abcd.jpg"
+    create_upload.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_s3_backend_multipart_upload(mocker, s3_backend, tmp_path):
+    client = await s3_backend.client()
+    upload_part = mocker.spy(client, "upload_part")
+    source = tmp_path / "video.part"
+    source.write_bytes(CONTENT)
+
+    assert await s3_backend.put_file(KEY, str(source)) == len(CONTENT)
+
+    response = await client.get_object(Bucket="media", Key=f"prod/{KEY}")
+    async with response["Body"] as body:
+        assert await body.read() == CONTENT
+    # 30 байт частями по 8: четыре части
+    assert [len(c.kwargs["Body"]) for c in upload_part.call_args_list] == [
+        8,
+        8,
+        8,
+        6,
+    ]
+    assert await list_uploads(s3_backend) == []
+    assert not source.exists()
+
+
+@pytest.mark.anyio
+async def test_s3_backend_aborts_failed_multipart_upload(mocker, s3_backend):
+    client = await s3_backend.client()
+    upload_part = client.upload_part
+
+    async def fail_second_part(**kwargs):
+        if kwargs["PartNumber"] == 2:
+            raise ClientError(
+                {"Error": {"Code": "InternalError"}}, "UploadPart"
+            )
+        return await upload_part(**kwargs)
+
+    mocker.patch.object(client, "upload_part", side_effect=fail_second_part)
+
+    with pytest.raises(StorageError):
+        await s3_backend.put(KEY, chunks(CONTENT))
+
+    assert await s3_backend.stat(KEY) is None
+    assert await list_uploads(s3_backend) == []
+
+
+@pytest.mark.anyio
+async def test_s3_backend_aborts_upload_on_broken_stream(s3_backend):
+    async def broken_chunks():
+        yield CONTENT
+        raise ConnectionResetError
+
+    with pytest.raises(ConnectionResetError):
+        await s3_backend.put(KEY, broken_chunks())
+
+    assert await s3_backend.stat(KEY) is None
+    assert await list_uploads(s3_backend) == []
+
+
+@pytest.mark.anyio
+async def test_s3_backend_urls(s3_endpoint):
+    backend = make_s3_backend(s3_endpoint, presign_expires=86400)
+
+    url = urlparse(await backend.url("ab/cd/x.jpg"))
+    query = parse_qs(url.query)
+
+    assert url.path == "/media/prod/ab/cd/x.jpg"
+    assert query["X-Amz-Expires"] == ["86400"]
+    assert query["X-Amz-Credential"][0].startswith("key/")
+    assert "X-Amz-Signature" in query
+    await backend.close()
+
+    public = make_s3_backend(s3_endpoint, public_url="https://cdn.example/m/")
+    assert await public.url("ab/cd/x.jpg") == (
+        "https://cdn.example/m/ab/cd/x.jpg"
+    )
+
+
+def test_create_storage_backend():
+    assert isinstance(create_storage_backend("local://"), LocalStorageBackend)
+
+    backend = create_storage_backend("s3://media/prod")
+    assert isinstance(backend, S3StorageBackend)
+    assert backend.bucket == "media"
+    assert backend.prefix == "prod"
+
+    with pytest.raises(ValueError):
+        create_storage_backend("ftp://media")
@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.db.models import Follower, User
+from app.services import suggestion_service
+from app.services.follow_graph import FollowGraph
+from app.services.follower_service import follow_user
+from app.services.suggestion_service import (
+    get_suggestions,
+    rank_friends_of_friends,
+    suggestions_key,
+)
+
+# me -> a, b, c; a -> x, y; b -> x, me; c -> x, y, z, a
+EDGES = [
+    ("me", "a"),
+    ("me", "b"),
+    ("me", "c"),
+    ("a", "x"),
+    ("a", "y"),
+    ("b", "x"),
+    ("b", "me"),
+    ("c", "x"),
+    ("c", "y"),
+    ("c", "z"),
+    ("c", "a"),
+]
+
+
+@pytest.fixture
+async def graph_users(session: AsyncSession):
+    users = {
+        name: User(name=name, api_key=name)
+        for name in "me a b c x y z".split()
+    }
+    session.add_all(users.values())
+    await session.flush()
+    session.add_all(
+        Follower(follower_id=users[f].id, following_id=users[t].id)
+        for f, t in EDGES
+    )
+    await session.commit()
+
+    return {name: user.id for name, user in users.items()}
+
+
+def expected(ids):
+    return [
+        {"id": ids["x"], "name": "x", "mutual_count": 3},
+        {"id": ids["y"], "name": "y", "mutual_count": 2},
+        {"id": ids["z"], "name": "z", "mutual_count": 1},
+    ]
+
+
+@pytest.mark.anyio
+async def test_suggestions_with_sql(session: AsyncSession, graph_users):
+    assert await get_suggestions(session, graph_users["me"]) == expected(
+        graph_users
+    )
+    assert await cache.get(suggestions_key(graph_users["me"])) is not None
+
+
+@pytest.mark.anyio
+async def test_suggestions_with_graph(
+    session: AsyncSession, graph_users, monkeypatch
+):
+    graph = FollowGraph()
+    await graph.load(session)
+    monkeypatch.setattr(suggestion_service, "follow_graph", graph)
+
+    result = await get_suggestions(session, graph_users["me"], limit=2)
+
+    assert result == expected(graph_users)[:2]
+
+
+@pytest.mark.anyio
+async def test_suggestions_cache_invalidated_on_follow(
+    session: AsyncSession, graph_users
+):
+    me = graph_users["me"]
+    await get_suggestions(session, me)
+
+    await follow_user(session, follower_id=me, following_id=graph_users["x"])
+
+    assert await cache.get(suggestions_key(me)) is None
+    assert [u["name"] for u in await get_suggestions(session, me)] == [
+        "y",
+        "z",
+    ]
+
+
+def test_rank_friends_of_friends_time_budget():
+    graph = FollowGraph()
+    graph.add_many((1, source) for source in range(2, 202))
+    graph.add_many((source, 500) for source in range(2, 202))
+
+    ranked, partial = rank_friends_of_friends(graph, 1, budget=0)
+
+    assert partial is True
+    assert ranked == [(500, 64)]
+
+    ranked, partial = rank_friends_of_friends(graph, 1, budget=10)
+
+    assert partial is False
+    assert ranked == [(500, 200)]
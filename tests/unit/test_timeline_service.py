@@ -0,0 +1,206 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import TimelineEntry, Tweet, User
+from app.schemas import CreateTweetRequest
+from app.services import feed_query, timeline_service
+from app.services.feed_query import build_page_query
+from app.services.follower_service import follow_user, unfollow_user
+from app.services.like_service import add_like
+from app.services.timeline_service import (
+    rebuild_timelines,
+    trim_oversized_timelines,
+)
+from app.services.tweet_service import create_tweet, delete_tweet
+
+
+async def timeline_of(session: AsyncSession, user_id) -> set:
+    result = await session.execute(
+        select(TimelineEntry.tweet_id).where(TimelineEntry.user_id == user_id)
+    )
+    return set(result.scalars().all())
+
+
+@pytest.mark.anyio
+async def test_create_tweet_fans_out_to_followers(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+
+    tweet_id = await create_tweet(
+        session=session,
+        request=CreateTweetRequest(tweet_data="fan-out"),
+        author_id=test_user_1.id,
+    )
+
+    assert await timeline_of(session, test_user_2.id) == {tweet_id}
+    assert await timeline_of(session, test_user_1.id) == set()
+
+
+@pytest.mark.anyio
+async def test_follow_backfills_and_unfollow_cleans_timeline(
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+    assert await timeline_of(session, test_user_2.id) == {test_tweet_1.id}
+
+    await unfollow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+    assert await timeline_of(session, test_user_2.id) == set()
+
+
+@pytest.mark.anyio
+async def test_delete_tweet_removes_timeline_entries(
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+
+    await delete_tweet(
+        session=session,
+        tweet_id=test_tweet_1.id,
+        current_user_id=test_user_1.id,
+    )
+
+    assert await timeline_of(session, test_user_2.id) == set()
+
+
+@pytest.mark.anyio
+async def test_rebuild_timelines(
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+    session.add(TimelineEntry(user_id=test_user_2.id, tweet_id=999))
+    await session.commit()
+
+    count = await rebuild_timelines(session=session, user_id=test_user_2.id)
+    assert count == 1
+    assert await timeline_of(session, test_user_2.id) == {test_tweet_1.id}
+
+    count = await rebuild_timelines(session=session)
+    assert count == 1
+
+
+async def post(session: AsyncSession, author: User, count: int) -> list:
+    tweets = [
+        Tweet(content=f"tweet_{i}", author_id=author.id) for i in range(count)
+    ]
+    session.add_all(tweets)
+    await session.commit()
+
+    return [tweet.id for tweet in tweets]
+
+
+@pytest.mark.anyio
+async def test_follow_and_rebuild_keep_newest_tweets(
+    monkeypatch,
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+):
+    monkeypatch.setattr(timeline_service, "TIMELINE_MAX_ENTRIES", 3)
+    tweet_ids = await post(session, test_user_1, 5)
+
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+    assert await timeline_of(session, test_user_2.id) == set(tweet_ids[-3:])
+
+    assert await rebuild_timelines(session=session) == 3
+    assert await timeline_of(session, test_user_2.id) == set(tweet_ids[-3:])
+
+
+@pytest.mark.anyio
+async def test_trim_job_trims_only_oversized_timelines(
+    monkeypatch,
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+):
+    monkeypatch.setattr(timeline_service, "TIMELINE_MAX_ENTRIES", 3)
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+
+    tweet_ids = [
+        await create_tweet(
+            session=session,
+            request=CreateTweetRequest(tweet_data=f"tweet_{i}"),
+            author_id=test_user_1.id,
+        )
+        for i in range(5)
+    ]
+    session.add(TimelineEntry(user_id=test_user_1.id, tweet_id=tweet_ids[0]))
+    await session.commit()
+
+    # Fan-out не обрезает ленты: это делает периодическая задача
+    assert await timeline_of(session, test_user_2.id) == set(tweet_ids)
+
+    trimmed = await trim_oversized_timelines(session=session, batch_size=1)
+
+    assert trimmed == 2
+    assert await timeline_of(session, test_user_2.id) == set(tweet_ids[-3:])
+    assert await timeline_of(session, test_user_1.id) == {tweet_ids[0]}
+
+
+@pytest.mark.anyio
+async def test_popular_feed_ranks_only_latest_entries(
+    monkeypatch,
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+):
+    monkeypatch.setattr(feed_query, "TIMELINE_MAX_ENTRIES", 3)
+    tweet_ids = await post(session, test_user_1, 5)
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+    oldest, newest = tweet_ids[0], tweet_ids[-1]
+    await add_like(session=session, tweet_id=oldest, user_id=test_user_2.id)
+    await add_like(session=session, tweet_id=newest, user_id=test_user_2.id)
+
+    result = await session.execute(
+        build_page_query(user_id=test_user_2.id, limit=10)
+    )
+
+    # Самый старый твит остаётся в ленте, но не входит в окно ранжирования
+    assert [tweet_id for tweet_id, _ in result.all()] == [
+        newest,
+        tweet_ids[3],
+        tweet_ids[2],
+    ]
+    assert oldest in await timeline_of(session, test_user_2.id)
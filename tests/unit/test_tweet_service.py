@@ -7,12 +7,18 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.db.models import Follower, Media, Tweet, User
+from app.core.cache import cache
+from app.db.models import Media, Tweet, User
+from app.services import tweet_service
+from app.services.feed_cache import snapshot_key
+from app.services.follower_service import follow_user
+from app.services.like_service import add_like
 from app.services.tweet_service import (
     create_tweet,
     delete_tweet,
     get_user_feed,
 )
+from app.utils.pagination import decode_cursor, encode_cursor
 
 
 @pytest.mark.anyio
@@ -67,6 +73,7 @@ async def test_create_tweet_with_media(
 @pytest.mark.anyio
 async def test_create_tweet_exception(caplog):
     mock_session = AsyncMock()
+    mock_session.execute.return_value = MagicMock()
     mock_session.commit.side_effect = SQLAlchemyError("DB commit failed")
 
     request = type(
@@ -119,11 +126,13 @@ async def test_delete_tweet_wrong_user(
 
 @pytest.mark.anyio
 async def test_get_user_tweet_empty(session: AsyncSession, test_user_1: User):
-    tweets = await get_user_feed(session=session, user_id=test_user_1.id)
+    page = await get_user_feed(session=session, user_id=test_user_1.id)
+    tweets = page["tweets"]
 
     assert isinstance(tweets, list)
 
     assert len(tweets) == 0
+    assert page["next_cursor"] is None
 
 
 @pytest.mark.anyio
@@ -157,11 +166,14 @@ async def test_get_user_feed_with_following(
     test_tweet_1: Tweet,
 ):
     # subscribe user_2 on user_1
-    follow = Follower(follower_id=test_user_2.id, following_id=test_user_1.id)
-    session.add(follow)
-    await session.commit()
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
 
-    tweets = await get_user_feed(session=session, user_id=test_user_2.id)
+    page = await get_user_feed(session=session, user_id=test_user_2.id)
+    tweets = page["tweets"]
 
     assert isinstance(tweets, list)
     assert tweets[0].get("id") == test_tweet_1.id
@@ -169,6 +181,177 @@ async def test_get_user_feed_with_following(
     assert tweets[0].get("author").get("id") == test_user_1.id
 
 
+@pytest.mark.anyio
+async def test_get_user_feed_pagination(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    tweets = [
+        Tweet(content=f"tweet_{i}", author_id=test_user_1.id) for i in range(5)
+    ]
+    session.add_all(tweets)
+    await session.commit()
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+    await add_like(
+        session=session, tweet_id=tweets[1].id, user_id=test_user_2.id
+    )
+
+    seen = []
+    cursor = None
+    for _ in range(3):
+        page = await get_user_feed(
+            session=session, user_id=test_user_2.id, limit=2, cursor=cursor
+        )
+        seen.extend(tweet["id"] for tweet in page["tweets"])
+        cursor = page["next_cursor"]
+
+    assert cursor is None
+    assert seen[0] == tweets[1].id
+    assert seen[1:] == [t.id for t in reversed(tweets) if t is not tweets[1]]
+
+
+@pytest.mark.anyio
+async def test_get_user_feed_cursor_is_stable_under_likes(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    tweets = [
+        Tweet(content=f"tweet_{i}", author_id=test_user_1.id) for i in range(5)
+    ]
+    session.add_all(tweets)
+    await session.commit()
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+
+    page = await get_user_feed(
+        session=session, user_id=test_user_2.id, limit=2
+    )
+    seen = [tweet["id"] for tweet in page["tweets"]]
+
+    # Твит со второй страницы становится самым популярным между запросами
+    await add_like(
+        session=session, tweet_id=tweets[2].id, user_id=test_user_2.id
+    )
+
+    cursor = page["next_cursor"]
+    while cursor is not None:
+        page = await get_user_feed(
+            session=session, user_id=test_user_2.id, limit=2, cursor=cursor
+        )
+        seen.extend(tweet["id"] for tweet in page["tweets"])
+        cursor = page["next_cursor"]
+
+    assert seen == [t.id for t in reversed(tweets)]
+
+
+@pytest.mark.anyio
+async def test_get_user_feed_resumes_after_expired_snapshot(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    tweets = [
+        Tweet(content=f"tweet_{i}", author_id=test_user_1.id) for i in range(5)
+    ]
+    session.add_all(tweets)
+    await session.commit()
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+
+    page = await get_user_feed(
+        session=session, user_id=test_user_2.id, limit=2
+    )
+    version, *_ = decode_cursor(page["next_cursor"], 4)
+    assert version > 0
+    await cache.delete(snapshot_key(test_user_2.id))
+
+    seen = [tweet["id"] for tweet in page["tweets"]]
+    cursor = page["next_cursor"]
+    while cursor is not None:
+        page = await get_user_feed(
+            session=session, user_id=test_user_2.id, limit=2, cursor=cursor
+        )
+        seen.extend(tweet["id"] for tweet in page["tweets"])
+        cursor = page["next_cursor"]
+
+    assert seen == [t.id for t in reversed(tweets)]
+
+
+@pytest.mark.anyio
+async def test_get_user_feed_keeps_one_snapshot_per_user(
+    monkeypatch,
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+):
+    monkeypatch.setattr(tweet_service, "FEED_SNAPSHOT_PAGES", 2)
+    tweets = [
+        Tweet(content=f"tweet_{i}", author_id=test_user_1.id) for i in range(7)
+    ]
+    session.add_all(tweets)
+    await session.commit()
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+
+    first = await get_user_feed(
+        session=session, user_id=test_user_2.id, limit=2
+    )
+    # Первая страница другого размера перезаписывает снимок пользователя
+    second = await get_user_feed(
+        session=session, user_id=test_user_2.id, limit=3
+    )
+    snapshot = await cache.get(snapshot_key(test_user_2.id))
+    assert len(snapshot["keys"]) == 6
+    assert snapshot["more"] is True
+
+    # Старый курсор листает по ключу, новый — по снимку и за его концом
+    for page, limit in ((first, 2), (second, 3)):
+        seen = [tweet["id"] for tweet in page["tweets"]]
+        cursor = page["next_cursor"]
+        while cursor is not None:
+            page = await get_user_feed(
+                session=session,
+                user_id=test_user_2.id,
+                limit=limit,
+                cursor=cursor,
+            )
+            seen.extend(tweet["id"] for tweet in page["tweets"])
+            cursor = page["next_cursor"]
+
+        assert seen == [t.id for t in reversed(tweets)]
+
+
+@pytest.mark.anyio
+async def test_get_user_feed_rejects_negative_offset(
+    session: AsyncSession, test_user_1: User
+):
+    with pytest.raises(ValueError):
+        await get_user_feed(
+            session=session,
+            user_id=test_user_1.id,
+            cursor=encode_cursor(1, -2, 0, 1),
+        )
+
+
+@pytest.mark.anyio
+async def test_get_user_feed_invalid_cursor(
+    session: AsyncSession, test_user_1: User
+):
+    with pytest.raises(ValueError):
+        await get_user_feed(
+            session=session, user_id=test_user_1.id, cursor="garbage"
+        )
+
+
 @pytest.mark.anyio
 async def test_get_user_feed_exception(caplog):
     mock_session = AsyncMock()
@@ -178,5 +361,38 @@ async def test_get_user_feed_exception(caplog):
     with caplog.at_level(logging.ERROR):
         result = await get_user_feed(session=mock_session, user_id=1)
 
-        assert result == []
+        assert result == {"tweets": [], "next_cursor": None}
         assert "Failed to load feed for user" in caplog.text
+
+
+@pytest.mark.anyio
+async def test_get_user_feed_summary(
+    session: AsyncSession,
+    test_user_1: User,
+    test_user_2: User,
+    test_tweet_1: Tweet,
+):
+    await follow_user(
+        session=session,
+        follower_id=test_user_2.id,
+        following_id=test_user_1.id,
+    )
+    for user_id in (test_user_1.id, test_user_2.id):
+        await add_like(
+            session=session, tweet_id=test_tweet_1.id, user_id=user_id
+        )
+
+    page = await get_user_feed(
+        session=session, user_id=test_user_2.id, likes_mode="summary"
+    )
+    tweet = page["tweets"][0]
+
+    assert tweet["like_count"] == 2
+    assert tweet["liked_by_me"] is True
+    assert [like["user_id"] for like in tweet["likes"]] == [
+        test_user_1.id,
+        test_user_2.id,
+    ]
+
+    full = await get_user_feed(session=session, user_id=test_user_2.id)
+    assert "like_count" not in full["tweets"][0]
@@ -1,8 +1,17 @@
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import User
-from app.services.user_service import get_user_profile
+from app.core.cache import cache
+from app.core.security import auth_key
+from app.db.models import Follower, Like, Tweet, User
+from app.services.follower_service import follow_user, follow_users
+from app.services.like_service import add_like
+from app.services.user_service import (
+    delete_user,
+    get_follow_list,
+    get_relationship,
+    get_user_profile,
+)
 
 
 @pytest.mark.anyio
@@ -16,8 +25,9 @@ async def test_get_user_profile_found(
     assert user_profile is not None
     assert user_profile.get("id") == test_user_1.id
     assert user_profile.get("name") == test_user_1.name
-    assert isinstance(user_profile.get("followers"), list)
-    assert isinstance(user_profile.get("following"), list)
+    assert user_profile.get("followers_count") == 0
+    assert user_profile.get("following_count") == 0
+    assert "followers" not in user_profile
 
 
 @pytest.mark.anyio
@@ -25,3 +35,167 @@ async def test_get_user_profile_not_found(session: AsyncSession):
     user_profile = await get_user_profile(session=session, target_user_id=999)
 
     assert user_profile is None
+
+
+@pytest.mark.anyio
+async def test_get_user_profile_counts_only_by_default(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    await follow_user(
+        session, follower_id=test_user_2.id, following_id=test_user_1.id
+    )
+
+    profile = await get_user_profile(
+        session=session, target_user_id=test_user_1.id
+    )
+
+    assert profile == {
+        "id": test_user_1.id,
+        "name": test_user_1.name,
+        "followers_count": 1,
+        "following_count": 0,
+    }
+
+    full = await get_user_profile(
+        session=session, target_user_id=test_user_1.id, full=True
+    )
+
+    assert full is not None
+    assert full["followers"] == [
+        {"id": test_user_2.id, "name": test_user_2.name}
+    ]
+    assert full["following"] == []
+
+
+@pytest.mark.anyio
+async def test_get_follow_list_pagination(
+    session: AsyncSession, test_user_1: User
+):
+    others = [User(name=f"user{i}", api_key=f"key{i}") for i in range(5)]
+    session.add_all(others)
+    await session.flush()
+    session.add_all(
+        Follower(follower_id=user.id, following_id=test_user_1.id)
+        for user in others
+    )
+    await session.commit()
+
+    first = await get_follow_list(
+        session, test_user_1.id, "followers", limit=3
+    )
+
+    assert first is not None
+    assert [u["id"] for u in first["users"]] == [u.id for u in others[:3]]
+
+    second = await get_follow_list(
+        session,
+        test_user_1.id,
+        "followers",
+        limit=3,
+        cursor=first["next_cursor"],
+    )
+
+    assert second == {
+        "users": [{"id": u.id, "name": u.name} for u in others[3:]],
+        "next_cursor": None,
+    }
+
+    following = await get_follow_list(session, others[0].id, "following")
+
+    assert following == {
+        "users": [{"id": test_user_1.id, "name": test_user_1.name}],
+        "next_cursor": None,
+    }
+
+
+@pytest.mark.anyio
+async def test_get_follow_list_errors(
+    session: AsyncSession, test_user_1: User
+):
+    assert await get_follow_list(session, 999, "followers") is None
+
+    with pytest.raises(ValueError):
+        await get_follow_list(
+            session, test_user_1.id, "following", cursor="broken"
+        )
+
+
+@pytest.mark.anyio
+async def test_delete_user_updates_counters(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    third = User(name="user_3", api_key="key_3")
+    session.add(third)
+    await session.commit()
+
+    tweet = Tweet(content="hello", author_id=test_user_1.id)
+    session.add(tweet)
+    await session.commit()
+
+    await follow_user(
+        session, follower_id=third.id, following_id=test_user_2.id
+    )
+    await follow_user(
+        session, follower_id=test_user_2.id, following_id=third.id
+    )
+    await add_like(session, tweet_id=tweet.id, user_id=third.id)
+    await cache.set(auth_key("key_3"), {"user": None}, ttl=60)
+
+    assert await delete_user(session, third.id) is True
+    assert await delete_user(session, third.id) is False
+
+    for obj in (test_user_2, tweet):
+        await session.refresh(obj)
+
+    assert test_user_2.followers_count == 0
+    assert test_user_2.following_count == 0
+    assert tweet.like_count == 0
+    assert await session.get(Like, (third.id, tweet.id)) is None
+    assert await cache.get(auth_key("key_3")) is None
+
+
+@pytest.mark.anyio
+async def test_get_relationship(
+    session: AsyncSession, test_user_1: User, test_user_2: User
+):
+    others = [User(name=f"user{i}", api_key=f"key{i}") for i in range(3)]
+    session.add_all(others)
+    await session.commit()
+
+    await follow_user(
+        session, follower_id=test_user_1.id, following_id=test_user_2.id
+    )
+    await follow_users(session, others[0].id, [test_user_1.id, test_user_2.id])
+    await follow_users(session, others[1].id, [test_user_1.id, test_user_2.id])
+    await follow_users(session, others[2].id, [test_user_1.id])
+
+    first = await get_relationship(
+        session, test_user_1.id, test_user_2.id, limit=1
+    )
+
+    assert first is not None
+    assert first["you_follow"] is True
+    assert first["follows_you"] is False
+    assert first["mutual_followers"] == [{"id": others[0].id, "name": "user0"}]
+
+    second = await get_relationship(
+        session,
+        test_user_1.id,
+        test_user_2.id,
+        limit=1,
+        cursor=first["next_cursor"],
+    )
+
+    assert second == {
+        "user_id": test_user_2.id,
+        "you_follow": True,
+        "follows_you": False,
+        "mutual_followers": [{"id": others[1].id, "name": "user1"}],
+        "next_cursor": None,
+    }
+
+    reverse = await get_relationship(session, test_user_2.id, test_user_1.id)
+
+    assert reverse is not None
+    assert reverse["follows_you"] is True
+    assert await get_relationship(session, test_user_1.id, 999) is None